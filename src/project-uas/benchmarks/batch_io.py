@@ -0,0 +1,83 @@
+# benchmarks/batch_io.py
+"""
+Benchmark I/O batch prediction: CSV vs Parquet vs Arrow IPC (tanpa model).
+
+- baca input per chunk: semua kolom vs hanya 11 kolom fitur (column pruning)
+- tulis hasil per chunk (row group / record batch) lewat writer streaming
+- ukuran file per format
+
+Input sintetis diberi kolom tambahan (id & catatan teks) agar efek
+column pruning terlihat seperti pada ekspor portofolio sungguhan.
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.batch_io --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.base import FEATURE_COLUMNS, label_predictions
+from services.batch_stream import DEFAULT_CHUNK_SIZE, iter_input_chunks, open_writer
+from services.ft_transformer_service import load_categorical_options
+
+
+FORMATS = [".csv", ".parquet", ".arrow"]
+
+
+def consume(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def write_results(path, frames):
+    with open_writer(path) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    df = make_applicants(args.rows, load_categorical_options())
+    df.insert(0, "application_id", np.arange(args.rows))
+    df["notes"] = "catatan analis kredit untuk nasabah " + df["loan_intent"].astype(str)
+
+    # Frame hasil per chunk (probabilitas acak) untuk benchmark tulis
+    rng = np.random.default_rng(0)
+    results = [
+        label_predictions(df.iloc[start:start + args.chunksize], rng.random(min(args.chunksize, args.rows - start)))
+        for start in range(0, args.rows, args.chunksize)
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="batch_io_")
+    print(
+        f"{'format':<9} {'MB':>7} {'read all':>12} {'read 11 col':>12} {'write':>12}   (rows/sec)"
+    )
+    for ext in FORMATS:
+        source = os.path.join(workdir, f"input{ext}")
+        write_results(source, [df.iloc[s:s + args.chunksize] for s in range(0, args.rows, args.chunksize)])
+
+        t_all = best_time(lambda: consume(iter_input_chunks(source, args.chunksize)), args.repeat)
+        t_pruned = best_time(
+            lambda: consume(iter_input_chunks(source, args.chunksize, columns=FEATURE_COLUMNS)),
+            args.repeat,
+        )
+        t_write = best_time(
+            lambda: write_results(os.path.join(workdir, f"result{ext}"), results), args.repeat
+        )
+
+        print(
+            f"{ext:<9} {os.path.getsize(source) / 1e6:>7.1f} {args.rows / t_all:>12,.0f}"
+            f" {args.rows / t_pruned:>12,.0f} {args.rows / t_write:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/ensemble.py
+"""
+Biaya ensemble (services/ensemble_service.py) dibanding model tunggal.
+
+Per model tunggal & per metode combine dicatat waktu preprocess, forward
+dan total atas seluruh chunk, lalu:
+- rasio ensemble terhadap tiap model tunggal dan terhadap jumlah ketiganya
+- penghematan parsing bersama (preprocess ensemble vs jumlah preprocess anggota)
+- waktu combine (mean / max / stacking) per juta baris
+
+Keluar dengan status 1 jika ensemble ≥ --max-ratio × model tunggal termahal.
+
+Jalankan dari src/project-uas:
+    MLP_BACKEND=numpy python -m benchmarks.ensemble --rows 200000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.base import DEFAULT_BATCH_SIZE
+from services.batch_stream import DEFAULT_CHUNK_SIZE
+from services.ensemble_service import COMBINE_METHODS, EnsembleService, combine
+from services.ft_transformer_service import load_categorical_options
+
+
+def run(service, chunks, batch_size):
+    """return : (detik preprocess, detik forward) total semua chunk"""
+    preprocess = forward = 0.0
+    for chunk in chunks:
+        t0 = time.perf_counter()
+        arrays = service.preprocess(chunk)
+        t1 = time.perf_counter()
+        service.predict_prepared(*arrays, batch_size=batch_size)
+        t2 = time.perf_counter()
+        preprocess += t1 - t0
+        forward += t2 - t1
+    return preprocess, forward
+
+
+def best_run(service, chunks, batch_size, repeat):
+    run(service, chunks[:1], batch_size)        # warm-up
+    return min((run(service, chunks, batch_size) for _ in range(repeat)), key=sum)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    df = make_applicants(args.rows, load_categorical_options())
+    chunks = [df.iloc[start:start + args.chunksize] for start in range(0, args.rows, args.chunksize)]
+
+    ensemble = EnsembleService(method="mean")
+    print(f"rows: {args.rows:,}  chunks: {len(chunks)}  anggota: {ensemble.backend}")
+    print(f"{'model':<18} {'preprocess s':>12} {'forward s':>10} {'total s':>8} {'rows/sec':>11}")
+
+    def report(label, seconds):
+        total = sum(seconds)
+        print(f"{label:<18} {seconds[0]:>12.3f} {seconds[1]:>10.3f} {total:>8.3f} {args.rows / total:>11,.0f}")
+        return total
+
+    singles = {
+        member.name: report(member.name, best_run(member, chunks, args.batch_size, args.repeat))
+        for member in ensemble.members
+    }
+    member_preprocess = sum(run(member, chunks, args.batch_size)[0] for member in ensemble.members)
+
+    results = {}
+    for method in COMBINE_METHODS:
+        if method == "stacking" and not ensemble.stacking:
+            print(f"{'ensemble:stacking':<18} (bobot belum di-fit, dilewati)")
+            continue
+        service = EnsembleService(method=method)
+        seconds = best_run(service, chunks, args.batch_size, args.repeat)
+        results[method] = (report(f"ensemble:{method}", seconds), seconds[0])
+
+    P = np.random.default_rng(0).random((1_000_000, len(ensemble.members)), dtype=np.float32)
+    stacking = ensemble.stacking or {"coef": [1.0] * P.shape[1], "intercept": 0.0}
+    print("\ncombine per 1M baris: " + ", ".join(
+        f"{method} {best_time(lambda: combine(P, method, ensemble.weights, stacking), 3) * 1e3:.1f} ms"
+        for method in COMBINE_METHODS
+    ))
+
+    total, preprocess = results["mean"]
+    slowest = max(singles, key=singles.get)
+    print(f"\nparsing bersama: preprocess ensemble {preprocess:.3f}s vs jumlah anggota {member_preprocess:.3f}s")
+    print("ensemble:mean vs " + ", ".join(f"{name} {total / seconds:.2f}x" for name, seconds in singles.items())
+          + f", jumlah ketiganya {total / sum(singles.values()):.2f}x")
+
+    ratio = total / singles[slowest]
+    ok = ratio < args.max_ratio
+    print(f"vs model tunggal termahal ({slowest}): {ratio:.2f}x  (batas {args.max_ratio:.1f}x) {'ok' if ok else 'GAGAL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/explanations.py
+"""
+Throughput atribusi fitur / reason code (services/explain.py) per model & metode.
+
+Per metode dicatat:
+- rows/sec atribusi batch dan rasionya terhadap predict_proba
+- rows/sec bila dihitung satu per satu per baris (cara naif)
+- integrated gradients: galat kelengkapan median |Σ atribusi − (p(x) − p(baseline))|
+- lulus / tidak terhadap target throughput minimum per core (TARGETS)
+
+Jalankan dari src/project-uas:
+    MLP_BACKEND=numpy python -m benchmarks.explanations --rows 20000
+    python -m benchmarks.explanations --model ft --method integrated_gradients --steps 8 16 32
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.explain import DEFAULT_IG_STEPS, MODEL_METHODS, explain
+from services.ft_transformer_service import load_categorical_options
+from services.registry import registry
+
+
+# Target minimum rows/sec per core (1 thread) untuk atribusi batch
+TARGETS = {
+    "gradient_x_input": 100_000,
+    "tabnet_mask": 25_000,
+    "attention": 5_000,
+    "integrated_gradients": 150,
+}
+
+
+def rows_per_sec(fn, rows):
+    return rows / best_time(fn, warmup=True)
+
+
+def completeness_error(service, df, values):
+    """Galat aksioma kelengkapan integrated gradients (FT-Transformer)."""
+    import torch
+
+    from services.explain import _float_model, _ft_baseline, _ft_head
+
+    model = _float_model(service)
+    with torch.no_grad():
+        baseline = _ft_baseline(model, service.config["cat_cardinalities"])
+        p_baseline = float(_ft_head(model, baseline[None])[0])
+    probs = service.predict_proba(df)
+    return float(np.median(np.abs(values.sum(1) - (probs - p_baseline))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", action="append", choices=list(MODEL_METHODS))
+    parser.add_argument("--method", action="append", help="batasi ke metode tertentu")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--per-row", type=int, default=50, help="jumlah baris untuk pengukuran per baris")
+    parser.add_argument("--steps", type=int, nargs="+", default=[DEFAULT_IG_STEPS], help="langkah integrated gradients")
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    df = make_applicants(args.rows, load_categorical_options())
+    results = []
+    failed = 0
+
+    print(f"rows: {args.rows:,}")
+    print(
+        f"{'model':<7} {'method':<21} {'steps':>5} {'rows/sec':>11} {'vs predict':>10}"
+        f" {'per-row':>9} {'speedup':>8} {'target':>8}  completeness"
+    )
+
+    for name in args.model or list(MODEL_METHODS):
+        service = registry.get(name)
+        service = getattr(service, "service", service)      # tanpa cache prediksi
+        predict_rate = rows_per_sec(lambda: service.predict_proba(df), args.rows)
+
+        for method in MODEL_METHODS[name]:
+            if args.method and method not in args.method:
+                continue
+            for steps in args.steps if method == "integrated_gradients" else [None]:
+                options = {"method": method, "steps": steps or DEFAULT_IG_STEPS}
+                rate = rows_per_sec(lambda: explain(service, df, **options), args.rows)
+
+                per_row_df = df.iloc[:args.per_row]
+                start = time.perf_counter()
+                for i in range(len(per_row_df)):
+                    explain(service, per_row_df.iloc[[i]], **options)
+                per_row_rate = len(per_row_df) / (time.perf_counter() - start)
+
+                completeness = None
+                if method == "integrated_gradients":
+                    sample = df.iloc[:1_000]
+                    completeness = completeness_error(service, sample, explain(service, sample, **options).values)
+
+                target = TARGETS[method]
+                passed = rate >= target
+                failed += not passed
+                results.append({
+                    "model": name,
+                    "method": method,
+                    "steps": steps,
+                    "rows_per_sec": rate,
+                    "predict_rows_per_sec": predict_rate,
+                    "per_row_rows_per_sec": per_row_rate,
+                    "completeness_error": completeness,
+                    "target_rows_per_sec": target,
+                    "passed": passed,
+                })
+                print(
+                    f"{name:<7} {method:<21} {steps or '-':>5} {rate:>11,.0f} {predict_rate / rate:>9.1f}x"
+                    f" {per_row_rate:>9,.0f} {rate / per_row_rate:>7.0f}x {'ok' if passed else 'GAGAL':>8}"
+                    f"  {'' if completeness is None else f'{completeness:.4f}'}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
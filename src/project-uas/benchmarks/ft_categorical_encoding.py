@@ -0,0 +1,59 @@
+# benchmarks/ft_categorical_encoding.py
+"""
+Benchmark encoding kategorikal FT-Transformer: cara lama (LabelEncoder per sel)
+vs lookup vektor per kolom.
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.ft_categorical_encoding --rows 100000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.ft_transformer_service import FTTransformerService
+
+
+def encode_per_cell(service, df):
+    """Implementasi lama: encoder.transform dipanggil sekali per sel."""
+    df = df.copy()
+
+    for col in service.cat_cols:
+        encoder = service.cat_encoders[col]
+        known = set(encoder.classes_)
+        df[col] = df[col].apply(
+            lambda x: encoder.transform([x])[0] if x in known else -1
+        )
+
+    return df[service.cat_cols].values.astype("int64")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    service = FTTransformerService()
+    df = make_applicants(args.rows, service.get_categorical_options())
+
+    # sisipkan kategori asing untuk memastikan mapping -1 tetap sama
+    df.loc[df.index[::97], "loan_grade"] = "Z"
+
+    old = encode_per_cell(service, df)
+    new = service._encode_categorical(df)
+    t_old = best_time(lambda: encode_per_cell(service, df), args.repeat)
+    t_new = best_time(lambda: service._encode_categorical(df), args.repeat)
+
+    if not np.array_equal(old, new):
+        raise SystemExit("Hasil encoding berbeda antara cara lama dan baru")
+
+    print(f"rows            : {args.rows:,}")
+    print(f"per-cell encode : {args.rows / t_old:>14,.0f} rows/sec ({t_old:.3f}s)")
+    print(f"vector lookup   : {args.rows / t_new:>14,.0f} rows/sec ({t_new:.3f}s)")
+    print(f"speedup         : {t_old / t_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/ft_compiled.py
+"""
+Benchmark jalur inference FT-Transformer: eager vs TorchScript vs torch.compile.
+
+- waktu load (termasuk compile & warm-up) dan latency request pertama
+- latency single-row p50/p99
+- throughput per batch size
+- selisih probabilitas terhadap eager
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.ft_compiled --mode eager --mode trace --intra-op-threads 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.onnx_backends import single_row_latency_ms
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.ft_transformer_service import COMPILE_MODES, FTTransformerService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--mode", action="append", choices=COMPILE_MODES,
+        help="jalur yang diuji (boleh diulang, default semua)",
+    )
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--single-rows", type=int, default=200)
+    parser.add_argument("--intra-op-threads", type=int)
+    parser.add_argument("--inter-op-threads", type=int)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[64, 1024, 4096]
+    )
+    args = parser.parse_args()
+
+    modes = args.mode or list(COMPILE_MODES)
+    reference = None
+
+    print(f"{'mode':<8} {'load s':>7} {'1st ms':>7} {'p50 ms':>7} {'p99 ms':>7} {'max|Δp|':>9}", end="")
+    for batch_size in args.batch_sizes:
+        print(f" {f'bs={batch_size}':>10}", end="")
+    print("   (rows/sec)")
+
+    for mode in modes:
+        start = time.perf_counter()
+        service = FTTransformerService(
+            compile_mode=mode,
+            intra_op_threads=args.intra_op_threads,
+            inter_op_threads=args.inter_op_threads,
+        )
+        load_s = time.perf_counter() - start
+
+        if reference is None:
+            df = make_applicants(args.rows, service.get_categorical_options())
+
+        start = time.perf_counter()
+        service.predict_proba(df.iloc[[0]])
+        first_ms = (time.perf_counter() - start) * 1000.0
+
+        probs = service.predict_proba(df)
+        if reference is None:
+            reference = probs
+        p50, p99 = single_row_latency_ms(service, df, args.single_rows)
+
+        print(
+            f"{mode:<8} {load_s:>7.2f} {first_ms:>7.2f} {p50:>7.2f} {p99:>7.2f}"
+            f" {np.abs(probs - reference).max():>9.2e}",
+            end="",
+        )
+        for batch_size in args.batch_sizes:
+            t = best_time(lambda: service.predict_proba(df, batch_size=batch_size), args.repeat)
+            print(f" {args.rows / t:>10,.0f}", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
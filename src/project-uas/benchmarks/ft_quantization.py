@@ -0,0 +1,166 @@
+# benchmarks/ft_quantization.py
+"""
+Benchmark FT-Transformer fp32 vs dynamic INT8 (quantize=True).
+
+- akurasi / ROC-AUC pada test split held-out dan selisihnya
+- throughput & speedup per batch size
+- ukuran bobot dan puncak RSS prediksi per batch size (proses baru, Linux)
+
+utils/batch_prediction_result.csv berisi seluruh credit_risk_dataset.csv
+(urutan asli), termasuk data latih. Dengan --split test (default) yang
+dievaluasi hanya test split notebook training (stratified 70/15/15,
+random_state=42), yaitu baris yang tidak dilihat model saat training.
+
+Hasil di CPU (4.313 baris test lengkap): akurasi -0.0009, ROC-AUC +0.0002,
+bobot 47% lebih kecil, tetapi throughput tidak naik (0.98-1.01x untuk
+batch >= 64, 0.65x untuk single-row). Model ini kecil sehingga waktu
+didominasi embedding & overhead, bukan matmul Linear: INT8 hanya berguna
+untuk memperkecil bobot, bukan untuk mempercepat inference.
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.ft_quantization --csv utils/batch_prediction_result.csv --label loan_status
+"""
+import argparse
+import io
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import torch
+
+from benchmarks.timing import best_time
+from services.ft_transformer_service import FTTransformerService
+
+
+def test_split(df, label, seed=42):
+    """Test split seperti src/frhn_UAP_TrainModel.ipynb (70/15/15, stratified)."""
+    from sklearn.model_selection import train_test_split
+
+    _, temp = train_test_split(df, test_size=0.30, stratify=df[label], random_state=seed)
+    _, test = train_test_split(temp, test_size=0.50, stratify=temp[label], random_state=seed)
+    return test
+
+
+def weights_bytes(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def evaluate(probs, labels, threshold=0.5):
+    from sklearn.metrics import roc_auc_score
+
+    return {
+        "accuracy": float(((probs >= threshold).astype(int) == labels).mean()),
+        "auc": float(roc_auc_score(labels, probs)),
+    }
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+
+def _peak_rss_worker(quantize, df, batch_size, queue):
+    # Linux: reset puncak RSS (VmHWM) setelah model dimuat, lalu ukur puncak
+    # selama predict_proba relatif terhadap RSS sebelum prediksi
+    service = FTTransformerService(backend="torch", quantize=quantize)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    baseline = _status_kb("VmRSS")
+    service.predict_proba(df, batch_size=batch_size)
+    queue.put((_status_kb("VmHWM") - baseline) / 1024)
+
+
+def peak_rss_mb(quantize, df, batch_size):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_peak_rss_worker, args=(quantize, df, batch_size, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv", default="utils/batch_prediction_result.csv")
+    parser.add_argument("--label", default="loan_status")
+    parser.add_argument(
+        "--split", choices=["test", "all"], default="test",
+        help="test: hanya test split notebook training; all: seluruh CSV (mis. CSV held-out sendiri)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 64, 1024, 4096, 16384]
+    )
+    parser.add_argument("--no-memory", action="store_true", help="lewati pengukuran RSS")
+    args = parser.parse_args()
+
+    services = {
+        "fp32": FTTransformerService(backend="torch", quantize=False),
+        "int8": FTTransformerService(backend="torch", quantize=True),
+    }
+
+    # FT tidak mengimputasi: baris dengan fitur kosong menghasilkan NaN, dilewati
+    df = pd.read_csv(args.csv)
+    if args.split == "test":
+        df = test_split(df, args.label)
+    features = df[services["fp32"].num_cols + services["fp32"].cat_cols]
+    df = df[features.notna().all(axis=1)].reset_index(drop=True)
+    labels = df[args.label].to_numpy()
+    print(f"held-out: {args.csv} [{args.split}] ({len(df):,} baris lengkap)")
+
+    # Akurasi
+    probs = {mode: service.predict_proba(df) for mode, service in services.items()}
+    metrics = {mode: evaluate(p, labels) for mode, p in probs.items()}
+    agreement = ((probs["fp32"] >= 0.5) == (probs["int8"] >= 0.5)).mean()
+
+    print(f"\n{'':<10} {'accuracy':>10} {'roc_auc':>10}")
+    for mode, m in metrics.items():
+        print(f"{mode:<10} {m['accuracy']:>10.4f} {m['auc']:>10.4f}")
+    print(
+        f"{'delta':<10} {metrics['int8']['accuracy'] - metrics['fp32']['accuracy']:>+10.4f}"
+        f" {metrics['int8']['auc'] - metrics['fp32']['auc']:>+10.4f}"
+    )
+    print(f"label agreement {agreement:.4%}, max |Δp| {np.abs(probs['fp32'] - probs['int8']).max():.4f}")
+
+    # Ukuran bobot
+    sizes = {mode: weights_bytes(service.model) for mode, service in services.items()}
+    print(
+        f"\nweights: fp32 {sizes['fp32'] / 1024:,.0f} KB, int8 {sizes['int8'] / 1024:,.0f} KB"
+        f" ({1 - sizes['int8'] / sizes['fp32']:.0%} lebih kecil)"
+    )
+
+    # Throughput & memori per batch size
+    header = f"\n{'batch':>7} {'fp32 rows/s':>12} {'int8 rows/s':>12} {'speedup':>8}"
+    if not args.no_memory:
+        header += f" {'fp32 MB':>8} {'int8 MB':>8}"
+    print(header)
+
+    for batch_size in args.batch_sizes:
+        n_rows = min(len(df), max(batch_size * 8, 1024))
+        chunk = df.head(n_rows)
+        rates = {
+            mode: n_rows / best_time(
+                lambda: service.predict_proba(chunk, batch_size=batch_size), args.repeat
+            )
+            for mode, service in services.items()
+        }
+        line = (
+            f"{batch_size:>7} {rates['fp32']:>12,.0f} {rates['int8']:>12,.0f}"
+            f" {rates['int8'] / rates['fp32']:>7.2f}x"
+        )
+        if not args.no_memory:
+            batch = df.head(batch_size)
+            line += (
+                f" {peak_rss_mb(False, batch, batch_size):>8.1f}"
+                f" {peak_rss_mb(True, batch, batch_size):>8.1f}"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
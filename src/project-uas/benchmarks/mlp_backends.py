@@ -0,0 +1,88 @@
+# benchmarks/mlp_backends.py
+"""
+Benchmark backend MLP: Keras model.predict vs NumPy (vs ONNX Runtime jika ada).
+
+- selisih probabilitas & kesamaan label terhadap Keras
+- waktu import + load model per backend (proses baru, termasuk import TensorFlow)
+- latency single-row p50/p99 dan throughput per batch size
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.mlp_backends --rows 100000
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.onnx_backends import single_row_latency_ms
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.ft_transformer_service import get_ft_service
+from services.mlp_service import BACKENDS, MODEL_DIR, MLPService
+from services.onnx_backend import ONNX_FILE
+
+
+LOAD_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from services.mlp_service import MLPService
+MLPService(backend=sys.argv[1])
+print(time.perf_counter() - start, "tensorflow" in sys.modules)
+"""
+
+
+def cold_load(backend):
+    """return : (detik import + load di proses baru, TensorFlow ikut diimpor?)"""
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", LOAD_SNIPPET, backend],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "TF_CPP_MIN_LOG_LEVEL": "3"},
+    ).stdout.split()
+    return float(out[-2]), out[-1] == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--single-rows", type=int, default=200)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[256, 4096, 16384]
+    )
+    args = parser.parse_args()
+
+    backends = [
+        b for b in BACKENDS
+        if b != "onnx" or os.path.exists(os.path.join(MODEL_DIR, ONNX_FILE))
+    ]
+    services = {backend: MLPService(backend=backend) for backend in backends}
+    df = make_applicants(args.rows, get_ft_service().get_categorical_options())
+
+    reference = services["keras"].predict_proba(df)
+    print(f"{'backend':<8} {'max|Δp|':>9} {'labels':>7} {'load s':>7} {'tf':>4} {'p50 ms':>7} {'p99 ms':>7}", end="")
+    for batch_size in args.batch_sizes:
+        print(f" {f'bs={batch_size}':>11}", end="")
+    print("   (rows/sec)")
+
+    for backend, service in services.items():
+        probs = service.predict_proba(df)
+        same_labels = np.array_equal(probs >= 0.5, reference >= 0.5)
+        load_s, tf_imported = cold_load(backend)
+        p50, p99 = single_row_latency_ms(service, df, args.single_rows)
+
+        print(
+            f"{backend:<8} {np.abs(probs - reference).max():>9.2e} {str(same_labels):>7}"
+            f" {load_s:>7.2f} {'ya' if tf_imported else '-':>4} {p50:>7.2f} {p99:>7.2f}",
+            end="",
+        )
+        for batch_size in args.batch_sizes:
+            t = best_time(lambda: service.predict_proba(df, batch_size=batch_size), args.repeat)
+            print(f" {args.rows / t:>11,.0f}", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/onnx_backends.py
+"""
+Benchmark backend asli (Keras/torch) vs ONNX Runtime per model.
+
+- parity probabilitas ONNX vs backend asli (data sintetis)
+- latency single-row (p50/p99)
+- throughput per batch size
+
+Export model.onnx dulu: python -m services.onnx_backend
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.onnx_backends --model ft --rows 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.onnx_backend import EXPORTERS, check_parity
+from services.registry import registry
+
+
+def single_row_latency_ms(service, df, n_rows):
+    latencies = []
+    for i in range(n_rows):
+        row = df.iloc[[i]]
+        start = time.perf_counter()
+        service.predict_proba(row)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return np.percentile(latencies, [50, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--model", action="append", choices=list(EXPORTERS),
+        help="model yang diuji (boleh diulang, default semua)",
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--single-rows", type=int, default=200)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[256, 1024, 4096, 16384]
+    )
+    args = parser.parse_args()
+
+    df = make_applicants(args.rows, registry.get("ft").get_categorical_options())
+
+    for name in args.model or list(EXPORTERS):
+        original = registry.get(name)
+        backends = {
+            original.backend: original,
+            "onnx": type(original)(backend="onnx"),
+        }
+
+        print(f"\n=== {name} ===")
+        check_parity(f"{name}", original.predict_proba(df), backends["onnx"].predict_proba(df))
+
+        print(f"{'backend':<8} {'p50 ms':>8} {'p99 ms':>8}", end="")
+        for batch_size in args.batch_sizes:
+            print(f" {f'bs={batch_size}':>12}", end="")
+        print("   (rows/sec)")
+
+        for backend, service in backends.items():
+            p50, p99 = single_row_latency_ms(service, df, args.single_rows)
+            print(f"{backend:<8} {p50:>8.2f} {p99:>8.2f}", end="")
+            for batch_size in args.batch_sizes:
+                t = best_time(lambda: service.predict_proba(df, batch_size=batch_size), args.repeat)
+                print(f" {args.rows / t:>12,.0f}", end="")
+            print()
+
+
+if __name__ == "__main__":
+    main()
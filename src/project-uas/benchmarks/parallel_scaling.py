@@ -0,0 +1,106 @@
+# benchmarks/parallel_scaling.py
+"""
+Laporan scaling ParallelBatchRunner: throughput vs jumlah worker.
+
+Per jumlah worker dicatat:
+- waktu start pool (fork: model diwarisi; spawn: tiap worker memuat model)
+- throughput end-to-end (rows/sec), speedup & efisiensi terhadap 1 worker
+- total PSS worker (halaman copy-on-write yang dipakai bersama dihitung
+  proporsional) dan rata-rata USS (memori privat) per worker
+- kesamaan hasil dengan scoring serial di proses ini
+
+Jalankan dari src/project-uas:
+    MLP_BACKEND=numpy python -m benchmarks.parallel_scaling --model mlp --model tabnet --model ft \
+        --rows 200000 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import psutil
+
+from benchmarks.synthetic import make_applicants
+from services.batch_runner import START_METHODS, ParallelBatchRunner
+from services.batch_stream import DEFAULT_CHUNK_SIZE
+from services.ft_transformer_service import load_categorical_options
+from services.registry import registry
+
+
+def worker_memory_mb(pids):
+    """return : (total PSS MB, rata-rata USS MB) seluruh worker"""
+    infos = [psutil.Process(pid).memory_full_info() for pid in pids]
+    return (
+        sum(info.pss for info in infos) / 1e6,
+        np.mean([info.uss for info in infos]) / 1e6,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", action="append", choices=registry.names())
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE // 5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--start-method", choices=START_METHODS, default=None)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    models = {name: name for name in args.model or ["mlp", "tabnet", "ft"]}
+    df = make_applicants(args.rows, load_categorical_options())
+    chunks = [df.iloc[start:start + args.chunksize] for start in range(0, args.rows, args.chunksize)]
+
+    reference = {
+        name: np.concatenate([registry.get(name).predict_proba(chunk) for chunk in chunks])
+        for name in models
+    }
+
+    print(f"cpu: {os.cpu_count()}  rows: {args.rows:,}  chunks: {len(chunks)}  models: {', '.join(models)}")
+    print(
+        f"{'workers':>7} {'method':>10} {'start s':>8} {'rows/sec':>11} {'speedup':>8}"
+        f" {'eff':>5} {'PSS MB':>8} {'USS/wkr':>8}  identical"
+    )
+
+    results = []
+    for workers in args.workers:
+        with ParallelBatchRunner(
+            models, workers=workers, start_method=args.start_method,
+            threads_per_worker=args.threads_per_worker,
+        ) as runner:
+            start = time.perf_counter()
+            outputs = list(runner.map(chunks))
+            seconds = time.perf_counter() - start
+            pss_mb, uss_mb = worker_memory_mb(runner.worker_pids())
+
+            identical = all(
+                np.array_equal(
+                    np.concatenate([out[name][0] for _, out in outputs]), reference[name], equal_nan=True
+                )
+                for name in models
+            )
+            results.append({
+                "workers": workers,
+                "start_method": runner.start_method,
+                "start_seconds": runner.load_seconds,
+                "rows_per_sec": args.rows / seconds,
+                "pss_mb": pss_mb,
+                "uss_mb_per_worker": uss_mb,
+                "identical": identical,
+            })
+
+        r, base = results[-1], results[0]
+        speedup = r["rows_per_sec"] / base["rows_per_sec"] * base["workers"]
+        print(
+            f"{workers:>7} {r['start_method']:>10} {r['start_seconds']:>8.2f} {r['rows_per_sec']:>11,.0f}"
+            f" {speedup:>7.2f}x {speedup / workers:>5.0%} {pss_mb:>8.0f} {uss_mb:>8.0f}  {identical}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/prepared_dataset.py
+"""
+Benchmark dataset siap-scoring (.npy memory-mapped) vs parsing + preprocess ulang.
+
+- waktu tahap prepare pertama kali (parse CSV + preprocess semua model)
+- per run: input + preprocess dari CSV vs dari dataset tersimpan (memmap)
+- end-to-end stream_predict untuk beberapa threshold, tanpa vs dengan prepared
+
+Jalankan dari src/project-uas:
+    MLP_BACKEND=numpy python -m benchmarks.prepared_dataset --rows 1000000 --model mlp --model tabnet
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.base import FEATURE_COLUMNS
+from services.batch_stream import DEFAULT_CHUNK_SIZE, iter_input_chunks, stream_predict
+from services.ft_transformer_service import load_categorical_options
+from services.prepared_dataset import PreparedDataset
+from services.registry import registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--model", action="append", choices=registry.names())
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.4, 0.5, 0.6])
+    args = parser.parse_args()
+
+    models = args.model or ["mlp", "tabnet"]
+    services = [registry.get(name) for name in models]
+
+    workdir = tempfile.mkdtemp(prefix="prepared_bench_")
+    source = os.path.join(workdir, "portfolio.csv")
+    make_applicants(args.rows, load_categorical_options()).to_csv(source, index=False)
+
+    t_prepare = best_time(lambda: PreparedDataset.prepare(
+        source, services, columns=FEATURE_COLUMNS, chunksize=args.chunksize,
+        root=os.path.join(workdir, "prepared"),
+    ))
+    dataset = PreparedDataset.prepare(
+        source, services, columns=FEATURE_COLUMNS, chunksize=args.chunksize,
+        root=os.path.join(workdir, "prepared"),
+    )
+
+    def preprocess_from_csv():
+        for chunk in iter_input_chunks(source, args.chunksize, columns=FEATURE_COLUMNS):
+            for service in services:
+                service.preprocess(chunk)
+
+    def preprocess_from_prepared():
+        for chunk in dataset.iter_chunks(args.chunksize):
+            rows = dataset.rows_of(chunk)
+            for service in services:
+                for array in dataset.arrays(service.name):
+                    array[rows].sum()       # sentuh semua halaman memmap
+
+    t_csv = best_time(preprocess_from_csv)
+    t_prepared = best_time(preprocess_from_prepared)
+
+    print(f"rows: {args.rows:,}  models: {', '.join(models)}")
+    print(f"prepare (sekali)                 : {t_prepare:8.2f}s")
+    print(f"input + preprocess, CSV          : {t_csv:8.2f}s")
+    print(f"input + preprocess, prepared     : {t_prepared:8.2f}s  ({t_csv / t_prepared:.1f}x)")
+
+    def score(prepared):
+        for threshold in args.thresholds:
+            chunks = (
+                dataset.iter_chunks(args.chunksize) if prepared
+                else iter_input_chunks(source, args.chunksize, columns=FEATURE_COLUMNS)
+            )
+            stream_predict(
+                chunks, {name: name for name in models},
+                threshold=threshold, prepared=dataset if prepared else None,
+            )
+
+    t_plain = best_time(lambda: score(False))
+    t_fast = best_time(lambda: score(True))
+    label = f"scoring {len(args.thresholds)} threshold"
+    print(f"{label + ', CSV':<33}: {t_plain:8.2f}s")
+    print(f"{label + ', prepared':<33}: {t_fast:8.2f}s  ({t_plain / t_fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
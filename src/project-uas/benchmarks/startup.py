@@ -0,0 +1,97 @@
+# benchmarks/startup.py
+"""
+Benchmark cold start per halaman dashboard.
+
+Setiap halaman dijalankan sekali (tanpa interaksi) dengan Streamlit AppTest
+di proses baru, lalu dicatat:
+- waktu import modul halaman + render pertama (tanpa import streamlit sendiri)
+- puncak RSS proses
+- framework berat yang ikut terimpor
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --json startup.json   # simpan untuk dibandingkan antar commit
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+PAGES = [
+    "Prediction.py",
+    "pages/MLP.py",
+    "pages/TabNet.py",
+    "pages/FT-Transformer.py",
+    "pages/Batch_Prediction.py",
+]
+
+HEAVY_MODULES = [
+    "tensorflow",
+    "torch",
+    "pytorch_tabnet",
+    "rtdl_revisiting_models",
+    "onnxruntime",
+    "sklearn",
+    "matplotlib",
+]
+
+PAGE_SNIPPET = """
+import json, resource, sys, time
+from streamlit.testing.v1 import AppTest
+
+page, heavy = sys.argv[1], sys.argv[2].split(",")
+before = set(sys.modules)
+start = time.perf_counter()
+at = AppTest.from_file(page, default_timeout=600).run()
+seconds = time.perf_counter() - start
+
+print(json.dumps({
+    "seconds": seconds,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [m for m in heavy if m in sys.modules and m not in before],
+    "exception": [str(e.message) for e in at.exception],
+}))
+"""
+
+
+def measure_page(page, repeat=1):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", PAGE_SNIPPET, page, ",".join(HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=root,
+            env={**os.environ, "TF_CPP_MIN_LOG_LEVEL": "3"},
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    best = min(runs, key=lambda r: r["seconds"])
+    return {"page": page, **best}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page", action="append", choices=PAGES, help="default semua halaman")
+    parser.add_argument("--repeat", type=int, default=3, help="ambil run tercepat")
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = [measure_page(page, args.repeat) for page in args.page or PAGES]
+
+    print(f"{'page':<28} {'seconds':>8} {'peak RSS MB':>12}  heavy modules")
+    for r in results:
+        print(
+            f"{r['page']:<28} {r['seconds']:>8.2f} {r['peak_rss_mb']:>12.0f}"
+            f"  {', '.join(r['heavy_modules']) or '-'}"
+            + (f"  [error: {r['exception'][0][:60]}]" if r["exception"] else "")
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# benchmarks/suite.py
+"""
+Benchmark suite inference semua model: latency single-row & throughput batch.
+
+Data = nasabah sintetis dari skema fitur + get_categorical_options().
+Setiap pengukuran dipecah per tahap:
+    preprocess  : service.preprocess(df)
+    forward     : service.predict_prepared(*arrays)
+    postprocess : label_predictions(df, probs) (threshold & label)
+
+Hasil disimpan sebagai JSON (beserta commit git, versi library, CPU dan
+backend tiap model) agar bisa dibandingkan antar commit.
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.suite --json bench_baru.json
+    python -m benchmarks.suite --model mlp --batch-sizes 1 100 10000 --json bench.json
+    python -m benchmarks.suite --compare bench_lama.json bench_baru.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from services.base import DEFAULT_BATCH_SIZE, label_predictions
+from services.ft_transformer_service import load_categorical_options
+from services.registry import registry
+
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+STAGES = ("preprocess", "forward", "postprocess")
+
+# Perubahan di atas batas ini ditandai pada --compare
+REGRESSION_TOLERANCE = 0.10
+
+
+# =============================================================
+# Pengukuran
+# =============================================================
+def run_stages(service, df, batch_size):
+    """Satu panggilan penuh; return : dict tahap -> detik."""
+    t0 = time.perf_counter()
+    arrays = service.preprocess(df)
+    t1 = time.perf_counter()
+    probs = service.predict_prepared(*arrays, batch_size=batch_size)
+    t2 = time.perf_counter()
+    label_predictions(df, probs)
+    t3 = time.perf_counter()
+    return {"preprocess": t1 - t0, "forward": t2 - t1, "postprocess": t3 - t2}
+
+
+def measure(service, df, batch_size, min_repeat, min_seconds, max_repeat):
+    """
+    Ulangi run_stages() minimal `min_repeat` kali & `min_seconds` detik.
+
+    return : dict tahap -> {"median_ms", "p99_ms"} + "total" + "repeats"
+    """
+    run_stages(service, df, batch_size)     # warm-up
+
+    samples = {stage: [] for stage in STAGES}
+    started = time.perf_counter()
+    while True:
+        for stage, seconds in run_stages(service, df, batch_size).items():
+            samples[stage].append(seconds)
+        repeats = len(samples["forward"])
+        elapsed = time.perf_counter() - started
+        if repeats >= max_repeat or (repeats >= min_repeat and elapsed >= min_seconds):
+            break
+
+    totals = np.sum([samples[stage] for stage in STAGES], axis=0)
+    result = {
+        stage: {
+            "median_ms": float(np.median(samples[stage]) * 1e3),
+            "p99_ms": float(np.percentile(samples[stage], 99) * 1e3),
+        }
+        for stage in STAGES
+    }
+    result["total"] = {
+        "median_ms": float(np.median(totals) * 1e3),
+        "p99_ms": float(np.percentile(totals, 99) * 1e3),
+    }
+    result["repeats"] = repeats
+    return result
+
+
+def single_row_latency(service, df, n_rows):
+    """Latency end-to-end per baris (p50/p95/p99 ms) + median per tahap."""
+    samples = {stage: [] for stage in STAGES}
+    for i in range(n_rows):
+        for stage, seconds in run_stages(service, df.iloc[[i]], DEFAULT_BATCH_SIZE).items():
+            samples[stage].append(seconds * 1e3)
+
+    totals = np.sum([samples[stage] for stage in STAGES], axis=0)
+    p50, p95, p99 = np.percentile(totals, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "stages_median_ms": {stage: float(np.median(samples[stage])) for stage in STAGES},
+    }
+
+
+# =============================================================
+# Metadata run
+# =============================================================
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=root,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=root,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def environment():
+    commit, dirty = git_revision()
+    versions = {}
+    for module in ("numpy", "pandas", "torch", "onnxruntime", "tensorflow"):
+        if module in sys.modules:
+            versions[module] = getattr(sys.modules[module], "__version__", None)
+
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+# =============================================================
+# Perbandingan antar commit
+# =============================================================
+def compare(old_path, new_path, tolerance=REGRESSION_TOLERANCE):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"old: {old['environment']['commit']}  new: {new['environment']['commit']}")
+    print(f"{'model':<8} {'rows':>7} {'stage':<12} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+
+    regressions = 0
+    for name, model in new["models"].items():
+        if name not in old["models"]:
+            continue
+        old_batches = old["models"][name]["batches"]
+        for rows, result in model["batches"].items():
+            if rows not in old_batches:
+                continue
+            for stage in (*STAGES, "total"):
+                before = old_batches[rows][stage]["median_ms"]
+                after = result[stage]["median_ms"]
+                ratio = after / before if before else float("nan")
+                flag = ""
+                if ratio > 1 + tolerance:
+                    flag, regressions = "  <- lebih lambat", regressions + 1
+                elif ratio < 1 - tolerance:
+                    flag = "  <- lebih cepat"
+                print(f"{name:<8} {rows:>7} {stage:<12} {before:>10.3f} {after:>10.3f} {ratio:>6.2f}x{flag}")
+
+    return regressions
+
+
+# =============================================================
+# Main
+# =============================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", action="append", choices=registry.names())
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument(
+        "--forward-batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help="batch size forward pass di dalam service",
+    )
+    parser.add_argument("--single-rows", type=int, default=200)
+    parser.add_argument("--min-repeat", type=int, default=3)
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    parser.add_argument("--max-repeat", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="bandingkan dua file JSON")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare) else 0)
+
+    df = make_applicants(max(args.batch_sizes + [args.single_rows]), load_categorical_options(), seed=args.seed)
+    report = {"config": vars(args), "models": {}}
+
+    for name in args.model or registry.names():
+        load_start = time.perf_counter()
+        service = registry.get(name)
+        load_seconds = time.perf_counter() - load_start
+        service = getattr(service, "service", service)      # tanpa cache prediksi
+
+        model = {
+            "backend": getattr(service, "backend", None),
+            "load_seconds": load_seconds,
+            "single_row": single_row_latency(service, df, args.single_rows),
+            "batches": {},
+        }
+        single = model["single_row"]
+        print(
+            f"\n=== {name} ({model['backend']}) ===  single-row p50 {single['p50_ms']:.2f} ms"
+            f"  p99 {single['p99_ms']:.2f} ms"
+        )
+        print(
+            f"{'rows':>7} {'preprocess':>11} {'forward':>11} {'postprocess':>11}"
+            f" {'total ms':>11} {'rows/sec':>12}"
+        )
+
+        for rows in args.batch_sizes:
+            result = measure(
+                service, df.iloc[:rows], args.forward_batch_size,
+                args.min_repeat, args.min_seconds, args.max_repeat,
+            )
+            result["rows_per_sec"] = rows / (result["total"]["median_ms"] / 1e3)
+            model["batches"][str(rows)] = result
+            print(
+                f"{rows:>7} {result['preprocess']['median_ms']:>11.3f} {result['forward']['median_ms']:>11.3f}"
+                f" {result['postprocess']['median_ms']:>11.3f} {result['total']['median_ms']:>11.3f}"
+                f" {result['rows_per_sec']:>12,.0f}"
+            )
+
+        report["models"][name] = model
+
+    report["environment"] = environment()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nhasil: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/synthetic.py
+import numpy as np
+import pandas as pd
+
+
+# =============================================================
+# Rentang fitur numerik (mengikuti credit_risk_dataset.csv)
+# =============================================================
+NUMERIC_RANGES = {
+    "person_age": (20, 70),
+    "person_income": (4000, 250000),
+    "person_emp_length": (0, 40),
+    "loan_amnt": (500, 35000),
+    "loan_int_rate": (5.0, 23.0),
+    "loan_percent_income": (0.0, 0.8),
+    "cb_person_cred_hist_length": (2, 30),
+}
+
+INTEGER_FEATURES = {
+    "person_age",
+    "person_income",
+    "loan_amnt",
+    "cb_person_cred_hist_length",
+}
+
+
+def make_applicants(n_rows, cat_options, seed=42):
+    """
+    Bangkitkan data nasabah sintetis sebanyak n_rows.
+
+    cat_options : dict kolom kategorikal -> list kategori valid
+                  (mis. FTTransformerService.get_categorical_options())
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    for col, (low, high) in NUMERIC_RANGES.items():
+        if col in INTEGER_FEATURES:
+            data[col] = rng.integers(low, high + 1, size=n_rows)
+        else:
+            data[col] = np.round(rng.uniform(low, high, size=n_rows), 2)
+
+    for col, options in cat_options.items():
+        data[col] = rng.choice(np.asarray(options, dtype=object), size=n_rows)
+
+    return pd.DataFrame(data)
@@ -0,0 +1,71 @@
+# benchmarks/tabnet_batch.py
+"""
+Benchmark & cek konsistensi jalur inference TabNet.
+
+- probabilitas jalur batch (forward pass langsung) vs TabNetClassifier.predict_proba
+- hasil jalur batch vs jalur single-row (predict_tabnet_risk)
+- throughput per batch size
+
+Keluar dengan status 1 jika selisih probabilitas melebihi --atol.
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.tabnet_batch --rows 100000
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.ft_transformer_service import get_ft_service
+from services.tabnet_service import get_tabnet_service, predict_tabnet_risk
+
+
+def predict_proba_classifier(service, df):
+    """Jalur lama: TabNetClassifier.predict_proba (DataLoader, tanpa no_grad)."""
+    X = service.preprocessor.transform(df).astype(np.float32)
+    return service.model.predict_proba(X)[:, 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--single-rows", type=int, default=200)
+    parser.add_argument("--atol", type=float, default=1e-5)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[256, 1024, 4096, 16384]
+    )
+    args = parser.parse_args()
+
+    service = get_tabnet_service()
+    df = make_applicants(args.rows, get_ft_service().get_categorical_options())
+
+    # Konsistensi probabilitas dengan implementasi pytorch-tabnet
+    reference = predict_proba_classifier(service, df)
+    batched = service.predict_proba(df)
+    diff_ref = np.abs(batched - reference).max()
+    print(f"max |batch - predict_proba|   : {diff_ref:.2e}  {'ok' if diff_ref <= args.atol else 'GAGAL'}")
+
+    # Konsistensi jalur batch vs single-row
+    single = np.array([
+        predict_tabnet_risk(df.iloc[[i]])[1][0] for i in range(args.single_rows)
+    ])
+    diff_single = np.abs(batched[:args.single_rows] - single).max()
+    print(f"max |batch - single-row|      : {diff_single:.2e}  {'ok' if diff_single <= args.atol else 'GAGAL'}")
+
+    # Throughput
+    t_ref = best_time(lambda: predict_proba_classifier(service, df), args.repeat)
+    print(f"\n{'path':<28} {'rows/sec':>14}")
+    print(f"{'classifier.predict_proba':<28} {args.rows / t_ref:>14,.0f}")
+    for batch_size in args.batch_sizes:
+        t = best_time(lambda: service.predict_proba(df, batch_size=batch_size), args.repeat)
+        print(f"{f'forward pass bs={batch_size}':<28} {args.rows / t:>14,.0f}")
+
+    print(f"\ntoleransi parity: {args.atol:.0e}")
+    sys.exit(0 if max(diff_ref, diff_single) <= args.atol else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+# benchmarks/timing.py
+import time
+
+
+def best_time(fn, repeat=1, warmup=False):
+    """Detik tercepat dari `repeat` kali fn(); warmup=True menjalankan fn sekali tanpa diukur."""
+    if warmup:
+        fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
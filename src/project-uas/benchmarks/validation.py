@@ -0,0 +1,80 @@
+# benchmarks/validation.py
+"""
+Throughput validasi skema input (services/validation.py).
+
+Data sintetis diberi pelanggaran (--bad-fraction) di tiap aturan: nilai di
+luar rentang, kosong, kategori tak dikenal, dan teks di kolom numerik. Per
+skema (tiap model & gabungan semua model) dicatat rows/sec untuk:
+- satu frame utuh (validate)
+- per chunk lewat ChunkValidator (termasuk membuang baris tidak valid)
+
+Keluar dengan status 1 jika ada yang di bawah --min-rows-per-sec.
+
+Jalankan dari src/project-uas:
+    python -m benchmarks.validation --rows 1000000
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.synthetic import make_applicants
+from benchmarks.timing import best_time
+from services.batch_stream import DEFAULT_CHUNK_SIZE
+from services.ft_transformer_service import load_categorical_options
+from services.registry import registry
+from services.validation import ChunkValidator, merge_schemas, model_schema, validate
+
+
+def inject_violations(df, fraction, seed=0):
+    """Salinan df dengan pelanggaran di tiap aturan (total ≈ fraction baris)."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    n = max(1, int(len(df) * fraction / 4))
+    df.loc[rng.choice(len(df), n), "person_emp_length"] = 123
+    df.loc[rng.choice(len(df), n), "loan_int_rate"] = np.nan
+    df.loc[rng.choice(len(df), n), "loan_grade"] = "Z"
+    # Kolom numerik bertipe object (mis. CSV kotor) memakai jalur to_numeric
+    df["person_age"] = df["person_age"].astype(object)
+    df.loc[rng.choice(len(df), n), "person_age"] = "n/a"
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--bad-fraction", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-rows-per-sec", type=float, default=1_000_000)
+    args = parser.parse_args()
+
+    df = inject_violations(make_applicants(args.rows, load_categorical_options()), args.bad_fraction)
+    chunks = [df.iloc[start:start + args.chunksize] for start in range(0, args.rows, args.chunksize)]
+
+    schemas = {name: model_schema(name) for name in registry.names()}
+    schemas["gabungan"] = merge_schemas(schemas.values())
+
+    print(f"rows: {args.rows:,}  chunks: {len(chunks)}  bad fraction: {args.bad_fraction:.2%}")
+    print(f"{'skema':<10} {'ditolak':>9} {'frame rows/s':>13} {'chunk rows/s':>13}")
+
+    failed = 0
+    for name, schema in schemas.items():
+        rejected = int((~validate(df, schema).valid).sum())
+        frame_rate = args.rows / best_time(lambda: validate(df, schema), args.repeat, warmup=True)
+        chunk_rate = args.rows / best_time(
+            lambda: sum(len(chunk) for chunk in ChunkValidator(schema)(chunks)), args.repeat, warmup=True
+        )
+        passed = min(frame_rate, chunk_rate) >= args.min_rows_per_sec
+        failed += not passed
+        print(
+            f"{name:<10} {rejected:>9,} {frame_rate:>13,.0f} {chunk_rate:>13,.0f}"
+            f"  {'ok' if passed else 'GAGAL'}"
+        )
+
+    print(f"\ntarget: ≥ {args.min_rows_per_sec:,.0f} rows/sec")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,52 @@
+import json
+import os
+from datetime import datetime
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
 from utils.load_css import load_css
-from services.mlp_service import predict_mlp_batch
-from services.tabnet_service import predict_tabnet_batch
-# from services.ft_transformer_service import predict_ft_batch
-from services.ft_transformer_service import FTTransformerService
+from services.base import FEATURE_COLUMNS
+from services.batch_stream import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    PREVIEW_ROWS,
+    RESULT_MIME_TYPES,
+    read_preview,
+)
+from services.instrumentation import metrics, stage_frame
+from services.jobs import (
+    FINISHED_STATUSES,
+    POLL_SECONDS,
+    cancel_job,
+    ensure_worker,
+    job_metrics,
+    job_progress,
+    job_results,
+    list_jobs,
+    load_job,
+    rejected_path,
+    submit_job,
+)
+from utils.model_cache import render_model_status
+
+# Pilihan UI -> (nama hasil, nama model di registry)
+MODEL_OPTIONS = {
+    "MLP (Base Neural Network)": ("MLP", "mlp"),
+    "TabNet (Pretrained)": ("TabNet", "tabnet"),
+    "FT-Transformer (Pretrained)": ("FT-Transformer", "ft"),
+    "Ensemble (MLP + TabNet + FT-Transformer)": ("Ensemble", "ensemble"),
+}
+
+INPUT_TYPES = ["csv", "parquet", "arrow", "feather", "ipc"]
+
+# Pilihan UI -> ekstensi file hasil
+OUTPUT_FORMATS = {
+    "CSV": ".csv",
+    "Parquet": ".parquet",
+    "Arrow IPC (Feather)": ".arrow",
+}
 
 # ============================================================
 # INIT
@@ -21,6 +61,18 @@ st.set_page_config(
 
 if "results" not in st.session_state:
     st.session_state.results = {}
+if "run_metrics" not in st.session_state:
+    st.session_state.run_metrics = None
+if "rejected_path" not in st.session_state:
+    st.session_state.rejected_path = None
+# Job batch aktif & job yang hasilnya sudah dimuat ke session
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+if "loaded_job" not in st.session_state:
+    st.session_state.loaded_job = None
+
+# Model dimuat sekali per proses & dipakai bersama semua halaman
+render_model_status()
 
 # ============================================================
 # HEADER
@@ -29,7 +81,7 @@ st.title("📂 Batch Prediction – Kredit Risk Dataset")
 st.markdown(
     """
     Halaman ini memungkinkan **prediksi risiko kredit secara batch**
-    menggunakan dataset `.csv`.
+    menggunakan dataset `.csv`, `.parquet`, atau Arrow IPC (`.arrow` / `.feather`).
 
     Cocok untuk:
     - Analisis portofolio kredit
@@ -44,16 +96,20 @@ st.markdown("---")
 # UPLOAD DATASET
 # ============================================================
 uploaded_file = st.file_uploader(
-    "Upload Dataset Kredit (.csv)",
-    type=["csv"]
+    "Upload Dataset Kredit (.csv / .parquet / .arrow)",
+    type=INPUT_TYPES
 )
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    # Hanya baca beberapa baris untuk preview; data lengkap dibaca per chunk
+    preview_df = read_preview(uploaded_file)
 
     st.subheader("📊 Preview Dataset")
-    st.dataframe(df.head(10), use_container_width=True)
-    st.caption(f"Total data: **{len(df)} baris** | **{df.shape[1]} kolom**")
+    st.dataframe(preview_df, use_container_width=True)
+    st.caption(
+        f"Ukuran file: **{uploaded_file.size / 1e6:.1f} MB** | "
+        f"**{preview_df.shape[1]} kolom**"
+    )
 
     st.markdown("---")
 
@@ -64,37 +120,133 @@ if uploaded_file:
 
     model_choices = st.multiselect(
         "Pilih model:",
-        [
-            "MLP (Base Neural Network)",
-            "TabNet (Pretrained)",
-            "FT-Transformer (Pretrained)"
-        ],
+        list(MODEL_OPTIONS),
         default=["MLP (Base Neural Network)"]
     )
 
+    with st.expander("⚙️ Pengaturan Lanjutan"):
+        chunk_size = st.number_input(
+            "Jumlah baris per chunk (dibaca dari file)",
+            min_value=1_000, value=DEFAULT_CHUNK_SIZE, step=1_000
+        )
+        batch_size = st.number_input(
+            "Batch size forward pass model",
+            min_value=1, value=DEFAULT_BATCH_SIZE, step=256
+        )
+        extra_columns = st.multiselect(
+            "Kolom tambahan yang disalin ke hasil",
+            [col for col in preview_df.columns if col not in FEATURE_COLUMNS],
+            help="Secara default hanya 11 kolom fitur yang dibaca dari file."
+        )
+        top_k = st.number_input(
+            "Reason code per nasabah (0 = nonaktif)",
+            min_value=0, max_value=len(FEATURE_COLUMNS), value=0,
+            help="Fitur yang paling mendorong prediksi tiap baris "
+                 "(MLP: gradient×input, TabNet: mask atensi, FT-Transformer: integrated gradients)."
+        )
+        output_format = st.selectbox("Format file hasil", list(OUTPUT_FORMATS))
+        run_parallel = st.checkbox(
+            "Jalankan model terpilih secara paralel",
+            value=True,
+            help="Setiap model berjalan di thread terpisah pada chunk yang sama."
+        )
+
     run_btn = st.button("🚀 Jalankan Batch Prediction")
 
     # ========================================================
-    # RUN PREDICTION
+    # SUBMIT JOB
     # ========================================================
-    ft_service = FTTransformerService()
     if run_btn and model_choices:
-        with st.spinner("⏳ Memproses batch prediction..."):
-            results = {}
-
-            if "MLP (Base Neural Network)" in model_choices:
-                results["MLP"] = predict_mlp_batch(df)
-
-            if "TabNet (Pretrained)" in model_choices:
-                results["TabNet"] = predict_tabnet_batch(df)
+        # Dinilai worker process di latar belakang (services/jobs.py):
+        # hasil & checkpoint per chunk di disk, tidak hilang saat rerun/disconnect
+        st.session_state.job_id = submit_job(
+            uploaded_file,
+            dict(MODEL_OPTIONS[choice] for choice in model_choices),
+            output_format=OUTPUT_FORMATS[output_format],
+            chunksize=int(chunk_size),
+            batch_size=int(batch_size),
+            mode="thread" if run_parallel else "serial",
+            top_k=int(top_k),
+            columns=FEATURE_COLUMNS + extra_columns,
+        )
 
-            if "FT-Transformer (Pretrained)" in model_choices:
-                results["FT-Transformer"] = ft_service.predict_batch(df)
+# ============================================================
+# JOB BATCH (PROGRESS)
+# ============================================================
+@st.fragment(run_every=POLL_SECONDS)
+def render_job_progress(job_id):
+    """Polling progress job; rerun seluruh halaman saat job selesai."""
+    job = load_job(job_id)
+    if job["status"] in FINISHED_STATUSES:
+        st.rerun()
+    # Worker mati (crash / restart server): nyalakan lagi, job lanjut dari checkpoint
+    ensure_worker()
+
+    progress = job_progress(job)
+    label = "⏳ Menunggu worker..." if job["status"] == "queued" else "⏳ Memproses batch prediction..."
+    st.progress(progress["fraction"] or 0.0, text=label)
+
+    c1, c2, c3 = st.columns(3)
+    total = f"{progress['total_rows']:,}" if progress["total_rows"] is not None else "?"
+    c1.metric("Baris diproses", f"{progress['rows_done']:,} / {total}")
+    c2.metric(
+        "Throughput",
+        f"{progress['rows_per_sec']:,.0f} baris/s" if progress["rows_per_sec"] else "-",
+    )
+    c3.metric(
+        "Estimasi sisa waktu",
+        f"{progress['eta_seconds']:,.0f} s" if progress["eta_seconds"] is not None else "-",
+    )
+    if job["runs"] > 1:
+        st.caption(f"🔁 Dilanjutkan dari checkpoint ({job['runs']}× dijalankan)")
+    if st.button("⛔ Batalkan job"):
+        cancel_job(job_id)
 
 
-            st.session_state.results = results
+jobs = list_jobs()
 
-        st.success("✅ Batch prediction selesai")
+if jobs:
+    st.markdown("---")
+    st.subheader("🗂️ Job Batch Prediction")
+
+    job_ids = [job["id"] for job in jobs]
+    if st.session_state.job_id not in job_ids:
+        st.session_state.job_id = job_ids[0]
+    job_labels = {
+        job["id"]: (
+            f"{datetime.fromtimestamp(job['created_at']):%Y-%m-%d %H:%M:%S} · {job['name']} · "
+            f"{', '.join(job['models'])} · {job['status']}"
+        )
+        for job in jobs
+    }
+    job_id = st.selectbox(
+        "Job",
+        job_ids,
+        format_func=job_labels.get,
+        key="job_id",
+        help="Job tetap tersimpan di disk; pilih job sebelumnya untuk melihat hasilnya lagi."
+    )
+    job = load_job(job_id)
+
+    if job["status"] == "done":
+        # Hasil dibaca dari disk sekali per job
+        if st.session_state.loaded_job != job_id:
+            st.session_state.results = job_results(job_id)
+            st.session_state.run_metrics = job_metrics(job_id)
+            st.session_state.rejected_path = rejected_path(job_id)
+            st.session_state.loaded_job = job_id
+        st.success(f"✅ Batch prediction selesai ({job['rows_done']:,} baris)")
+    else:
+        st.session_state.results = {}
+        st.session_state.run_metrics = None
+        st.session_state.loaded_job = None
+
+        if job["status"] == "failed":
+            st.error(f"❌ Job gagal: {job['error']}")
+        elif job["status"] == "cancelled":
+            st.warning(f"⛔ Job dibatalkan setelah {job['rows_done']:,} baris")
+        else:
+            render_job_progress(job_id)
 
 # ============================================================
 # READ RESULTS FROM SESSION STATE (INI KUNCI!)
@@ -109,9 +261,36 @@ if results:
     # ========================================================
     st.subheader("📈 Hasil Prediksi (Preview)")
 
-    for model_name, result_df in results.items():
+    for model_name, summary in results.items():
         st.markdown(f"### {model_name}")
-        st.dataframe(result_df.head(10), use_container_width=True)
+        st.dataframe(summary["preview"], use_container_width=True)
+        st.caption(f"Total data: **{summary['rows']:,} baris**")
+
+    # ========================================================
+    # BARIS DITOLAK VALIDASI
+    # ========================================================
+    first = next(iter(results.values()))
+    if first["rejected"]:
+        st.markdown("---")
+        st.subheader("🚫 Baris Ditolak Validasi")
+        st.warning(
+            f"**{first['rejected']:,} baris** tidak lolos validasi input "
+            "(tipe, nilai kosong, rentang, atau kategori) dan tidak diprediksi."
+        )
+
+        violations = pd.Series(first["violations"], name="jumlah").rename_axis(["kolom", "alasan"])
+        st.dataframe(violations.reset_index(), hide_index=True, use_container_width=True)
+
+        rejected_path = st.session_state.rejected_path
+        if rejected_path:
+            st.dataframe(pd.read_csv(rejected_path, nrows=PREVIEW_ROWS), hide_index=True, use_container_width=True)
+            with open(rejected_path, "rb") as f:
+                st.download_button(
+                    "Download laporan baris ditolak",
+                    f,
+                    file_name="rejected.csv",
+                    mime=RESULT_MIME_TYPES[".csv"],
+                )
 
     # ========================================================
     # DISTRIBUSI RISIKO
@@ -121,11 +300,11 @@ if results:
 
     cols = st.columns(len(results))
 
-    for col, (model_name, result_df) in zip(cols, results.items()):
+    for col, (model_name, summary) in zip(cols, results.items()):
         with col:
             st.markdown(f"### {model_name}")
 
-            risk_counts = result_df["prediction_label"].value_counts()
+            risk_counts = summary["counts"]
             high = int(risk_counts.get("Gagal Bayar", 0))
             low = int(risk_counts.get("Lancar Bayar", 0))
 
@@ -139,8 +318,8 @@ if results:
     st.markdown("---")
     st.subheader("📝 Interpretasi Risiko Kredit")
 
-    for model_name, result_df in results.items():
-        risk_counts = result_df["prediction_label"].value_counts()
+    for model_name, summary in results.items():
+        risk_counts = summary["counts"]
         high = int(risk_counts.get("Gagal Bayar", 0))
         low = int(risk_counts.get("Lancar Bayar", 0))
         total = high + low
@@ -158,20 +337,74 @@ if results:
             """
         )
 
+    # ========================================================
+    # PERFORMA RUN TERAKHIR
+    # ========================================================
+    run_metrics = st.session_state.run_metrics
+
+    if run_metrics:
+        st.markdown("---")
+        st.subheader("⏱️ Performa Run Terakhir")
+
+        stages = stage_frame(run_metrics)
+        total_rows = max(summary["rows"] for summary in results.values())
+        load_seconds = sum(
+            m["load_seconds"] or 0 for m in run_metrics["models"].values() if m["loaded"]
+        )
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Wall time", f"{run_metrics['wall_seconds']:.2f} s")
+        c2.metric("Throughput", f"{total_rows / run_metrics['wall_seconds']:,.0f} baris/s")
+        c3.metric("Puncak RSS", f"{run_metrics['memory']['peak_rss_bytes'] / 1e6:,.0f} MB")
+        c4.metric("Waktu muat model", f"{load_seconds:.2f} s")
+
+        stages["tahap"] = stages["stage"] + " · " + stages["model"]
+        st.bar_chart(stages.set_index("tahap")["seconds"], horizontal=True)
+        st.dataframe(
+            stages[["stage", "model", "calls", "seconds", "rows", "rows_per_sec", "share"]],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "seconds": st.column_config.NumberColumn("detik", format="%.3f"),
+                "rows_per_sec": st.column_config.NumberColumn("baris/detik", format="%,.0f"),
+                "share": st.column_config.ProgressColumn("porsi wall time", min_value=0, max_value=1),
+            },
+        )
+        st.caption(
+            "predict = waktu model per chunk (preprocess + forward); "
+            "read / label / merge / write = I/O dan pasca-proses."
+        )
+
+        d1, d2 = st.columns(2)
+        d1.download_button(
+            "Download metrik (JSON)",
+            json.dumps(run_metrics, indent=2),
+            file_name="batch_metrics.json",
+            mime="application/json",
+        )
+        d2.download_button(
+            "Download metrik (Prometheus)",
+            metrics.to_prometheus(run_metrics),
+            file_name="batch_metrics.prom",
+            mime="text/plain",
+        )
+
     # ========================================================
     # DOWNLOAD
     # ========================================================
     st.markdown("---")
     st.subheader("⬇️ Download Hasil")
 
-    for model_name, result_df in results.items():
-        csv = result_df.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            f"Download hasil {model_name}",
-            csv,
-            file_name=f"batch_prediction_{model_name.lower()}.csv",
-            mime="text/csv"
-        )
+    for model_name, summary in results.items():
+        if not os.path.exists(summary["path"]):
+            continue
+        with open(summary["path"], "rb") as f:
+            st.download_button(
+                f"Download hasil {model_name}",
+                f,
+                file_name=os.path.basename(summary["path"]),
+                mime=RESULT_MIME_TYPES[os.path.splitext(summary["path"])[1]]
+            )
 
 else:
     st.info("📌 Upload dataset dan jalankan prediksi untuk melihat hasil.")
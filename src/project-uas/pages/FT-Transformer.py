@@ -1,8 +1,9 @@
 # pages/FT-Transformer.py
 
 import streamlit as st
-import matplotlib.pyplot as plt
-from services.ft_transformer_service import FTTransformerService
+from services.base import predict_single
+from services.ft_transformer_service import load_categorical_options
+from utils.model_cache import get_model
 
 
 
@@ -33,16 +34,9 @@ FEATURE_LABELS = {
 }
 
 # =============================================================
-# Load Service (cached)
+# Opsi kategori (tanpa memuat model; model dimuat saat prediksi)
 # =============================================================
-@st.cache_resource
-def load_service():
-    return FTTransformerService(model_name="ft_transformer_model2")
-
-service = load_service()
-
-features = service.get_features()
-cat_options = service.get_categorical_options()
+cat_options = load_categorical_options()
 
 # =============================================================
 # UI Header
@@ -114,10 +108,13 @@ with st.form("ft_form", clear_on_submit=False):
 # Prediction Result
 # =============================================================
 if submitted:
+    import matplotlib.pyplot as plt  # diimpor saat grafik pertama kali dibutuhkan
+
     try:
-        pred_class, probs = service.predict(input_data)
-        proba_lancar = float(probs[0])
-        proba_gagal = float(probs[1])
+        service = get_model("ft")  # dimuat sekali per proses (warm pool bersama)
+        # Lewat predict_proba service agar memakai cache prediksi (jika aktif)
+        pred_class, proba_gagal = predict_single(service, input_data)
+        proba_lancar = 1 - proba_gagal
 
         st.subheader("🔎 Hasil Prediksi")
 
@@ -1,8 +1,8 @@
 # src/pages/mlp_page.py
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from services.mlp_service import predict_mlp_risk  # backend MLP service
+from utils.model_cache import get_model
 
 
 
@@ -64,6 +64,9 @@ input_data = pd.DataFrame({
 # Prediksi & Visualisasi
 # =============================================================
 if submit_btn:
+    import matplotlib.pyplot as plt  # diimpor saat grafik pertama kali dibutuhkan
+
+    get_model("mlp")  # model dimuat sekali per proses (warm pool bersama)
     result, proba = predict_mlp_risk(input_data)
     proba_gagal = proba[0]
     proba_lancar = 1 - proba_gagal
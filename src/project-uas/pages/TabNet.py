@@ -1,10 +1,10 @@
 # src/pages/tabnet_page.py
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from services.tabnet_service import predict_tabnet_risk
-# from utils.load_css import load_css
-# load_css()  # otomatis load utils/style.css
+from utils.model_cache import get_model
+from utils.load_css import load_css
+load_css()  # otomatis load utils/style.css
 
 
 
@@ -66,6 +66,9 @@ input_data = pd.DataFrame({
 # Prediksi & Visualisasi
 # =============================================================
 if submit_btn:
+    import matplotlib.pyplot as plt  # diimpor saat grafik pertama kali dibutuhkan
+
+    get_model("tabnet")  # model dimuat sekali per proses (warm pool bersama)
     result, proba = predict_tabnet_risk(input_data)
     proba_gagal = proba[0]
     proba_lancar = 1 - proba_gagal
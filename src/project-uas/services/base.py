@@ -0,0 +1,146 @@
+# services/base.py
+import os
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+import pandas as pd
+
+from services.instrumentation import span
+
+
+# =============================================================
+# Skema fitur (urutan sama dengan form input & dataset)
+# =============================================================
+NUMERICAL_FEATURES = [
+    "person_age",
+    "person_income",
+    "person_emp_length",
+    "loan_amnt",
+    "loan_int_rate",
+    "loan_percent_income",
+    "cb_person_cred_hist_length",
+]
+
+CATEGORICAL_FEATURES = [
+    "person_home_ownership",
+    "loan_intent",
+    "loan_grade",
+    "cb_person_default_on_file",
+]
+
+FEATURE_COLUMNS = [
+    "person_age",
+    "person_income",
+    "person_home_ownership",
+    "person_emp_length",
+    "loan_intent",
+    "loan_grade",
+    "loan_amnt",
+    "loan_int_rate",
+    "loan_percent_income",
+    "cb_person_default_on_file",
+    "cb_person_cred_hist_length",
+]
+
+DEFAULT_BATCH_SIZE = 4_096
+DEFAULT_THRESHOLD = 0.5
+LABELS = np.array(["Lancar Bayar", "Gagal Bayar"], dtype=object)
+
+
+# =============================================================
+# Kontrak service model
+# =============================================================
+@runtime_checkable
+class ModelService(Protocol):
+    """
+    Kontrak bersama MLP, TabNet dan FT-Transformer.
+
+    predict_proba(X) menerima DataFrame fitur mentah (atau ndarray dengan
+    urutan FEATURE_COLUMNS) dan mengembalikan ndarray shape (n,) berisi
+    probabilitas gagal bayar.
+    """
+
+    name: str
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE) -> np.ndarray:
+        ...
+
+
+def resolve_backend(model_name, backend=None, choices=("torch", "onnx")):
+    """
+    Backend inference sebuah service: argumen `backend`, lalu env var
+    {MODEL}_BACKEND (mis. FT_BACKEND=onnx), lalu choices[0] sebagai default.
+    """
+    backend = backend or os.environ.get(f"{model_name.upper()}_BACKEND") or choices[0]
+    if backend not in choices:
+        raise ValueError(f"{model_name}: backend must be one of {choices}, got '{backend}'")
+    return backend
+
+
+def to_frame(X):
+    """DataFrame dibiarkan apa adanya; ndarray/list/dict diberi nama kolom fitur."""
+    if isinstance(X, pd.DataFrame):
+        return X
+    if isinstance(X, dict):
+        return pd.DataFrame([X])
+    return pd.DataFrame(
+        np.asarray(X, dtype=object), columns=FEATURE_COLUMNS
+    ).infer_objects()
+
+
+# =============================================================
+# Thresholding & labeling (vektor, dipakai semua model)
+# =============================================================
+def label_predictions(df: pd.DataFrame, probs, threshold=DEFAULT_THRESHOLD):
+    probs = np.asarray(probs).reshape(-1)
+    preds = (probs >= threshold).astype(int)
+
+    df_out = df.copy()
+    df_out["prediction"] = preds
+    df_out["prob_gagal_bayar"] = probs
+    df_out["prediction_label"] = LABELS[preds]
+
+    return df_out
+
+
+def predict_in_stages(service, X, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    predict_proba standar: service.preprocess() lalu service.predict_prepared(),
+    masing-masing dicatat sebagai span "preprocess" / "forward"
+    (services/instrumentation.py).
+    """
+    with span("preprocess", service.name) as stage:
+        arrays = service.preprocess(X)
+        stage.rows = len(arrays[0])
+    with span("forward", service.name, rows=stage.rows):
+        return service.predict_prepared(*arrays, batch_size=batch_size)
+
+
+def predict_batch(
+    service, df, batch_size=DEFAULT_BATCH_SIZE, threshold=DEFAULT_THRESHOLD, top_k=0, validate=False
+):
+    """
+    top_k > 0 : tambahkan reason code reason_1..k per baris
+                (services/explain.py)
+    validate  : hanya baris yang lolos validasi skema (services/validation.py)
+                yang dinilai; index asli dipertahankan
+    """
+    df = to_frame(df)
+    if validate:
+        from services import validation
+        df = df[validation.validate(df, validation.model_schema(service)).valid]
+    probs = service.predict_proba(df, batch_size=batch_size)
+    df_out = label_predictions(df, probs, threshold)
+    if top_k:
+        from services.explain import add_reason_codes
+        add_reason_codes(df_out, service, df, top_k)
+    return df_out
+
+
+def predict_single(service, input_data, threshold=DEFAULT_THRESHOLD):
+    """
+    input_data : dict atau DataFrame 1 baris
+    return : tuple(pred, proba_gagal)
+    """
+    proba_gagal = float(service.predict_proba(to_frame(input_data))[0])
+    return int(proba_gagal >= threshold), proba_gagal
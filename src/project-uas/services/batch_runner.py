@@ -0,0 +1,190 @@
+# services/batch_runner.py
+"""
+Batch scoring data-parallel: chunk input dibagi ke N worker process.
+
+Berbeda dengan ModelExecutor mode "process" (satu task per model per
+chunk), setiap worker di sini memuat *semua* model sekali lalu menilai
+chunk utuh; hasil dikembalikan sesuai urutan chunk input.
+
+Start method:
+    fork       : model dimuat di proses induk sebelum pool dibuat, worker
+                 mewarisi bobot + heap framework (torch, ONNX Runtime,
+                 NumPy) secara copy-on-write tanpa memuat ulang. Tidak
+                 dipakai jika TensorFlow sudah aktif (tidak fork-safe).
+    forkserver / spawn : worker bersih, tiap worker memuat model sendiri.
+
+Jumlah thread intra-op per worker dibatasi (default 1) agar N worker tidak
+saling berebut core.
+"""
+import multiprocessing
+import os
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from services.base import DEFAULT_BATCH_SIZE
+from services.executor import _open_prepared, prepare_features
+from services.registry import registry
+
+
+START_METHODS = ("fork", "forkserver", "spawn")
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "FT_INTRA_OP_THREADS")
+
+
+# =============================================================
+# Worker
+# =============================================================
+def _init_worker(model_names, threads):
+    # spawn/forkserver: batasi thread sebelum torch/TF diimpor
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    # fork: torch sudah diimpor di proses induk
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+    registry.load(*model_names)
+
+
+def _score_chunk(models, features, prepared_path, rows, batch_size):
+    """return : dict nama hasil -> (probs, detik forward pass)"""
+    prepared = _open_prepared(prepared_path) if prepared_path else None
+    results = {}
+
+    for name, model_name in models.items():
+        service = registry.get(model_name)
+        start = time.perf_counter()
+        if prepared is not None:
+            arrays = [array[rows] for array in prepared.arrays(service.name)]
+            probs = service.predict_prepared(*arrays, batch_size=batch_size)
+        else:
+            probs = service.predict_proba(features, batch_size=batch_size)
+        results[name] = (probs, time.perf_counter() - start)
+
+    return results
+
+
+def _worker_pid(_):
+    time.sleep(0.05)        # beri kesempatan worker lain mengambil task
+    return os.getpid()
+
+
+# =============================================================
+# Runner
+# =============================================================
+class ParallelBatchRunner:
+    """
+    Process pool untuk scoring chunk secara paralel.
+
+    models            : dict nama hasil -> nama model di registry
+    workers           : jumlah worker process (default os.cpu_count())
+    start_method      : lihat START_METHODS (default fork jika tersedia)
+    threads_per_worker: thread intra-op torch/OpenMP per worker
+    prepared          : PreparedDataset opsional; chunk dari
+                        prepared.iter_chunks() dikirim sebagai slice baris
+    max_pending       : chunk maksimum yang sedang diproses/antre
+                        (default 2 × workers, membatasi memori)
+    """
+
+    def __init__(
+        self,
+        models: dict,
+        workers=None,
+        start_method=None,
+        threads_per_worker=1,
+        prepared=None,
+        max_pending=None,
+    ):
+        if not all(isinstance(m, str) for m in models.values()):
+            raise ValueError("ParallelBatchRunner requires registry model names, not service objects")
+
+        self.models = dict(models)
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.threads_per_worker = threads_per_worker
+        self.prepared = prepared
+        self.max_pending = max_pending or 2 * self.workers
+        self.start_method = self._resolve_start_method(start_method)
+        self.load_seconds = 0.0
+        self._pool = None
+
+    def _resolve_start_method(self, start_method):
+        available = multiprocessing.get_all_start_methods()
+        if start_method is None:
+            start_method = "fork" if "fork" in available else "spawn"
+        if start_method not in START_METHODS:
+            raise ValueError(f"start_method must be one of {START_METHODS}, got '{start_method}'")
+        if start_method not in available:
+            raise ValueError(f"start_method '{start_method}' is not available on this platform")
+
+        if start_method == "fork":
+            # Dimuat sekali di induk → diwarisi worker (copy-on-write)
+            registry.load(*self.models.values())
+            if "tensorflow" in sys.modules:
+                warnings.warn(
+                    "TensorFlow is loaded in this process and is not fork-safe; "
+                    "falling back to spawn (use MLP_BACKEND=numpy or onnx to share weights)",
+                    RuntimeWarning,
+                )
+                start_method = "spawn"
+
+        return start_method
+
+    def _get_pool(self):
+        if self._pool is None:
+            start = time.perf_counter()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(list(self.models.values()), self.threads_per_worker),
+            )
+            # Paksa semua worker hidup & memuat model sebelum scoring dimulai
+            list(self._pool.map(_worker_pid, range(self.workers)))
+            self.load_seconds = time.perf_counter() - start
+        return self._pool
+
+    def worker_pids(self):
+        return [p.pid for p in (self._pool._processes or {}).values()] if self._pool else []
+
+    # =====================================================
+    # PREDIKSI
+    # =====================================================
+    def _submit(self, pool, chunk, batch_size):
+        rows = self.prepared.rows_of(chunk) if self.prepared is not None else None
+        if rows is not None:
+            # Worker membaca matriks .npy sendiri (memory map), cukup kirim slice
+            return pool.submit(_score_chunk, self.models, None, self.prepared.path, rows, batch_size)
+        return pool.submit(_score_chunk, self.models, prepare_features(chunk), None, None, batch_size)
+
+    def map(self, chunks, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Generator (chunk, dict nama hasil -> (probs, detik)) sesuai urutan
+        input, dengan maksimal `max_pending` chunk sedang diproses.
+        """
+        pool = self._get_pool()
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append((chunk, self._submit(pool, chunk, batch_size)))
+            if len(pending) >= self.max_pending:
+                chunk_done, future = pending.popleft()
+                yield chunk_done, future.result()
+
+        while pending:
+            chunk_done, future = pending.popleft()
+            yield chunk_done, future.result()
+
+    # =====================================================
+    # LIFECYCLE
+    # =====================================================
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
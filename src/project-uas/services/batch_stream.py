@@ -0,0 +1,427 @@
+# services/batch_stream.py
+import os
+
+import pandas as pd
+
+from services.base import DEFAULT_BATCH_SIZE, DEFAULT_THRESHOLD, label_predictions
+from services.batch_runner import ParallelBatchRunner
+from services.executor import EXECUTOR_MODES, ModelExecutor
+from services.instrumentation import metrics, span, timed_chunks
+from services.registry import registry
+from services.validation import ChunkValidator, merge_schemas, model_schema
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+PREVIEW_ROWS = 10
+
+OUTPUT_COLUMNS = ["prediction", "prob_gagal_bayar", "prediction_label"]
+
+# Mode ModelExecutor + "pool" (chunk dibagi ke N worker, services.batch_runner)
+STREAM_MODES = EXECUTOR_MODES + ("pool",)
+
+
+# =============================================================
+# Input: CSV / Parquet / Arrow IPC dibaca per chunk
+# =============================================================
+def input_format(source):
+    """Ekstensi file input (path atau file upload dengan atribut name)."""
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext not in INPUT_READERS:
+        raise ValueError(
+            f"Unsupported input format '{ext}', "
+            f"expected one of {sorted(INPUT_READERS)}"
+        )
+    return ext
+
+
+def _check_columns(available, columns):
+    missing = [col for col in columns or [] if col not in available]
+    if missing:
+        raise ValueError(f"Missing input columns: {missing}")
+
+
+def iter_csv_chunks(source, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+    """
+    Generator DataFrame dari file CSV (path atau file-like),
+    masing-masing maksimal `chunksize` baris.
+
+    columns : hanya kolom ini yang di-parse (None = semua kolom)
+    """
+    usecols = None if columns is None else lambda col: col in columns
+    with pd.read_csv(source, chunksize=chunksize, usecols=usecols) as reader:
+        for chunk in reader:
+            _check_columns(chunk.columns, columns)
+            yield chunk[list(columns)] if columns is not None else chunk
+
+
+def _iter_arrow_tables(batches, chunksize):
+    """Gabung/potong RecordBatch Arrow menjadi Table berukuran `chunksize`."""
+    import pyarrow as pa
+
+    pending, pending_rows = [], 0
+    for batch in batches:
+        while batch.num_rows:
+            take = min(chunksize - pending_rows, batch.num_rows)
+            pending.append(batch.slice(0, take))
+            pending_rows += take
+            batch = batch.slice(take)
+            if pending_rows == chunksize:
+                yield pa.Table.from_batches(pending)
+                pending, pending_rows = [], 0
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+
+def iter_parquet_chunks(source, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+    """
+    Generator DataFrame dari file Parquet (butuh pyarrow).
+
+    Hanya kolom `columns` yang dibaca dari disk (column pruning) dan
+    row group dibaca bertahap, bukan seluruh file sekaligus.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    _check_columns(parquet_file.schema_arrow.names, columns)
+    batches = parquet_file.iter_batches(batch_size=chunksize, columns=columns)
+    for table in _iter_arrow_tables(batches, chunksize):
+        yield table.to_pandas()
+
+
+def iter_arrow_chunks(source, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+    """
+    Generator DataFrame dari file Arrow IPC (format file/Feather v2 atau
+    stream). Format file dibaca lewat memory map bila source berupa path.
+    """
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(str(source))
+    try:
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        source.seek(0)
+        reader = pa.ipc.open_stream(source)
+        batches = iter(reader)
+
+    _check_columns(reader.schema.names, columns)
+    if columns is not None:
+        batches = (batch.select(columns) for batch in batches)
+    for table in _iter_arrow_tables(batches, chunksize):
+        yield table.to_pandas()
+
+
+INPUT_READERS = {
+    ".csv": iter_csv_chunks,
+    ".parquet": iter_parquet_chunks,
+    ".arrow": iter_arrow_chunks,
+    ".feather": iter_arrow_chunks,
+    ".ipc": iter_arrow_chunks,
+}
+
+
+def iter_input_chunks(source, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+    """Pilih reader berdasarkan ekstensi file input (lihat INPUT_READERS)."""
+    return INPUT_READERS[input_format(source)](source, chunksize, columns)
+
+
+def read_preview(source, nrows=PREVIEW_ROWS):
+    """Beberapa baris pertama file input (semua kolom) untuk preview."""
+    preview = next(iter_input_chunks(source, chunksize=nrows), pd.DataFrame())
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return preview
+
+
+def iter_batches(n_rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Generator slice(start, stop) untuk forward pass per batch."""
+    batch_size = max(1, int(batch_size or n_rows or 1))
+    for start in range(0, n_rows, batch_size):
+        yield slice(start, min(start + batch_size, n_rows))
+
+
+# =============================================================
+# Output: hasil ditulis ke disk per chunk
+# =============================================================
+class CsvResultWriter:
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetResultWriter(CsvResultWriter):
+    """
+    Tulis hasil sebagai Parquet secara streaming (butuh pyarrow): setiap
+    chunk menjadi row group sendiri (maksimal `row_group_size` baris),
+    sehingga file tidak pernah dibangun utuh di memori.
+    """
+
+    def __init__(self, path, row_group_size=None):
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        self._writer = None
+        self._schema = None
+
+    def _table(self, df: pd.DataFrame):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._schema is None:
+            self._schema = table.schema
+        elif table.schema != self._schema:
+            table = table.cast(self._schema)
+        return table
+
+    def _open(self, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.path, schema)
+
+    def write(self, df: pd.DataFrame):
+        table = self._table(df)
+        if self._writer is None:
+            self._writer = self._open(table.schema)
+
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ArrowResultWriter(ParquetResultWriter):
+    """Tulis hasil sebagai file Arrow IPC (Feather v2), satu record batch per chunk."""
+
+    def _open(self, schema):
+        import pyarrow as pa
+
+        return pa.ipc.new_file(self.path, schema)
+
+    def write(self, df: pd.DataFrame):
+        table = self._table(df)
+        if self._writer is None:
+            self._writer = self._open(table.schema)
+
+        self._writer.write_table(table, max_chunksize=self.row_group_size)
+        self.rows += len(df)
+
+
+RESULT_WRITERS = {
+    ".csv": CsvResultWriter,
+    ".parquet": ParquetResultWriter,
+    ".arrow": ArrowResultWriter,
+    ".feather": ArrowResultWriter,
+    ".ipc": ArrowResultWriter,
+}
+
+RESULT_MIME_TYPES = {
+    ".csv": "text/csv",
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrow": "application/vnd.apache.arrow.file",
+    ".feather": "application/vnd.apache.arrow.file",
+    ".ipc": "application/vnd.apache.arrow.file",
+}
+
+
+def open_writer(path):
+    """Pilih writer berdasarkan ekstensi file output."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in RESULT_WRITERS:
+        raise ValueError(
+            f"Unsupported output format '{ext}', "
+            f"expected one of {sorted(RESULT_WRITERS)}"
+        )
+    return RESULT_WRITERS[ext](path)
+
+
+def merge_outputs(chunk: pd.DataFrame, outputs: dict):
+    """
+    Gabungkan hasil beberapa model menjadi satu frame:
+    kolom input + kolom hasil dengan prefix nama model.
+    """
+    if len(outputs) == 1:
+        return next(iter(outputs.values()))
+
+    merged = chunk.copy()
+    for name, df_out in outputs.items():
+        # OUTPUT_COLUMNS + reason code (jika ada), semuanya setelah kolom input
+        for col in df_out.columns[chunk.shape[1]:]:
+            merged[f"{name}_{col}"] = df_out[col].to_numpy()
+
+    return merged
+
+
+# =============================================================
+# Pipeline streaming
+# =============================================================
+def stream_predict(
+    chunks,
+    services: dict,
+    writers: dict = None,
+    merged_writer=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    threshold=DEFAULT_THRESHOLD,
+    on_chunk=None,
+    mode="serial",
+    max_workers=None,
+    prepared=None,
+    top_k=0,
+    validate=True,
+    rejected_writer=None,
+):
+    """
+    Jalankan setiap model pada setiap chunk dan langsung tulis hasilnya.
+
+    chunks        : iterable DataFrame (mis. iter_input_chunks(...))
+    services      : dict nama model -> ModelService atau nama registry
+    writers       : dict nama model -> writer dengan method write(df)
+    merged_writer : writer opsional untuk satu file gabungan semua model
+    on_chunk      : callback opsional(rows_done) dipanggil setelah tiap chunk
+    mode          : cara menjalankan model per chunk ("serial", "thread",
+                    "process"), lihat services.executor.ModelExecutor;
+                    "pool" = chunk dinilai paralel oleh `max_workers`
+                    worker, lihat services.batch_runner.ParallelBatchRunner
+    prepared      : PreparedDataset opsional; chunks berasal dari
+                    prepared.iter_chunks() (lihat services/prepared_dataset.py)
+    top_k         : jika > 0, tambahkan reason code reason_1..k per baris
+                    (services/explain.py, model yang mendukung saja);
+                    atribusi dihitung di proses ini
+    validate      : validasi skema input (services/validation.py, aturan
+                    paling ketat dari semua model) sebelum inference; baris
+                    tidak valid tidak dikirim ke model
+    rejected_writer : writer opsional untuk laporan baris yang ditolak
+                    (row, column, reason, value, expected)
+
+    Waktu tiap tahap (read, validate, predict, label, explain, merge, write) dicatat ke
+    services.instrumentation.metrics.
+
+    return : dict nama model -> ringkasan
+        rows    : jumlah baris yang diprediksi
+        rejected: jumlah baris input yang ditolak validasi
+        violations : dict (kolom, alasan) -> jumlah pelanggaran validasi
+        seconds : total waktu prediksi model (detik)
+        counts  : pandas.Series jumlah per prediction_label
+        preview : DataFrame beberapa baris pertama hasil prediksi
+        path    : lokasi file hasil
+    """
+    writers = writers or {}
+    summary = {
+        name: {
+            "rows": 0,
+            "rejected": 0,
+            "violations": {},
+            "seconds": 0.0,
+            "counts": pd.Series(dtype="int64"),
+            "preview": None,
+            "path": getattr(writers.get(name, merged_writer), "path", None),
+        }
+        for name in services
+    }
+    rows_done = 0
+
+    def scored_chunks(chunks):
+        """Chunk kosong (semua baris ditolak) tidak dikirim ke model, cukup dihitung."""
+        nonlocal rows_done
+        for chunk in chunks:
+            if len(chunk):
+                yield chunk
+                continue
+            rows_done += chunk.attrs.get("input_rows", 0)
+            if on_chunk is not None:
+                on_chunk(rows_done)
+
+    validator = None
+    if validate:
+        # model_schema menerima nama registry: skema dibaca tanpa memuat model
+        schema = merge_schemas(model_schema(service) for service in services.values())
+        validator = ChunkValidator(schema, rejected_writer)
+        chunks = validator(timed_chunks(chunks))
+    else:
+        chunks = timed_chunks(chunks)
+
+    explained = {}
+    if top_k:
+        from services.explain import add_reason_codes, supports_explain
+        for name, service in services.items():
+            service = registry.get(service) if isinstance(service, str) else service
+            if supports_explain(service):
+                explained[name] = service
+
+    # Writer selalu ditutup (footer Parquet/Arrow, file handle), juga bila
+    # sebuah chunk gagal di tengah run
+    try:
+        if mode == "pool":
+            executor = ParallelBatchRunner(services, workers=max_workers, prepared=prepared)
+        else:
+            executor = ModelExecutor(services, mode=mode, max_workers=max_workers, prepared=prepared)
+
+        with executor:
+            for chunk, results in executor.map(scored_chunks(chunks), batch_size):
+                outputs = {}
+
+                for name, (probs, elapsed) in results.items():
+                    metrics.record("predict", elapsed, len(chunk), model=name)
+                    with span("label", name, rows=len(chunk)):
+                        df_out = label_predictions(chunk, probs, threshold)
+                    if name in explained:
+                        add_reason_codes(df_out, explained[name], chunk, top_k)
+
+                    if name in writers:
+                        with span("write", name, rows=len(df_out)):
+                            writers[name].write(df_out)
+                    outputs[name] = df_out
+
+                    info = summary[name]
+                    info["rows"] += len(df_out)
+                    info["seconds"] += elapsed
+                    info["counts"] = info["counts"].add(
+                        df_out["prediction_label"].value_counts(), fill_value=0
+                    ).astype("int64")
+                    if info["preview"] is None:
+                        info["preview"] = df_out.head(PREVIEW_ROWS)
+
+                if merged_writer is not None:
+                    if len(outputs) > 1:
+                        with span("merge", rows=len(chunk)):
+                            merged = merge_outputs(chunk, outputs)
+                    else:
+                        merged = merge_outputs(chunk, outputs)
+                    with span("write", rows=len(merged)):
+                        merged_writer.write(merged)
+
+                rows_done += chunk.attrs.get("input_rows", len(chunk))
+                if on_chunk is not None:
+                    on_chunk(rows_done)
+
+        if validator is not None:
+            for info in summary.values():
+                info["rejected"] = validator.rows_rejected
+                info["violations"] = dict(validator.violations)
+    finally:
+        for writer in list(writers.values()) + [merged_writer, rejected_writer]:
+            if writer is not None:
+                with span("write"):
+                    writer.close()
+
+    return summary
@@ -0,0 +1,238 @@
+# services/ensemble_service.py
+"""
+Ensemble MLP + TabNet + FT-Transformer sebagai satu ModelService.
+
+Per chunk:
+    1. parsing fitur sekali (FastPreprocessor.parse: nilai numerik mentah +
+       kode kategori) untuk semua anggota dengan kolom & kategori yang sama;
+       tiap anggota hanya menerapkan imputasi/scaling miliknya
+    2. forward pass tiap anggota → matriks probabilitas (n, n_model)
+    3. combine vektor menjadi satu prob_gagal_bayar:
+         mean      rata-rata berbobot
+         max       max-risk (probabilitas anggota tertinggi)
+         stacking  regresi logistik atas logit probabilitas anggota
+
+Konfigurasi di models/ensemble_credit_risk/ensemble.json; metode dapat
+diganti lewat env ENSEMBLE_METHOD. Bobot stacking di-fit dari data berlabel
+(sebaiknya data yang tidak dipakai melatih model anggota):
+    python -m services.ensemble_service --fit validasi.csv --label loan_status
+"""
+import argparse
+import functools
+import json
+import os
+
+import numpy as np
+
+from services.base import (
+    DEFAULT_BATCH_SIZE,
+    predict_batch,
+    predict_in_stages,
+    predict_single,
+    to_frame,
+)
+from services.registry import registry
+
+
+# =============================================================
+# Path konfigurasi
+# =============================================================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "models", "ensemble_credit_risk")
+CONFIG_PATH = os.path.join(MODEL_DIR, "ensemble.json")
+
+COMBINE_METHODS = ("mean", "max", "stacking")
+PROB_EPS = 1e-6
+
+
+# =============================================================
+# Combine (vektor, seluruh chunk sekaligus)
+# =============================================================
+def logit(P):
+    P = np.clip(P, PROB_EPS, 1 - PROB_EPS)
+    return np.log(P) - np.log1p(-P)
+
+
+def combine(P, method="mean", weights=None, stacking=None):
+    """
+    P : ndarray (n, n_model) probabilitas gagal bayar per anggota
+    return : ndarray (n,) float32
+    """
+    if method == "max":
+        # Per kolom (n_model kecil) jauh lebih cepat dari P.max(axis=1)
+        return functools.reduce(np.maximum, P.T)
+    if method == "stacking":
+        z = logit(P) @ np.asarray(stacking["coef"], dtype=np.float32) + np.float32(stacking["intercept"])
+        return (0.5 * (1 + np.tanh(0.5 * z))).astype(np.float32)
+    if weights is None:
+        return P.mean(axis=1)
+    weights = np.asarray(weights, dtype=np.float32)
+    return P @ (weights / weights.sum())
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+# =============================================================
+# Service Ensemble (implementasi ModelService)
+# =============================================================
+class EnsembleService:
+    name = "ensemble"
+
+    def __init__(self, method=None, config_path=CONFIG_PATH):
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Ensemble config not found: {config_path}")
+
+        self.config_path = config_path
+        self.model_dir = os.path.dirname(config_path)
+        config = load_config(config_path)
+
+        # Anggota diambil dari registry tanpa cache prediksi: yang di-cache
+        # adalah hasil ensemble (versi ikut hash artifact anggota)
+        self.members = [
+            getattr(member, "service", member)
+            for member in map(registry.get, config["members"])
+        ]
+        self.member_names = [member.name for member in self.members]
+
+        self.method = method or os.environ.get("ENSEMBLE_METHOD") or config["method"]
+        if self.method not in COMBINE_METHODS:
+            raise ValueError(f"ensemble method must be one of {COMBINE_METHODS}, got '{self.method}'")
+        self.weights = [config["weights"][name] for name in self.member_names]
+        self.stacking = config.get("stacking")
+        if self.method == "stacking" and not self.stacking:
+            raise ValueError(
+                "Stacking weights are not fitted; run "
+                "python -m services.ensemble_service --fit <file> --label <column>"
+            )
+
+        self.backend = ",".join(f"{m.name}={getattr(m, 'backend', '-')}" for m in self.members)
+        self.n_inputs = sum(member.n_inputs for member in self.members)
+        self.preprocessor_files = tuple(
+            path for member in self.members for path in member.preprocessor_files
+        )
+        # Anggota dengan parse_key sama memakai satu hasil parse per chunk
+        self._parse_keys = [
+            member.fast_preprocessor.parse_key() if member.fast_preprocessor is not None else None
+            for member in self.members
+        ]
+
+    # =====================================================
+    # PREPROCESS (parsing bersama)
+    # =====================================================
+    def preprocess(self, X):
+        """Input mentah → gabungan tuple matriks semua anggota (urut members)."""
+        df = to_frame(X)
+        parsed = {}
+        arrays = []
+
+        for member, key in zip(self.members, self._parse_keys):
+            if key is None:
+                arrays.extend(member.preprocess(df))
+                continue
+            if key not in parsed:
+                parsed[key] = member.fast_preprocessor.parse(df)
+            arrays.extend(member.preprocess_parsed(*parsed[key]))
+
+        return tuple(arrays)
+
+    # =====================================================
+    # PROBABILITAS
+    # =====================================================
+    def member_probs_prepared(self, *arrays, batch_size=DEFAULT_BATCH_SIZE):
+        """return : ndarray (n, n_model) float32 probabilitas tiap anggota"""
+        P = np.empty((len(arrays[0]), len(self.members)), dtype=np.float32)
+        start = 0
+        for j, member in enumerate(self.members):
+            inputs = arrays[start:start + member.n_inputs]
+            P[:, j] = member.predict_prepared(*inputs, batch_size=batch_size)
+            start += member.n_inputs
+        return P
+
+    def member_probs(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        return self.member_probs_prepared(*self.preprocess(X), batch_size=batch_size)
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        return predict_in_stages(self, X, batch_size)
+
+    def predict_prepared(self, *arrays, batch_size=DEFAULT_BATCH_SIZE):
+        P = self.member_probs_prepared(*arrays, batch_size=batch_size)
+        return combine(P, self.method, self.weights, self.stacking)
+
+
+# Model dimuat lazy & di-cache oleh registry
+registry.register("ensemble", EnsembleService)
+
+
+def get_ensemble_service():
+    return registry.get("ensemble")
+
+
+def predict_ensemble_risk(input_df):
+    """
+    input_df : pandas.DataFrame (1 row)
+    return : tuple(pred_label, probas)
+    """
+    pred, proba_gagal = predict_single(get_ensemble_service(), input_df)
+
+    return [pred], [proba_gagal]
+
+
+def predict_ensemble_batch(df, batch_size=DEFAULT_BATCH_SIZE):
+    return predict_batch(get_ensemble_service(), df, batch_size=batch_size)
+
+
+# =============================================================
+# Fit bobot stacking
+# =============================================================
+def fit_stacking(P, y):
+    """Regresi logistik atas logit probabilitas anggota → dict coef & intercept."""
+    from sklearn.linear_model import LogisticRegression
+
+    stacker = LogisticRegression().fit(logit(P), y)
+    return {"coef": stacker.coef_[0].tolist(), "intercept": float(stacker.intercept_[0])}
+
+
+def main():
+    import pandas as pd
+    from sklearn.metrics import roc_auc_score
+
+    from services.batch_stream import DEFAULT_CHUNK_SIZE, iter_input_chunks
+
+    parser = argparse.ArgumentParser(description="Fit bobot stacking ensemble dari data berlabel.")
+    parser.add_argument("--fit", required=True, help="file berlabel (CSV / Parquet / Arrow)")
+    parser.add_argument("--label", default="loan_status")
+    parser.add_argument("--method", choices=COMBINE_METHODS, help="metode default baru di ensemble.json")
+    args = parser.parse_args()
+
+    df = pd.concat(iter_input_chunks(args.fit, DEFAULT_CHUNK_SIZE), ignore_index=True)
+    df = df[df[args.label].notna()]
+    y = df[args.label].to_numpy(dtype=int)
+
+    ensemble = EnsembleService(method="mean")
+    P = ensemble.member_probs(df)
+    # Baris dengan probabilitas NaN (mis. fitur kosong di FT-Transformer) tidak dipakai
+    valid = np.isfinite(P).all(axis=1)
+    P, y = P[valid], y[valid]
+    print(f"baris    : {valid.sum():,} dipakai, {(~valid).sum():,} dilewati (probabilitas NaN)")
+
+    config = load_config()
+    config["stacking"] = fit_stacking(P, y)
+    if args.method:
+        config["method"] = args.method
+    with open(CONFIG_PATH, "w") as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+
+    scores = {name: P[:, j] for j, name in enumerate(ensemble.member_names)}
+    for method in COMBINE_METHODS:
+        scores[f"ensemble:{method}"] = combine(P, method, ensemble.weights, config["stacking"])
+    print(pd.Series({name: roc_auc_score(y, probs) for name, probs in scores.items()}, name="ROC AUC").to_string())
+    print(f"\nstacking : {config['stacking']}")
+    print(f"disimpan : {CONFIG_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# services/executor.py
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from services.base import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_THRESHOLD,
+    FEATURE_COLUMNS,
+    label_predictions,
+    to_frame,
+)
+from services.registry import registry
+
+
+EXECUTOR_MODES = ("serial", "thread", "process")
+
+
+def prepare_features(df):
+    """Parsing bersama sekali per chunk: hanya kolom fitur yang dikirim ke model."""
+    df = to_frame(df)
+    return df[FEATURE_COLUMNS]
+
+
+def _timed_predict(service, features, batch_size, prepared=None):
+    start = time.perf_counter()
+    if prepared is not None:
+        probs = prepared.predict_proba(service, features, batch_size=batch_size)
+    else:
+        probs = service.predict_proba(features, batch_size=batch_size)
+    return probs, time.perf_counter() - start
+
+
+def _process_predict(model_name, features, batch_size):
+    # Dijalankan di worker process: model dimuat sekali per worker via registry
+    return _timed_predict(registry.get(model_name), features, batch_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _open_prepared(path):
+    from services.prepared_dataset import PreparedDataset
+    return PreparedDataset(path)
+
+
+def _process_predict_prepared(model_name, prepared_path, rows, batch_size):
+    # Worker hanya menerima slice baris; matriks dibaca lewat memory map
+    service = registry.get(model_name)
+    arrays = [array[rows] for array in _open_prepared(prepared_path).arrays(service.name)]
+
+    start = time.perf_counter()
+    probs = service.predict_prepared(*arrays, batch_size=batch_size)
+    return probs, time.perf_counter() - start
+
+
+class ModelExecutor:
+    """
+    Jalankan beberapa model pada input yang sama.
+
+    models : dict nama hasil -> ModelService atau nama model di registry
+    mode   : "serial"  → berurutan di thread pemanggil
+             "thread"  → satu thread per model (torch & TensorFlow melepas
+                         GIL selama forward pass)
+             "process" → process pool; model dimuat di tiap worker,
+                         sehingga nilai `models` harus berupa nama registry
+    prepared : PreparedDataset opsional (services/prepared_dataset.py);
+               chunk dari prepared.iter_chunks() diprediksi dari matriks
+               .npy tersimpan tanpa preprocess ulang
+    """
+
+    def __init__(self, models: dict, mode="thread", max_workers=None, prepared=None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"mode must be one of {EXECUTOR_MODES}, got '{mode}'")
+        if mode == "process" and not all(isinstance(m, str) for m in models.values()):
+            raise ValueError("process mode requires registry model names, not service objects")
+
+        self.models = dict(models)
+        self.mode = mode
+        self.max_workers = max_workers or len(self.models)
+        self.prepared = prepared
+        self._pool = None
+
+    @property
+    def names(self):
+        return list(self.models)
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                # spawn: hindari fork setelah TensorFlow/torch aktif di parent
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._pool
+
+    def _resolve(self, model):
+        return registry.get(model) if isinstance(model, str) else model
+
+    # =====================================================
+    # PREDIKSI
+    # =====================================================
+    def predict_proba(self, df, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        return : dict nama hasil -> (probs, detik forward pass)
+        """
+        features = prepare_features(df)
+        prepared = self.prepared
+
+        if self.mode == "serial":
+            return {
+                name: _timed_predict(self._resolve(model), features, batch_size, prepared)
+                for name, model in self.models.items()
+            }
+
+        pool = self._get_pool()
+        if self.mode == "thread":
+            futures = {
+                name: pool.submit(
+                    _timed_predict, self._resolve(model), features, batch_size, prepared
+                )
+                for name, model in self.models.items()
+            }
+        elif prepared is not None and prepared.rows_of(features) is not None:
+            # Tanpa mengirim DataFrame ke worker: cukup path dataset + slice baris
+            rows = prepared.rows_of(features)
+            futures = {
+                name: pool.submit(
+                    _process_predict_prepared, model, prepared.path, rows, batch_size
+                )
+                for name, model in self.models.items()
+            }
+        else:
+            futures = {
+                name: pool.submit(_process_predict, model, features, batch_size)
+                for name, model in self.models.items()
+            }
+
+        return {name: future.result() for name, future in futures.items()}
+
+    def map(self, chunks, batch_size=DEFAULT_BATCH_SIZE):
+        """Generator (chunk, predict_proba(chunk)) untuk setiap chunk."""
+        for chunk in chunks:
+            yield chunk, self.predict_proba(chunk, batch_size)
+
+    def predict(self, df, batch_size=DEFAULT_BATCH_SIZE, threshold=DEFAULT_THRESHOLD):
+        """
+        return : satu DataFrame = kolom input + kolom hasil per model
+                 ({nama}_prediction, {nama}_prob_gagal_bayar, {nama}_prediction_label)
+        """
+        df = to_frame(df)
+        merged = df.copy()
+
+        for name, (probs, _) in self.predict_proba(df, batch_size).items():
+            labeled = label_predictions(df[[]], probs, threshold)
+            for col in labeled.columns:
+                merged[f"{name}_{col}"] = labeled[col].to_numpy()
+
+        return merged
+
+    # =====================================================
+    # LIFECYCLE
+    # =====================================================
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,295 @@
+# services/explain.py
+"""
+Atribusi fitur per baris (batch) & reason code untuk semua model.
+
+Metode per model:
+    mlp     gradient_x_input      gradien probabilitas gagal bayar terhadap
+                                  input terskala × input (backprop NumPy
+                                  dari bobot .h5, apa pun backend MLP)
+    tabnet  tabnet_mask           mask atensi TabNet (M_explain seperti
+                                  TabNetClassifier.explain) per batch
+    ft      integrated_gradients  integrated gradients pada embedding token
+                                  fitur; semua langkah interpolasi satu
+                                  tensor (langkah × baris)
+            attention             atensi token [CLS] di blok terakhir,
+                                  rata-rata head (satu forward pass)
+
+Metode bertanda (gradient_x_input, integrated_gradients): nilai positif
+berarti fitur menaikkan probabilitas gagal bayar terhadap baseline
+(numerik terskala 0 = rata-rata data training; kategori MLP = kode 0,
+kategori FT = rata-rata embedding). Metode tanpa tanda (tabnet_mask,
+attention): besar pengaruh saja.
+
+Backend ONNX / INT8 tidak punya gradien atau mask, sehingga atribusi
+dihitung dengan salinan model float (torch/NumPy) yang dimuat sekali.
+
+Contoh:
+    from services.explain import add_reason_codes
+    df_out = add_reason_codes(df_out, registry.get("ft"), df, top_k=3)
+    # kolom reason_1..3 (nama fitur) + reason_1_score..3_score
+"""
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from services.base import to_frame
+from services.batch_stream import iter_batches
+from services.instrumentation import span
+
+
+DEFAULT_TOP_K = 3
+# Baris per batch atribusi; integrated gradients memakai batch / steps baris
+DEFAULT_EXPLAIN_BATCH_SIZE = 16_384
+DEFAULT_IG_STEPS = 16
+
+Explanation = namedtuple("Explanation", ["values", "features", "method", "signed"])
+
+
+# =============================================================
+# Model float untuk atribusi
+# =============================================================
+@lru_cache(maxsize=None)
+def _numpy_mlp():
+    from services.mlp_service import MODEL_PATH, NumpyMLP, read_h5_layers
+    return NumpyMLP(read_h5_layers(MODEL_PATH))
+
+
+@lru_cache(maxsize=None)
+def _torch_service(service_class):
+    if service_class.name == "ft":
+        return service_class(backend="torch", quantize=False, compile_mode="eager")
+    return service_class(backend="torch")
+
+
+def _float_model(service):
+    """Model yang bisa di-backprop / dibaca mask-nya untuk service ini."""
+    if service.name == "mlp":
+        return service.model if service.backend == "numpy" else _numpy_mlp()
+    if service.backend == "torch" and not getattr(service, "quantized", False):
+        return service.model
+    return _torch_service(type(service)).model
+
+
+def model_features(service):
+    """Nama fitur sesuai urutan kolom matriks hasil service.preprocess()."""
+    if service.name == "ft":
+        return list(service.num_cols) + list(service.cat_cols)
+    if service.fast_preprocessor is not None:
+        return service.fast_preprocessor.num_cols + service.fast_preprocessor.cat_cols
+    return [
+        col
+        for name, _, cols in service.preprocessor.transformers_
+        if name != "remainder"
+        for col in cols
+    ]
+
+
+# =============================================================
+# Atribusi per metode
+# =============================================================
+def _gradient_x_input(service, arrays, batch_size, steps):
+    model = _float_model(service)
+    (X,) = arrays
+    values = np.empty(X.shape, dtype=np.float32)
+    for batch in iter_batches(len(X), batch_size):
+        _, grad = model.input_gradient(X[batch])
+        values[batch] = grad * X[batch]
+    return values
+
+
+def _tabnet_mask(service, arrays, batch_size, steps):
+    import torch
+
+    network = _float_model(service).network
+    reducing = np.asarray(_float_model(service).reducing_matrix.todense(), dtype=np.float32)
+    X = torch.from_numpy(arrays[0])
+    values = np.empty((len(X), reducing.shape[1]), dtype=np.float32)
+
+    with torch.inference_mode():
+        for batch in iter_batches(len(X), batch_size):
+            M_explain, _ = network.forward_masks(X[batch])
+            values[batch] = M_explain.cpu().numpy() @ reducing
+    return values
+
+
+def _ft_tokens(model, X_num, X_cat):
+    """Token embedding fitur numerik lalu kategorikal, shape (n, fitur, d)."""
+    import torch
+
+    return torch.cat([model.cont_embeddings(X_num), model.cat_embeddings(X_cat)], dim=1)
+
+
+def _ft_head(model, tokens):
+    """Probabilitas gagal bayar dari token fitur (tanpa [CLS])."""
+    import torch
+
+    x = torch.cat([model.cls_embedding(tokens.shape[:1]), tokens], dim=1)
+    return torch.softmax(model.backbone(x), dim=1)[:, 1]
+
+
+def _ft_baseline(model, cardinalities):
+    """Token baseline: numerik terskala 0, kategori = rata-rata embedding."""
+    import torch
+
+    n_num = model.cont_embeddings.weight.shape[0]
+    cat_tokens = []
+    for i, cardinality in enumerate(cardinalities):
+        codes = torch.zeros((cardinality, len(cardinalities)), dtype=torch.long)
+        codes[:, i] = torch.arange(cardinality)
+        cat_tokens.append(model.cat_embeddings(codes)[:, i].mean(0))
+
+    num_tokens = model.cont_embeddings(torch.zeros((1, n_num)))[0]
+    return torch.cat([num_tokens, torch.stack(cat_tokens)])
+
+
+def _integrated_gradients(service, arrays, batch_size, steps):
+    import torch
+
+    model = _float_model(service)
+    X_num, X_cat = (torch.from_numpy(a) for a in arrays)
+    # Titik tengah Riemann: alpha = (i + 0.5) / steps
+    alphas = ((torch.arange(steps, dtype=torch.float32) + 0.5) / steps).view(-1, 1, 1, 1)
+    values = np.empty((len(X_num), X_num.shape[1] + X_cat.shape[1]), dtype=np.float32)
+
+    with torch.no_grad():
+        baseline = _ft_baseline(model, service.config["cat_cardinalities"])
+
+    for batch in iter_batches(len(X_num), max(1, batch_size // steps)):
+        with torch.no_grad():
+            tokens = _ft_tokens(model, X_num[batch], X_cat[batch])
+            delta = tokens - baseline
+        # (steps, baris, fitur, d) → satu forward & backward
+        path = (baseline + alphas * delta).reshape(-1, *tokens.shape[1:]).requires_grad_()
+        with torch.enable_grad():
+            (grad,) = torch.autograd.grad(_ft_head(model, path).sum(), path)
+        grad = grad.view(steps, *tokens.shape).mean(0)
+        values[batch] = (delta * grad).sum(-1).numpy()
+
+    return values
+
+
+def _cls_attention(service, arrays, batch_size, steps):
+    import torch
+
+    model = _float_model(service)
+    attention = model.backbone.blocks[-1]["attention"]
+    captured = []
+
+    def record(module, args):
+        # Ulangi proyeksi q/k rtdl MultiheadAttention untuk query [CLS]
+        x_q, x_kv = args
+        q = module._reshape(module.W_q(x_q))
+        k = module._reshape(module.W_k(x_kv))
+        d_head = k.shape[-1]
+        probs = torch.softmax(q @ k.transpose(1, 2) / math.sqrt(d_head), dim=-1)
+        captured.append(probs.view(len(x_q), module._n_heads, -1).mean(1)[:, 1:])
+
+    X_num, X_cat = (torch.from_numpy(a) for a in arrays)
+    values = np.empty((len(X_num), X_num.shape[1] + X_cat.shape[1]), dtype=np.float32)
+    handle = attention.register_forward_pre_hook(record)
+    try:
+        with torch.inference_mode():
+            for batch in iter_batches(len(X_num), batch_size):
+                model(X_num[batch], X_cat[batch])
+                values[batch] = captured.pop().numpy()
+    finally:
+        handle.remove()
+    return values
+
+
+# (fungsi, bertanda)
+METHODS = {
+    "gradient_x_input": (_gradient_x_input, True),
+    "tabnet_mask": (_tabnet_mask, False),
+    "integrated_gradients": (_integrated_gradients, True),
+    "attention": (_cls_attention, False),
+}
+
+# Metode yang didukung per model; elemen pertama = default
+MODEL_METHODS = {
+    "mlp": ("gradient_x_input",),
+    "tabnet": ("tabnet_mask",),
+    "ft": ("integrated_gradients", "attention"),
+}
+
+
+# =============================================================
+# API
+# =============================================================
+def supports_explain(service):
+    return getattr(service, "service", service).name in MODEL_METHODS
+
+
+def explain_prepared(
+    service,
+    *arrays,
+    method=None,
+    batch_size=DEFAULT_EXPLAIN_BATCH_SIZE,
+    steps=DEFAULT_IG_STEPS,
+):
+    """
+    Atribusi dari matriks hasil service.preprocess().
+
+    return : Explanation(values (n, n_fitur) float32, features, method, signed)
+    """
+    service = getattr(service, "service", service)      # CachedService
+    if not supports_explain(service):
+        raise ValueError(f"{service.name}: feature attributions are not available")
+    choices = MODEL_METHODS[service.name]
+    method = method or choices[0]
+    if method not in choices:
+        raise ValueError(f"{service.name}: explain method must be one of {choices}, got '{method}'")
+
+    function, signed = METHODS[method]
+    with span("explain", service.name, rows=len(arrays[0])):
+        values = function(service, arrays, batch_size, steps)
+    return Explanation(values, model_features(service), method, signed)
+
+
+def explain(service, X, **kwargs):
+    """Atribusi dari input mentah (DataFrame / ndarray FEATURE_COLUMNS)."""
+    service = getattr(service, "service", service)
+    return explain_prepared(service, *service.preprocess(to_frame(X)), **kwargs)
+
+
+def top_reasons(explanation, top_k=DEFAULT_TOP_K):
+    """
+    k fitur dengan atribusi terbesar per baris (vektor, argsort per baris).
+
+    Untuk metode bertanda hanya fitur yang menaikkan risiko (nilai > 0)
+    yang dihitung sebagai alasan; sisanya None.
+
+    return : (names (n, k) object, scores (n, k) float32)
+    """
+    values = explanation.values
+    k = min(top_k, values.shape[1])
+    order = np.argsort(-values, axis=1, kind="stable")[:, :k]
+    scores = np.take_along_axis(values, order, axis=1)
+    names = np.asarray(explanation.features, dtype=object)[order]
+    if explanation.signed:
+        names[scores <= 0] = None
+    return names, scores
+
+
+def reason_columns(top_k=DEFAULT_TOP_K):
+    return [
+        col
+        for i in range(1, top_k + 1)
+        for col in (f"reason_{i}", f"reason_{i}_score")
+    ]
+
+
+def add_reason_codes(df_out, service, X, top_k=DEFAULT_TOP_K, **kwargs):
+    """
+    Tambahkan kolom reason_1..k & reason_1_score..k_score ke frame hasil
+    (mis. output label_predictions) untuk baris input X yang sama.
+    """
+    names, scores = top_reasons(explain(service, X, **kwargs), top_k)
+    for i in range(names.shape[1]):
+        # dtype string: skema Parquet/Arrow tetap string walau satu chunk kosong
+        df_out[f"reason_{i + 1}"] = pd.array(names[:, i], dtype="string")
+        df_out[f"reason_{i + 1}_score"] = scores[:, i]
+    return df_out
@@ -0,0 +1,286 @@
+# services/fast_preprocessor.py
+"""
+Compiler preprocessor sklearn → transform NumPy murni.
+
+Preprocessor hasil training (ColumnTransformer MLP/TabNet, StandardScaler +
+LabelEncoder FT-Transformer) diubah menjadi array statistik tetap: nilai
+imputasi, mean/scale, tabel lookup kategori, dan urutan kolom. Hasilnya
+disimpan sebagai `fast_preprocessor.json` di folder model masing-masing.
+
+Compile ulang & cek kesetaraan numerik (dari src/project-uas):
+    python -m services.fast_preprocessor
+    python -m services.fast_preprocessor --check    # cek file yang ada, tanpa menulis ulang
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+FAST_PREPROCESSOR_FILE = "fast_preprocessor.json"
+
+
+class FastPreprocessor:
+    """
+    Transform NumPy untuk fitur numerik + kategorikal.
+
+    Output transform() = [numerik terskala..., kode kategori...] (float64),
+    sama dengan urutan output ColumnTransformer ("num" lalu "cat").
+    """
+
+    def __init__(
+        self,
+        num_cols,
+        cat_cols,
+        categories,
+        num_fill=None,
+        mean=None,
+        scale=None,
+        cat_fill=None,
+        unknown_value=-1,
+    ):
+        self.num_cols = list(num_cols)
+        self.cat_cols = list(cat_cols)
+        self.categories = [list(c) for c in categories]
+        self.num_fill = None if num_fill is None else np.asarray(num_fill, dtype=np.float64)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.cat_fill = None if cat_fill is None else list(cat_fill)
+        self.unknown_value = unknown_value
+
+        self._lookup = [pd.Index(c) for c in self.categories]
+
+    # =====================================================
+    # TRANSFORM
+    # =====================================================
+    def parse(self, df: pd.DataFrame):
+        """
+        Bagian transform yang tidak bergantung pada statistik numerik:
+        (nilai numerik mentah float64, kode kategori int64). Model dengan
+        parse_key() sama dapat memakai hasil parse yang sama (lihat
+        services/ensemble_service.py).
+        """
+        return df[self.num_cols].to_numpy(dtype=np.float64), self.transform_categorical(df)
+
+    def parse_key(self):
+        return (
+            tuple(self.num_cols),
+            tuple(self.cat_cols),
+            tuple(tuple(c) for c in self.categories),
+            None if self.cat_fill is None else tuple(self.cat_fill),
+            self.unknown_value,
+        )
+
+    def transform_numerical(self, df: pd.DataFrame):
+        return self.scale_numerical(df[self.num_cols].to_numpy(dtype=np.float64))
+
+    def scale_numerical(self, X):
+        """Imputasi + standardisasi nilai numerik mentah (float64)."""
+        if self.num_fill is not None:
+            X = np.where(np.isnan(X), self.num_fill, X)
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+
+        return X
+
+    def transform_categorical(self, df: pd.DataFrame):
+        X = np.empty((len(df), len(self.cat_cols)), dtype=np.int64)
+
+        for i, col in enumerate(self.cat_cols):
+            values = df[col]
+            if self.cat_fill is not None:
+                values = values.fillna(self.cat_fill[i])
+            codes = self._lookup[i].get_indexer(values)
+            codes[codes < 0] = self.unknown_value
+            X[:, i] = codes
+
+        return X
+
+    def transform(self, df: pd.DataFrame):
+        return np.hstack([
+            self.transform_numerical(df),
+            self.transform_categorical(df).astype(np.float64),
+        ])
+
+    # =====================================================
+    # SERIALISASI
+    # =====================================================
+    def to_dict(self):
+        def as_list(arr):
+            return None if arr is None else arr.tolist()
+
+        return {
+            "num_cols": self.num_cols,
+            "cat_cols": self.cat_cols,
+            "categories": self.categories,
+            "num_fill": as_list(self.num_fill),
+            "mean": as_list(self.mean),
+            "scale": as_list(self.scale),
+            "cat_fill": self.cat_fill,
+            "unknown_value": self.unknown_value,
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def load_fast_preprocessor(model_dir):
+    """Muat fast_preprocessor.json dari folder model; None jika belum di-compile."""
+    path = os.path.join(model_dir, FAST_PREPROCESSOR_FILE)
+    return FastPreprocessor.load(path) if os.path.exists(path) else None
+
+
+# =============================================================
+# COMPILER
+# =============================================================
+def _compile_numeric_steps(steps):
+    fill = mean = scale = None
+
+    for name, step in steps:
+        kind = type(step).__name__
+        if kind == "SimpleImputer":
+            fill = step.statistics_.astype(np.float64)
+        elif kind == "StandardScaler":
+            if step.with_mean:
+                mean = step.mean_
+            if step.with_std:
+                scale = step.scale_
+        else:
+            raise ValueError(f"Unsupported numerical step '{name}' ({kind})")
+
+    return fill, mean, scale
+
+
+def _compile_categorical_steps(steps):
+    fill = categories = None
+    unknown_value = -1
+
+    for name, step in steps:
+        kind = type(step).__name__
+        if kind == "SimpleImputer":
+            fill = list(step.statistics_)
+        elif kind == "OrdinalEncoder":
+            categories = step.categories_
+            if step.handle_unknown == "use_encoded_value":
+                unknown_value = step.unknown_value
+        else:
+            raise ValueError(f"Unsupported categorical step '{name}' ({kind})")
+
+    if categories is None:
+        raise ValueError("Categorical pipeline has no OrdinalEncoder")
+    return fill, categories, unknown_value
+
+
+def _steps(transformer):
+    return getattr(transformer, "steps", [(type(transformer).__name__, transformer)])
+
+
+def compile_column_transformer(column_transformer):
+    """ColumnTransformer ("num" pipeline, "cat" pipeline) → FastPreprocessor."""
+    blocks = [
+        (name, transformer, cols)
+        for name, transformer, cols in column_transformer.transformers_
+        if transformer != "drop" and len(cols)
+    ]
+    if len(blocks) != 2:
+        raise ValueError(f"Expected a numerical and a categorical block, got {[b[0] for b in blocks]}")
+
+    (_, num_tf, num_cols), (_, cat_tf, cat_cols) = blocks
+    num_fill, mean, scale = _compile_numeric_steps(_steps(num_tf))
+    cat_fill, categories, unknown_value = _compile_categorical_steps(_steps(cat_tf))
+
+    return FastPreprocessor(
+        num_cols, cat_cols, categories,
+        num_fill=num_fill, mean=mean, scale=scale,
+        cat_fill=cat_fill, unknown_value=unknown_value,
+    )
+
+
+def compile_ft_preprocessing(num_cols, cat_cols, scaler, cat_encoders):
+    """StandardScaler + LabelEncoder per kolom (FT-Transformer) → FastPreprocessor."""
+    return FastPreprocessor(
+        num_cols, cat_cols,
+        [cat_encoders[col].classes_ for col in cat_cols],
+        mean=scaler.mean_ if scaler.with_mean else None,
+        scale=scaler.scale_ if scaler.with_std else None,
+    )
+
+
+# =============================================================
+# COMPILE SEMUA MODEL + CEK KESETARAAN
+# =============================================================
+def _equivalence_data():
+    sample_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "utils", "batch_prediction_result.csv",
+    )
+    df = pd.read_csv(sample_path)
+    # Data contoh sudah berisi NaN; tambahkan kategori asing untuk unknown_value
+    df.loc[df.index[::89], "loan_intent"] = "UNKNOWN"
+    return df
+
+
+def _check(name, reference, fast, atol=1e-9):
+    reference = np.asarray(reference, dtype=np.float64)
+    max_diff = np.nanmax(np.abs(reference - fast)) if reference.size else 0.0
+    same_nan = np.array_equal(np.isnan(reference), np.isnan(fast))
+    if max_diff > atol or not same_nan:
+        raise AssertionError(f"{name}: fast path differs (max diff {max_diff:.3e}, NaN mask equal={same_nan})")
+    print(f"{name:<8} OK  max |diff| = {max_diff:.2e}")
+
+
+def main(argv=None):
+    import joblib
+    from services.ft_transformer_service import FTTransformerService
+    from services.mlp_service import MODEL_DIR as MLP_DIR, PREPROCESSOR_PATH as MLP_PRE
+    from services.tabnet_service import MODEL_DIR as TAB_DIR, PREPROCESSOR_PATH as TAB_PRE
+
+    parser = argparse.ArgumentParser(
+        prog="python -m services.fast_preprocessor",
+        description="Compile preprocessor ke fast_preprocessor.json & cek kesetaraan numerik.",
+    )
+    parser.add_argument("--check", action="store_true",
+                        help="hanya bandingkan fast_preprocessor.json yang ada dengan pickle (file tidak ditulis ulang)")
+    args = parser.parse_args(argv)
+
+    def compiled(model_dir, compile_fn):
+        """Versi baru dari pickle, atau file yang ada untuk --check."""
+        if not args.check:
+            return compile_fn()
+        fast = load_fast_preprocessor(model_dir)
+        if fast is None:
+            raise FileNotFoundError(f"{FAST_PREPROCESSOR_FILE} not found in {model_dir}")
+        return fast
+
+    ft = FTTransformerService()
+    df = _equivalence_data()
+
+    for name, model_dir, pkl in [("mlp", MLP_DIR, MLP_PRE), ("tabnet", TAB_DIR, TAB_PRE)]:
+        preprocessor = joblib.load(pkl)
+        fast = compiled(model_dir, lambda: compile_column_transformer(preprocessor))
+        _check(name, preprocessor.transform(df), fast.transform(df))
+        if not args.check:
+            fast.save(os.path.join(model_dir, FAST_PREPROCESSOR_FILE))
+
+    fast = compiled(
+        ft.save_dir,
+        lambda: compile_ft_preprocessing(ft.num_cols, ft.cat_cols, ft.scaler, ft.cat_encoders),
+    )
+    _check("ft", ft.scaler.transform(df[ft.num_cols].to_numpy()), fast.transform_numerical(df))
+    _check("ft-cat", ft._encode_categorical(df), fast.transform_categorical(df))
+    if not args.check:
+        fast.save(os.path.join(ft.save_dir, FAST_PREPROCESSOR_FILE))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,149 @@
 # services/ft_transformer_service.py
 
+import copy
+import math
 import os
-import torch
+import types
+import warnings
 import joblib
 import pandas as pd
 import numpy as np
-from rtdl_revisiting_models import FTTransformer
+from services.registry import registry
+from services.fast_preprocessor import FAST_PREPROCESSOR_FILE, load_fast_preprocessor
+from services.base import (
+    DEFAULT_BATCH_SIZE,
+    predict_batch,
+    predict_in_stages,
+    resolve_backend,
+    to_frame,
+)
+from services.batch_stream import iter_batches
+
+
+# torch & rtdl_revisiting_models diimpor saat model dimuat (backend torch),
+# bukan saat modul diimpor, agar halaman yang belum memakai FT tetap ringan
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_NAME = "ft_transformer_model2"
+MODEL_DIR = os.path.join(BASE_DIR, "models", DEFAULT_MODEL_NAME)
+
+BACKENDS = ("torch", "onnx")
+COMPILE_MODES = ("eager", "trace", "compile")
+WARMUP_BATCH_SIZES = (1, 64)
+
+
+def quantize_dynamic_int8(model):
+    """
+    Dynamic INT8 quantization untuk nn.Linear di blok attention & FFN
+    (bobot int8, aktivasi dikuantisasi per batch saat inference).
+    Embedding dan output head tetap fp32.
+
+    Hanya memperkecil bobot (~47%); throughput CPU tidak naik untuk model
+    sekecil ini (lihat benchmarks/ft_quantization.py).
+    """
+    import torch
+
+    targets = {
+        name
+        for name, module in model.named_modules()
+        if isinstance(module, torch.nn.Linear) and name.startswith("backbone.blocks.")
+    }
+    return torch.ao.quantization.quantize_dynamic(model, targets, dtype=torch.qint8)
+
+
+def _attention_forward(self, x_q, x_kv):
+    # Sama dengan rtdl MultiheadAttention.forward (tanpa key compression &
+    # dropout inference), tetapi batch size dibaca dari shape, bukan len(q)
+    import torch
+
+    q, k, v = self.W_q(x_q), self.W_k(x_kv), self.W_v(x_kv)
+    batch_size, n_q_tokens = q.shape[0], q.shape[1]
+    d_head_key = k.shape[-1] // self._n_heads
+    d_head_value = v.shape[-1] // self._n_heads
+
+    q = self._reshape(q)
+    k = self._reshape(k)
+    attention_probs = torch.softmax(q @ k.transpose(1, 2) / math.sqrt(d_head_key), dim=-1)
+    x = attention_probs @ self._reshape(v)
+    x = (
+        x.reshape(batch_size, self._n_heads, n_q_tokens, d_head_value)
+        .transpose(1, 2)
+        .reshape(batch_size, n_q_tokens, self._n_heads * d_head_value)
+    )
+    if self.W_out is not None:
+        x = self.W_out(x)
+    return x
+
+
+def dynamic_batch_copy(model):
+    """
+    Salinan model untuk tracing / torch.compile / export ONNX.
+
+    rtdl MultiheadAttention memakai `len(q)` sebagai batch size, yang
+    terbaca sebagai konstanta saat tracing; di salinan ini attention
+    membaca shape tensor sehingga dimensi batch tetap dinamis.
+    """
+    model = copy.deepcopy(model).eval()
+    for module in model.modules():
+        if type(module).__name__ == "MultiheadAttention":
+            if module.key_compression is not None:
+                raise ValueError("Attention with key compression is not supported")
+            module.forward = types.MethodType(_attention_forward, module)
+    return model
+
+
+def configure_threads(intra_op_threads=None, inter_op_threads=None):
+    """
+    Thread pool torch (berlaku untuk seluruh proses). Inter-op hanya bisa
+    di-set sebelum ada kerja paralel pertama; jika terlambat, diabaikan.
+    """
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(int(intra_op_threads))
+    if inter_op_threads and torch.get_num_interop_threads() != int(inter_op_threads):
+        try:
+            torch.set_num_interop_threads(int(inter_op_threads))
+        except RuntimeError as exc:
+            warnings.warn(f"inter-op threads not changed: {exc}")
 
 
 class FTTransformerService:
-    def __init__(self, model_name: str = "ft_transformer_model2"):
+    name = "ft"
+    n_inputs = 2        # jumlah matriks hasil preprocess(): X_num, X_cat
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        backend=None,
+        quantize=None,
+        compile_mode=None,
+        intra_op_threads=None,
+        inter_op_threads=None,
+    ):
         # =====================================================
         # PATH
         # =====================================================
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.save_dir = os.path.join(base_dir, "models", model_name)
+        self.save_dir = os.path.join(BASE_DIR, "models", model_name)
 
         if not os.path.exists(self.save_dir):
             raise FileNotFoundError(f"Model folder not found: {self.save_dir}")
 
-        self.device = torch.device("cpu")
+        self.model_dir = self.save_dir
+        # "torch" (default) atau "onnx" (services/onnx_backend.py), env FT_BACKEND
+        self.backend = resolve_backend(self.name, backend, BACKENDS)
+        # Mode INT8 (backend torch): argumen `quantize` atau env FT_QUANTIZE=1
+        if quantize is None:
+            quantize = os.environ.get("FT_QUANTIZE", "").lower() in ("1", "true", "yes")
+        if quantize and self.backend != "torch":
+            raise ValueError("INT8 quantization is only available for the torch backend")
+        self.quantized = bool(quantize)
+        # Jalur inference torch: "eager", "trace" (TorchScript) atau
+        # "compile" (torch.compile), env FT_COMPILE
+        self.compile_mode = compile_mode or os.environ.get("FT_COMPILE") or "eager"
+        if self.compile_mode not in COMPILE_MODES:
+            raise ValueError(f"compile_mode must be one of {COMPILE_MODES}, got '{self.compile_mode}'")
+        if self.compile_mode != "eager" and self.backend != "torch":
+            raise ValueError("compile_mode is only available for the torch backend")
 
         # =====================================================
         # LOAD CONFIG
@@ -35,9 +159,38 @@ class FTTransformerService:
         self.scaler = joblib.load(os.path.join(self.save_dir, "scaler.pkl"))
         self.cat_encoders = joblib.load(os.path.join(self.save_dir, "cat_encoders.pkl"))
 
+        # Lookup kategori -> kode, dibangun sekali dari classes_ encoder
+        # (index posisi = kode LabelEncoder, kategori asing -> -1)
+        self.cat_lookup = {
+            col: pd.Index(self.cat_encoders[col].classes_)
+            for col in self.cat_cols
+        }
+
+        # Versi NumPy dari scaler + encoder (services/fast_preprocessor.py), jika ada
+        self.fast_preprocessor = load_fast_preprocessor(self.save_dir)
+        # Menentukan versi matriks hasil preprocess (services/prepared_dataset.py)
+        self.preprocessor_files = tuple(
+            os.path.join(self.save_dir, filename)
+            for filename in ("scaler.pkl", "cat_encoders.pkl", FAST_PREPROCESSOR_FILE)
+        )
+
         # =====================================================
         # BUILD MODEL
         # =====================================================
+        if self.backend == "onnx":
+            from services.onnx_backend import load_onnx_model
+            self.model = load_onnx_model(self.save_dir)
+            return
+
+        import torch
+        from rtdl_revisiting_models import FTTransformer
+
+        configure_threads(
+            intra_op_threads or os.environ.get("FT_INTRA_OP_THREADS"),
+            inter_op_threads or os.environ.get("FT_INTER_OP_THREADS"),
+        )
+        self.device = torch.device("cpu")
+
         self.model = FTTransformer(
             n_cont_features=len(self.num_cols),
             cat_cardinalities=self.config["cat_cardinalities"],
@@ -59,6 +212,51 @@ class FTTransformerService:
         )
         self.model.eval()
 
+        if self.quantized:
+            self.model = quantize_dynamic_int8(self.model)
+
+        self.forward = self._build_forward()
+        self.warmup()
+
+    # =====================================================
+    # JALUR INFERENCE (eager / TorchScript / torch.compile)
+    # =====================================================
+    def _example_inputs(self, n_rows):
+        import torch
+
+        X_num = torch.zeros((n_rows, len(self.num_cols)), dtype=torch.float32, device=self.device)
+        X_cat = torch.zeros((n_rows, len(self.cat_cols)), dtype=torch.long, device=self.device)
+        return X_num, X_cat
+
+    def _build_forward(self):
+        import torch
+
+        if self.compile_mode == "eager":
+            return self.model
+
+        model = dynamic_batch_copy(self.model)
+        if self.compile_mode == "trace":
+            inputs = self._example_inputs(8)
+            with torch.inference_mode():
+                traced = torch.jit.trace(model, inputs)
+            return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+        return torch.compile(model, dynamic=True)
+
+    def warmup(self, batch_sizes=WARMUP_BATCH_SIZES):
+        """
+        Forward pass dummy saat load agar request pertama tidak menanggung
+        biaya compile / optimisasi graph / alokasi awal.
+        """
+        import torch
+
+        for n_rows in batch_sizes:
+            # Input dibuat di luar inference_mode seperti di _predict_softmax,
+            # agar guard torch.compile sama dengan request sebenarnya
+            inputs = self._example_inputs(n_rows)
+            with torch.inference_mode():
+                self.forward(*inputs)
+
     # =====================================================
     # METADATA
     # =====================================================
@@ -77,55 +275,97 @@ class FTTransformerService:
     # =====================================================
     # PREPROCESS
     # =====================================================
-    def _preprocess(self, df: pd.DataFrame):
-        df = df.copy()
-
-        for col in self.cat_cols:
-            encoder = self.cat_encoders[col]
-            known = set(encoder.classes_)
-            df[col] = df[col].apply(
-                lambda x: encoder.transform([x])[0] if x in known else -1
-            )
+    def _encode_categorical(self, df: pd.DataFrame):
+        X_cat = np.empty((len(df), len(self.cat_cols)), dtype="int64")
+
+        for i, col in enumerate(self.cat_cols):
+            X_cat[:, i] = self.cat_lookup[col].get_indexer(df[col])
+
+        return X_cat
+
+    def preprocess(self, X):
+        """Input mentah → tuple matriks siap model: (X_num float32, X_cat int64)."""
+        df = to_frame(X)
+        if self.fast_preprocessor is not None:
+            return self.preprocess_parsed(*self.fast_preprocessor.parse(df))
 
         X_num = self.scaler.transform(df[self.num_cols])
-        X_cat = df[self.cat_cols].values.astype("int64")
+        X_cat = self._encode_categorical(df)
+        return X_num.astype(np.float32), X_cat.astype(np.int64)
 
-        X_num = torch.tensor(X_num, dtype=torch.float32).to(self.device)
-        X_cat = torch.tensor(X_cat, dtype=torch.long).to(self.device)
+    def preprocess_parsed(self, X_num, X_cat):
+        """Hasil FastPreprocessor.parse() → (X_num float32, X_cat int64)."""
+        return self.fast_preprocessor.scale_numerical(X_num).astype(np.float32), X_cat.astype(np.int64)
 
-        return X_num, X_cat
+    # =====================================================
+    # PROBABILITAS (kontrak ModelService)
+    # =====================================================
+    def _predict_softmax(self, df: pd.DataFrame, batch_size=DEFAULT_BATCH_SIZE):
+        return self._softmax_prepared(*self.preprocess(df), batch_size=batch_size)
+
+    def _softmax_prepared(self, X_num, X_cat, batch_size=DEFAULT_BATCH_SIZE):
+        if self.backend == "onnx":
+            # Gather ONNX memetakan kode -1 ke embedding terakhir tanpa error;
+            # tolak kategori asing seperti nn.Embedding di backend torch
+            unknown = X_cat < 0
+            if unknown.any():
+                cols = [col for col, bad in zip(self.cat_cols, unknown.any(axis=0)) if bad]
+                raise IndexError(f"unknown category in {cols} (code -1)")
+            return self.model.run(X_num, X_cat, batch_size=batch_size)
+
+        import torch
+
+        # Hasil preprocess bisa column-major; stride harus sama dengan input
+        # warm-up (C-contiguous) agar torch.compile tidak compile ulang
+        X_num = torch.from_numpy(np.ascontiguousarray(X_num)).to(self.device)
+        X_cat = torch.from_numpy(np.ascontiguousarray(X_cat)).to(self.device)
+
+        with torch.inference_mode():
+            return np.concatenate([
+                torch.softmax(
+                    self.forward(X_num[batch], X_cat[batch]), dim=1
+                ).cpu().numpy()
+                for batch in iter_batches(len(X_num), batch_size)
+            ])
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        return predict_in_stages(self, X, batch_size)
+
+    def predict_prepared(self, X_num, X_cat, batch_size=DEFAULT_BATCH_SIZE):
+        return self._softmax_prepared(X_num, X_cat, batch_size)[:, 1]
 
     # =====================================================
     # SINGLE PREDICTION
     # =====================================================
     def predict(self, input_data: dict):
-        df = pd.DataFrame([input_data])
-        X_num, X_cat = self._preprocess(df)
-
-        with torch.no_grad():
-            logits = self.model(X_num, X_cat)
-            probs = torch.softmax(logits, dim=1).cpu().numpy()[0]
-            pred_class = int(probs.argmax())
+        probs = self._predict_softmax(pd.DataFrame([input_data]))[0]
+        pred_class = int(probs.argmax())
 
         return pred_class, probs
 
     # =====================================================
     # BATCH PREDICTION
     # =====================================================
-    def predict_batch(self, df: pd.DataFrame):
-        X_num, X_cat = self._preprocess(df)
+    def predict_batch(self, df: pd.DataFrame, batch_size=DEFAULT_BATCH_SIZE, top_k=0):
+        return predict_batch(self, df, batch_size=batch_size, top_k=top_k)
 
-        with torch.no_grad():
-            logits = self.model(X_num, X_cat)
-            probs = torch.softmax(logits, dim=1).cpu().numpy()
 
-        preds = probs.argmax(axis=1)
+registry.register("ft", FTTransformerService)
+
+
+def load_categorical_options(model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Opsi kategori FT-Transformer tanpa memuat model (untuk form input):
+    dari fast_preprocessor.json, atau cat_encoders.pkl jika belum di-compile.
+    """
+    save_dir = os.path.join(BASE_DIR, "models", model_name)
+    fast = load_fast_preprocessor(save_dir)
+    if fast is not None:
+        return dict(zip(fast.cat_cols, fast.categories))
+
+    cat_encoders = joblib.load(os.path.join(save_dir, "cat_encoders.pkl"))
+    return {col: list(encoder.classes_) for col, encoder in cat_encoders.items()}
 
-        df_out = df.copy()
-        df_out["prediction"] = preds
-        df_out["prob_gagal_bayar"] = probs[:, 1]
-        df_out["prediction_label"] = np.where(
-            preds == 1, "Gagal Bayar", "Lancar Bayar"
-        )
 
-        return df_out
+def get_ft_service():
+    return registry.get("ft")
@@ -0,0 +1,259 @@
+# services/instrumentation.py
+"""
+Instrumentasi waktu & memori per tahap inference.
+
+Service dan pipeline batch mencatat span per tahap ke kolektor global
+`metrics` (thread-safe, overhead ~1 µs per span):
+
+    read         parsing input per chunk (CSV / Parquet / Arrow)
+    validate     validasi skema input & buang baris tidak valid
+    preprocess   transform fitur, per model
+    forward      forward pass model, per model
+    predict      waktu model per chunk dari sudut pandang pipeline
+                 (termasuk model di worker process)
+    label        threshold + label + salin frame (label_predictions)
+    explain      atribusi fitur untuk reason code, per model
+    merge        gabung hasil beberapa model (merge_outputs)
+    write        tulis hasil (CSV / Parquet / Arrow)
+
+Per span dicatat jumlah panggilan, total detik dan jumlah baris
+(→ rows/sec). Snapshot juga memuat puncak RSS proses selama run dan waktu
+muat model dari registry. Ekspor: snapshot() / to_json() atau to_prometheus()
+(format teks Prometheus).
+
+Contoh:
+    from services.instrumentation import metrics
+    metrics.reset()                    # awal run (reset puncak RSS juga)
+    ... stream_predict(...) ...
+    print(metrics.to_prometheus())
+"""
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+METRIC_PREFIX = "credit_risk"
+
+
+# =============================================================
+# Memori proses
+# =============================================================
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset puncak RSS (VmHWM) ke RSS saat ini; return False jika tidak didukung."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    """Puncak RSS sejak reset_peak_rss() (Linux) atau sejak proses mulai."""
+    peak_kb = _status_kb("VmHWM")
+    if peak_kb is None:
+        # macOS: byte, Linux: kilobyte
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    return peak_kb * 1024
+
+
+def current_rss_bytes():
+    rss_kb = _status_kb("VmRSS")
+    return rss_kb * 1024 if rss_kb is not None else None
+
+
+# =============================================================
+# Kolektor span
+# =============================================================
+class _Span:
+    __slots__ = ("rows",)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+class StageMetrics:
+    """Akumulasi span per (tahap, model) untuk satu run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Mulai run baru: kosongkan span & reset puncak RSS."""
+        with self._lock:
+            self._stages = {}
+            self._started = time.time()
+            self._wall_start = time.perf_counter()
+            self._wall_seconds = None
+            self._rss_start = current_rss_bytes()
+        reset_peak_rss()
+
+    def finish(self):
+        """Tandai akhir run (wall time berhenti dihitung)."""
+        with self._lock:
+            self._wall_seconds = time.perf_counter() - self._wall_start
+
+    def record(self, stage, seconds, rows=None, model=None):
+        key = (stage, model)
+        with self._lock:
+            entry = self._stages.get(key)
+            if entry is None:
+                entry = self._stages[key] = {"calls": 0, "seconds": 0.0, "rows": 0}
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["rows"] += rows or 0
+
+    @contextmanager
+    def span(self, stage, model=None, rows=None):
+        """
+        Ukur durasi blok; jumlah baris boleh diisi di dalam blok:
+            with metrics.span("preprocess", "ft") as s:
+                ...
+                s.rows = len(X)
+        """
+        record = _Span(rows)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.record(stage, time.perf_counter() - start, record.rows, model)
+
+    # =====================================================
+    # SNAPSHOT & EKSPOR
+    # =====================================================
+    def snapshot(self, include_models=True):
+        with self._lock:
+            stages = [
+                {
+                    "stage": stage,
+                    "model": model,
+                    **entry,
+                    "rows_per_sec": entry["rows"] / entry["seconds"] if entry["seconds"] and entry["rows"] else None,
+                }
+                for (stage, model), entry in self._stages.items()
+            ]
+            wall_seconds = (
+                self._wall_seconds if self._wall_seconds is not None
+                else time.perf_counter() - self._wall_start
+            )
+            started = self._started
+            rss_start = self._rss_start
+
+        snapshot = {
+            "started_at": started,
+            "wall_seconds": wall_seconds,
+            "stages": stages,
+            "memory": {
+                "rss_start_bytes": rss_start,
+                "rss_bytes": current_rss_bytes(),
+                "peak_rss_bytes": peak_rss_bytes(),
+            },
+        }
+        if include_models:
+            from services.registry import registry
+            snapshot["models"] = {
+                name: {"loaded": stat["loaded"], "load_seconds": stat["load_seconds"]}
+                for name, stat in registry.stats().items()
+            }
+        return snapshot
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, snapshot=None):
+        """Format teks eksposisi Prometheus (versi 0.0.4)."""
+        snapshot = snapshot or self.snapshot()
+        p = METRIC_PREFIX
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items() if v is not None)
+                lines.append(f"{p}_{name}{{{label_text}}} {value}" if label_text else f"{p}_{name} {value}")
+
+        stages = snapshot["stages"]
+        labels = [{"stage": s["stage"], "model": s["model"]} for s in stages]
+        metric("stage_seconds_total", "counter", "Total waktu per tahap inference.",
+               [(l, s["seconds"]) for l, s in zip(labels, stages)])
+        metric("stage_calls_total", "counter", "Jumlah span per tahap inference.",
+               [(l, s["calls"]) for l, s in zip(labels, stages)])
+        metric("stage_rows_total", "counter", "Jumlah baris yang diproses per tahap.",
+               [(l, s["rows"]) for l, s in zip(labels, stages)])
+        metric("stage_rows_per_second", "gauge", "Throughput per tahap (baris/detik).",
+               [(l, s["rows_per_sec"]) for l, s in zip(labels, stages)])
+        metric("run_wall_seconds", "gauge", "Wall time run terakhir.",
+               [({}, snapshot["wall_seconds"])])
+        metric("process_peak_rss_bytes", "gauge", "Puncak RSS proses selama run.",
+               [({}, snapshot["memory"]["peak_rss_bytes"])])
+        metric("process_rss_bytes", "gauge", "RSS proses saat snapshot.",
+               [({}, snapshot["memory"]["rss_bytes"])])
+        metric("model_load_seconds", "gauge", "Waktu muat model di registry.",
+               [({"model": name}, m["load_seconds"]) for name, m in snapshot.get("models", {}).items()])
+
+        return "\n".join(lines) + "\n"
+
+
+# Kolektor bersama per proses (service, pipeline batch, halaman Streamlit)
+metrics = StageMetrics()
+
+
+def span(stage, model=None, rows=None):
+    return metrics.span(stage, model, rows)
+
+
+# =============================================================
+# Helper iterator
+# =============================================================
+def timed_chunks(chunks, stage="read"):
+    """Bungkus iterator chunk: waktu menghasilkan tiap chunk dicatat sebagai span."""
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        metrics.record(stage, time.perf_counter() - start, len(chunk))
+        yield chunk
+
+
+def stage_frame(snapshot):
+    """DataFrame rincian tahap dari snapshot (urut total detik, terbesar dulu)."""
+    import pandas as pd
+
+    df = pd.DataFrame(snapshot["stages"], columns=["stage", "model", "calls", "seconds", "rows", "rows_per_sec"])
+    df["model"] = df["model"].fillna("-")
+    wall = snapshot["wall_seconds"]
+    df["share"] = df["seconds"] / wall if wall else None
+    return df.sort_values("seconds", ascending=False, ignore_index=True)
+
+
+def write_metrics(path, snapshot=None):
+    """Simpan snapshot ke file: .prom/.txt → Prometheus, selain itu JSON."""
+    snapshot = snapshot or metrics.snapshot()
+    with open(path, "w") as f:
+        if os.path.splitext(path)[1].lower() in (".prom", ".txt"):
+            f.write(metrics.to_prometheus(snapshot))
+        else:
+            json.dump(snapshot, f, indent=2)
@@ -0,0 +1,601 @@
+# services/jobs.py
+"""
+Antrian job batch scoring lokal: worker process di latar belakang menilai
+file upload chunk demi chunk, dengan checkpoint per chunk di disk.
+
+    .cache/jobs/
+        worker.lock                     dikunci (flock) selama worker hidup
+        worker.log                      stdout/stderr worker
+        <job id>/
+            job.json                    opsi, status & progress (ditulis atomik)
+            input.<ext>                 salinan file upload
+            checkpoint.jsonl            satu baris JSON per chunk yang selesai
+            parts/<model>/<i>.parquet   hasil chunk ke-i (dihapus setelah selesai)
+            parts/rejected/<i>.parquet  laporan baris yang ditolak validasi
+            output/                     file hasil per model + rejected.csv
+            metrics.json                metrik per tahap run terakhir
+
+Alur:
+    submit_job   salin input, tulis job.json (queued), nyalakan worker
+    worker       ambil job tertua yang queued / running (running = worker
+                 sebelumnya mati di tengah job); tiap chunk dinilai dengan
+                 stream_predict, part ditulis lalu chunk dicatat di
+                 checkpoint.jsonl (baris checkpoint = commit)
+    resume       chunk yang sudah ada di checkpoint dibaca tetapi tidak
+                 dinilai ulang, jadi job lanjut dari chunk terakhir
+    selesai      part digabung ke output/ dalam format pilihan (file sementara
+                 lalu rename) → done, baru kemudian part dihapus
+
+Status: queued → running → done | failed | cancelled
+
+Hanya satu worker per folder jobs (flock); lock dilepas OS saat worker
+mati, sehingga worker_alive() tidak tertipu file pid basi.
+
+Jalankan dari src/project-uas:
+    python -m services.jobs worker              # poll antrian terus
+    python -m services.jobs worker --once       # berhenti saat antrian kosong
+    python -m services.jobs submit --model ft --in data.csv --format .parquet
+    python -m services.jobs list
+    python -m services.jobs cancel <job id>
+"""
+import argparse
+import fcntl
+import json
+import os
+import secrets
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+
+import pandas as pd
+
+from services.base import DEFAULT_BATCH_SIZE, DEFAULT_THRESHOLD, FEATURE_COLUMNS
+from services.batch_stream import (
+    DEFAULT_CHUNK_SIZE,
+    PREVIEW_ROWS,
+    RESULT_WRITERS,
+    STREAM_MODES,
+    CsvResultWriter,
+    ParquetResultWriter,
+    input_format,
+    iter_input_chunks,
+    open_writer,
+    read_preview,
+    stream_predict,
+)
+from services.instrumentation import metrics, span
+from services.registry import registry
+from services.validation import merge_schemas, model_schema, validate
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JOBS_DIR = os.path.join(BASE_DIR, ".cache", "jobs")
+
+JOB_FILE = "job.json"
+CHECKPOINT_FILE = "checkpoint.jsonl"
+METRICS_FILE = "metrics.json"
+CANCEL_FILE = "cancel"
+LOCK_FILE = "worker.lock"
+LOG_FILE = "worker.log"
+REJECTED = "rejected"
+
+PENDING_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+POLL_SECONDS = 1.0
+# Jeda sebelum worker yang baru dinyalakan dianggap gagal start (import + lock)
+WORKER_START_SECONDS = 15.0
+
+# Executor dibuat per chunk, jadi mode "pool" (start worker process) tidak dipakai
+JOB_MODES = tuple(mode for mode in STREAM_MODES if mode != "pool")
+
+
+# =============================================================
+# File job
+# =============================================================
+def job_dir(job_id, root=DEFAULT_JOBS_DIR):
+    return os.path.join(root, job_id)
+
+
+def _write_json(path, data):
+    """Tulis atomik: pembaca (page) tidak pernah melihat file setengah jadi."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_job(job_id, root=DEFAULT_JOBS_DIR):
+    with open(os.path.join(job_dir(job_id, root), JOB_FILE)) as f:
+        return json.load(f)
+
+
+def update_job(job_id, root=DEFAULT_JOBS_DIR, **fields):
+    job = load_job(job_id, root)
+    job.update(fields, updated_at=time.time())
+    _write_json(os.path.join(job_dir(job_id, root), JOB_FILE), job)
+    return job
+
+
+def list_jobs(root=DEFAULT_JOBS_DIR):
+    """Semua job, terbaru dulu."""
+    if not os.path.isdir(root):
+        return []
+    jobs = [
+        load_job(name, root)
+        for name in os.listdir(root)
+        if os.path.exists(os.path.join(root, name, JOB_FILE))
+    ]
+    return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+
+def read_checkpoint(path):
+    """dict indeks chunk -> entry; baris terakhir yang terpotong (crash) diabaikan."""
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                done[entry["chunk"]] = entry
+    return done
+
+
+def count_rows(path):
+    """Jumlah baris input untuk ETA (CSV: jumlah baris teks), None jika tidak diketahui."""
+    ext = input_format(path)
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if ext != ".csv":
+        import pyarrow as pa
+        try:
+            reader = pa.ipc.open_file(pa.memory_map(path))
+        except pa.ArrowInvalid:
+            return None
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+    lines, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return max(lines + (last != b"\n") - 1, 0)
+
+
+# =============================================================
+# Submit / cancel / progress (dipanggil dari page atau CLI)
+# =============================================================
+def submit_job(
+    source,
+    models,
+    root=DEFAULT_JOBS_DIR,
+    output_format=".csv",
+    chunksize=DEFAULT_CHUNK_SIZE,
+    batch_size=DEFAULT_BATCH_SIZE,
+    threshold=DEFAULT_THRESHOLD,
+    mode="serial",
+    top_k=0,
+    columns=None,
+    validate_input=True,
+    start=True,
+):
+    """
+    source  : path atau file upload (punya atribut name & read())
+    models  : dict nama hasil -> nama registry, atau list nama registry
+    mode    : cara menjalankan model per chunk (JOB_MODES)
+    columns : kolom input yang dibaca (None = FEATURE_COLUMNS)
+    start   : nyalakan worker di latar belakang bila belum hidup
+
+    return : job id
+    """
+    if not isinstance(models, dict):
+        models = {name: name for name in models}
+    ext = input_format(source)
+    if output_format not in RESULT_WRITERS:
+        raise ValueError(f"Unsupported output format '{output_format}', expected one of {sorted(RESULT_WRITERS)}")
+    if mode not in JOB_MODES:
+        raise ValueError(f"mode must be one of {JOB_MODES}, got '{mode}'")
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+    path = job_dir(job_id, root)
+    os.makedirs(path)
+
+    input_path = os.path.join(path, f"input{ext}")
+    if isinstance(source, (str, os.PathLike)):
+        shutil.copyfile(source, input_path)
+    else:
+        source.seek(0)
+        with open(input_path, "wb") as f:
+            shutil.copyfileobj(source, f)
+        source.seek(0)
+
+    now = time.time()
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "name": os.path.basename(str(getattr(source, "name", source))),
+        "input": input_path,
+        "models": models,
+        "output_format": output_format,
+        "columns": list(columns or FEATURE_COLUMNS),
+        "chunksize": int(chunksize),
+        "batch_size": int(batch_size),
+        "threshold": float(threshold),
+        "mode": mode,
+        "top_k": int(top_k),
+        "validate": bool(validate_input),
+        "total_rows": count_rows(input_path),
+        "rows_done": 0,
+        "rows_rejected": 0,
+        "chunks_done": 0,
+        "created_at": now,
+        "updated_at": now,
+        "started_at": None,
+        "finished_at": None,
+        "run_started_at": None,
+        "run_rows_start": 0,
+        "runs": 0,
+        "error": None,
+    }
+    _write_json(os.path.join(path, JOB_FILE), job)
+
+    if start:
+        ensure_worker(root)
+    return job_id
+
+
+def cancel_job(job_id, root=DEFAULT_JOBS_DIR):
+    """Minta worker berhenti setelah chunk yang sedang dinilai."""
+    open(os.path.join(job_dir(job_id, root), CANCEL_FILE), "w").close()
+
+
+def job_progress(job):
+    """
+    return : dict rows_done, total_rows, fraction, rows_per_sec, eta_seconds
+             (rows_per_sec & ETA dihitung dari run yang sedang berjalan)
+    """
+    rows_done, total = job["rows_done"], job["total_rows"]
+    rows_per_sec = eta = None
+    if job["run_started_at"] and job["status"] == "running":
+        run_rows = rows_done - job["run_rows_start"]
+        elapsed = job["updated_at"] - job["run_started_at"]
+        if run_rows > 0 and elapsed > 0:
+            rows_per_sec = run_rows / elapsed
+            if total:
+                eta = max(total - rows_done, 0) / rows_per_sec
+    return {
+        "rows_done": rows_done,
+        "total_rows": total,
+        "fraction": min(rows_done / total, 1.0) if total else None,
+        "rows_per_sec": rows_per_sec,
+        "eta_seconds": eta,
+    }
+
+
+def job_results(job_id, root=DEFAULT_JOBS_DIR):
+    """
+    Ringkasan job yang sudah selesai, bentuknya sama dengan hasil
+    stream_predict (rows, rejected, violations, seconds, counts, preview, path).
+    """
+    job = load_job(job_id, root)
+    done = read_checkpoint(os.path.join(job_dir(job_id, root), CHECKPOINT_FILE))
+    violations = {}
+    for entry in done.values():
+        for col, reason, count in entry["violations"]:
+            violations[col, reason] = violations.get((col, reason), 0) + count
+
+    summary = {}
+    for name in job["models"]:
+        path = _output_path(job, name, root)
+        counts = pd.Series(dtype="int64")
+        for entry in done.values():
+            counts = counts.add(pd.Series(entry["models"][name]["counts"], dtype="int64"), fill_value=0)
+        summary[name] = {
+            "rows": sum(entry["models"][name]["rows"] for entry in done.values()),
+            "rejected": job["rows_rejected"],
+            "violations": violations,
+            "seconds": sum(entry["models"][name]["seconds"] for entry in done.values()),
+            "counts": counts.astype("int64"),
+            "preview": read_preview(path, PREVIEW_ROWS) if os.path.exists(path) else None,
+            "path": path,
+        }
+    return summary
+
+
+def job_metrics(job_id, root=DEFAULT_JOBS_DIR):
+    path = os.path.join(job_dir(job_id, root), METRICS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def rejected_path(job_id, root=DEFAULT_JOBS_DIR):
+    path = os.path.join(job_dir(job_id, root), "output", f"{REJECTED}.csv")
+    return path if os.path.exists(path) else None
+
+
+def _output_path(job, name, root):
+    return os.path.join(
+        job_dir(job["id"], root), "output",
+        f"batch_prediction_{name.lower()}{job['output_format']}",
+    )
+
+
+def _part_path(path, name, index):
+    return os.path.join(path, "parts", name, f"{index:06d}.parquet")
+
+
+# =============================================================
+# Worker
+# =============================================================
+def _try_lock(root):
+    """File lock worker (terkunci) atau None jika worker lain hidup."""
+    os.makedirs(root, exist_ok=True)
+    f = open(os.path.join(root, LOCK_FILE), "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+def worker_alive(root=DEFAULT_JOBS_DIR):
+    lock = _try_lock(root)
+    if lock is None:
+        return True
+    lock.close()
+    return False
+
+
+_started = {}
+
+
+def ensure_worker(root=DEFAULT_JOBS_DIR):
+    """
+    Nyalakan worker (proses terpisah, lepas dari sesi Streamlit) bila belum
+    hidup. Aman dipanggil tiap polling: worker yang baru dinyalakan diberi
+    waktu WORKER_START_SECONDS untuk memegang lock.
+    """
+    if worker_alive(root) or time.time() - _started.get(root, 0) < WORKER_START_SECONDS:
+        return False
+    _started[root] = time.time()
+    with open(os.path.join(root, LOG_FILE), "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "services.jobs", "--root", root, "worker", "--once"],
+            cwd=BASE_DIR,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    return True
+
+
+def next_job(root=DEFAULT_JOBS_DIR):
+    """Job tertua yang belum selesai (running = ditinggal worker yang mati)."""
+    pending = [job for job in list_jobs(root) if job["status"] in PENDING_STATUSES]
+    return min(pending, key=lambda job: job["created_at"])["id"] if pending else None
+
+
+def _score_chunk(job, path, index, chunk, offset, schema):
+    """
+    Nilai satu chunk; part hasil ditulis ke file sementara lalu di-rename.
+
+    return : entry checkpoint
+    """
+    entry = {"chunk": index, "rows": len(chunk), "rejected": 0, "violations": [], "models": {}}
+
+    if schema is not None:
+        with span("validate", rows=len(chunk)):
+            valid, report = validate(chunk, schema, offset=offset)
+        if not report.empty:
+            entry["rejected"] = int((~valid).sum())
+            entry["violations"] = [
+                [col, reason, int(count)]
+                for (col, reason), count in report.groupby(["column", "reason"]).size().items()
+            ]
+            _write_part(path, REJECTED, index, report)
+            chunk = chunk[valid]
+
+    names = list(job["models"])
+    writers = {name: ParquetResultWriter(_part_path(path, name, index) + ".tmp") for name in names}
+    summary = stream_predict(
+        [chunk] if len(chunk) else [],
+        job["models"],
+        writers,
+        batch_size=job["batch_size"],
+        threshold=job["threshold"],
+        mode=job["mode"],
+        top_k=job["top_k"],
+        validate=False,
+    )
+    for name in names:
+        tmp = writers[name].path
+        if writers[name].rows:
+            os.replace(tmp, tmp[:-len(".tmp")])
+        entry["models"][name] = {
+            "rows": summary[name]["rows"],
+            "seconds": summary[name]["seconds"],
+            "counts": {label: int(count) for label, count in summary[name]["counts"].items()},
+        }
+    return entry
+
+
+def _write_part(path, name, index, df):
+    part = _part_path(path, name, index)
+    with ParquetResultWriter(part + ".tmp") as writer:
+        writer.write(df)
+    os.replace(part + ".tmp", part)
+
+
+def _finalize(job, path, done, root):
+    """
+    Gabungkan part semua chunk (urut) ke file output akhir. Tiap output
+    ditulis ke file sementara lalu di-rename; part tidak dihapus di sini
+    agar finalize bisa diulang bila worker mati sebelum job ditandai done.
+    """
+    output_dir = os.path.join(path, "output")
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {name: _output_path(job, name, root) for name in job["models"]}
+    outputs[REJECTED] = os.path.join(output_dir, f"{REJECTED}.csv")
+
+    for name, output in outputs.items():
+        # Ekstensi dipertahankan agar open_writer memilih format yang sama
+        tmp = os.path.join(output_dir, ".tmp-" + os.path.basename(output))
+        writer = CsvResultWriter(tmp) if name == REJECTED else open_writer(tmp)
+        with writer, span("write", None if name == REJECTED else name):
+            for index in sorted(done):
+                part = _part_path(path, name, index)
+                if os.path.exists(part):
+                    writer.write(pd.read_parquet(part))
+        if os.path.exists(tmp):
+            os.replace(tmp, output)
+
+
+def run_job(job_id, root=DEFAULT_JOBS_DIR):
+    """Nilai job sampai selesai, lanjut dari checkpoint bila pernah terputus."""
+    path = job_dir(job_id, root)
+    job = load_job(job_id, root)
+    checkpoint_path = os.path.join(path, CHECKPOINT_FILE)
+    done = read_checkpoint(checkpoint_path)
+    rows_done = sum(entry["rows"] for entry in done.values())
+    rows_rejected = sum(entry["rejected"] for entry in done.values())
+
+    metrics.reset()
+    now = time.time()
+    job = update_job(
+        job_id, root,
+        status="running",
+        started_at=job["started_at"] or now,
+        run_started_at=now,
+        run_rows_start=rows_done,
+        runs=job["runs"] + 1,
+        rows_done=rows_done,
+        rows_rejected=rows_rejected,
+        chunks_done=len(done),
+        worker_pid=os.getpid(),
+        error=None,
+    )
+    print(f"[{job_id}] mulai, {len(done)} chunk sudah di checkpoint", flush=True)
+
+    try:
+        schema = None
+        if job["validate"]:
+            schema = merge_schemas(model_schema(name) for name in job["models"].values())
+
+        offset = 0
+        chunks = iter_input_chunks(job["input"], job["chunksize"], columns=job["columns"])
+        with open(checkpoint_path, "a") as checkpoint:
+            for index, chunk in enumerate(chunks):
+                if index in done:
+                    offset += len(chunk)
+                    continue
+                if os.path.exists(os.path.join(path, CANCEL_FILE)):
+                    update_job(job_id, root, status="cancelled", finished_at=time.time())
+                    print(f"[{job_id}] dibatalkan", flush=True)
+                    return
+
+                entry = _score_chunk(job, path, index, chunk, offset, schema)
+                checkpoint.write(json.dumps(entry) + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+
+                done[index] = entry
+                offset += len(chunk)
+                rows_done += entry["rows"]
+                rows_rejected += entry["rejected"]
+                update_job(
+                    job_id, root,
+                    rows_done=rows_done,
+                    rows_rejected=rows_rejected,
+                    chunks_done=len(done),
+                )
+
+        _finalize(job, path, done, root)
+        metrics.finish()
+        _write_json(os.path.join(path, METRICS_FILE), metrics.snapshot())
+        update_job(
+            job_id, root,
+            status="done",
+            finished_at=time.time(),
+            total_rows=rows_done,
+        )
+        shutil.rmtree(os.path.join(path, "parts"), ignore_errors=True)
+        print(f"[{job_id}] selesai, {rows_done:,} baris", flush=True)
+    except Exception as exc:
+        traceback.print_exc()
+        update_job(job_id, root, status="failed", finished_at=time.time(), error=f"{type(exc).__name__}: {exc}")
+
+
+def run_worker(root=DEFAULT_JOBS_DIR, once=False, poll=POLL_SECONDS):
+    """
+    Loop worker: nilai job satu per satu. once=True → keluar saat antrian
+    kosong. return False jika worker lain sudah memegang lock.
+    """
+    lock = _try_lock(root)
+    if lock is None:
+        return False
+    try:
+        while True:
+            job_id = next_job(root)
+            if job_id is None:
+                if once:
+                    return True
+                time.sleep(poll)
+                continue
+            run_job(job_id, root)
+    finally:
+        lock.close()
+
+
+# =============================================================
+# CLI
+# =============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.jobs", description="Antrian job batch scoring lokal.")
+    parser.add_argument("--root", default=DEFAULT_JOBS_DIR, help="folder antrian job")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="jalankan worker")
+    worker.add_argument("--once", action="store_true", help="berhenti saat antrian kosong")
+
+    submit = commands.add_parser("submit", help="masukkan file ke antrian")
+    submit.add_argument("--model", action="append", choices=registry.names(), required=True)
+    submit.add_argument("--in", dest="input", required=True)
+    submit.add_argument("--format", choices=sorted(RESULT_WRITERS), default=".csv")
+    submit.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    submit.add_argument("--parallel", choices=JOB_MODES, default="serial")
+    submit.add_argument("--reasons", type=int, default=0, metavar="K")
+    submit.add_argument("--no-start", dest="start", action="store_false", help="jangan nyalakan worker")
+
+    commands.add_parser("list", help="daftar job")
+    cancel = commands.add_parser("cancel", help="batalkan job")
+    cancel.add_argument("job_id")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        if not run_worker(args.root, once=args.once):
+            print("worker lain sedang berjalan", file=sys.stderr)
+    elif args.command == "submit":
+        print(submit_job(
+            args.input, list(dict.fromkeys(args.model)), args.root,
+            output_format=args.format, chunksize=args.chunksize,
+            mode=args.parallel, top_k=args.reasons, start=args.start,
+        ))
+    elif args.command == "list":
+        for job in list_jobs(args.root):
+            total = f"{job['total_rows']:,}" if job["total_rows"] is not None else "?"
+            print(f"{job['id']}  {job['status']:<9} {job['rows_done']:>12,} / {total:<12} "
+                  f"{','.join(job['models'].values())}  {job['name']}")
+    elif args.command == "cancel":
+        cancel_job(args.job_id, args.root)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
 # src/services/mlp_service.py
+import json
 import os
 import joblib
 import numpy as np
-import streamlit as st
-from tensorflow.keras.models import load_model
+from services.registry import registry
+from services.batch_stream import iter_batches
+from services.fast_preprocessor import FAST_PREPROCESSOR_FILE, load_fast_preprocessor
+from services.base import (
+    DEFAULT_BATCH_SIZE,
+    predict_batch,
+    predict_in_stages,
+    predict_single,
+    resolve_backend,
+    to_frame,
+)
 
 
 
@@ -16,20 +26,230 @@ MODEL_DIR = os.path.join(BASE_DIR, "models", "mlp_credit_risk_model")
 MODEL_PATH = os.path.join(MODEL_DIR, "mlp_model.h5")
 PREPROCESSOR_PATH = os.path.join(MODEL_DIR, "preprocessor_mlp.pkl")
 
+BACKENDS = ("keras", "numpy", "onnx")
+
 # =============================================================
-# Load model & preprocessor dengan cache
+# Bobot layer dari file .h5 (tanpa TensorFlow)
 # =============================================================
-@st.cache_resource
-def load_mlp_model():
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(f"MLP model not found: {MODEL_PATH}")
-    if not os.path.exists(PREPROCESSOR_PATH):
-        raise FileNotFoundError(f"Preprocessor not found: {PREPROCESSOR_PATH}")
+def read_h5_layers(path=MODEL_PATH):
+    """
+    Baca konfigurasi & bobot Sequential Keras dari file .h5 dengan h5py.
+
+    return : list dict {"class_name", "config", "weights"} sesuai urutan layer,
+             weights berurutan seperti layer.get_weights()
+    """
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        group = f["model_weights"]
+
+        layers = []
+        for layer in config["config"]["layers"]:
+            name = layer["config"]["name"]
+            weights = []
+            if name in group:
+                weight_names = group[name].attrs["weight_names"]
+                weights = [np.asarray(group[name][w]) for w in weight_names]
+            layers.append({
+                "class_name": layer["class_name"],
+                "config": layer["config"],
+                "weights": weights,
+            })
+
+    return layers
+
+
+def dense_layers(layers):
+    """
+    Layer dari read_h5_layers() → list dict {"kernel", "bias", "activation"}
+    per layer Dense, dengan BatchNorm dilipat (dipakai export ONNX).
+
+    Dropout diabaikan (inference). BatchNormalization setelah aktivasi
+    adalah transform affine x*s + t, sehingga dilipat ke layer Dense
+    berikutnya: W' = s[:, None] * W, b' = t @ W + b.
+    """
+    dense = []
+    scale = shift = None
+
+    for layer in layers:
+        kind, config = layer["class_name"], layer["config"]
+        weights = [w.astype(np.float64) for w in layer["weights"]]
+
+        if kind == "Dense":
+            kernel, bias = weights
+            if scale is not None:
+                bias = shift @ kernel + bias
+                kernel = scale[:, None] * kernel
+                scale = shift = None
+            dense.append({"kernel": kernel, "bias": bias, "activation": config["activation"]})
+        elif kind == "BatchNormalization":
+            gamma, beta, mean, var = weights
+            s = gamma / np.sqrt(var + config["epsilon"])
+            t = beta - mean * s
+            # BatchNorm berturut-turut digabung menjadi satu affine
+            scale, shift = (s, t) if scale is None else (scale * s, shift * s + t)
+        elif kind not in ("Dropout", "InputLayer"):
+            raise ValueError(f"Unsupported layer '{config['name']}' ({kind})")
 
-    model = load_model(MODEL_PATH)
-    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    if scale is not None:
+        raise ValueError("BatchNormalization after the last Dense layer is not supported")
+    return dense
 
-    return model, preprocessor
+
+# =============================================================
+# Forward pass NumPy (backend "numpy")
+# =============================================================
+NUMPY_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "sigmoid": lambda x: 0.5 * (1 + np.tanh(0.5 * x)),   # stabil, tanpa overflow exp
+    "tanh": np.tanh,
+}
+
+# Turunan aktivasi sebagai fungsi output-nya (untuk input_gradient)
+NUMPY_ACTIVATION_GRADIENTS = {
+    "linear": lambda y: np.ones_like(y),
+    "relu": lambda y: (y > 0).astype(y.dtype),
+    "sigmoid": lambda y: y * (1 - y),
+    "tanh": lambda y: 1 - y * y,
+}
+
+
+class NumpyMLP:
+    """
+    Forward pass Sequential Dense/BatchNorm/Dropout dengan matmul NumPy float32.
+
+    BatchNorm dihitung seperti tf.nn.batch_normalization (inv = rsqrt(var + eps)
+    * gamma; x * inv + (beta - mean * inv)) dan tidak dilipat, agar urutan
+    operasi float32 sama dengan Keras.
+    """
+
+    def __init__(self, layers):
+        self.ops = []
+        self.activations = []       # nama aktivasi tiap Dense, urut ops
+
+        for layer in layers:
+            kind, config = layer["class_name"], layer["config"]
+            weights = [w.astype(np.float32) for w in layer["weights"]]
+
+            if kind == "Dense":
+                if config["activation"] not in NUMPY_ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation '{config['activation']}'")
+                kernel, bias = weights
+                self.ops.append(("dense", kernel, bias, NUMPY_ACTIVATIONS[config["activation"]]))
+                self.activations.append(config["activation"])
+            elif kind == "BatchNormalization":
+                gamma, beta, mean, var = weights
+                inv = (1 / np.sqrt(var + np.float32(config["epsilon"]))) * gamma
+                self.ops.append(("affine", inv, beta - mean * inv, None))
+            elif kind not in ("Dropout", "InputLayer"):
+                raise ValueError(f"Unsupported layer '{config['name']}' ({kind})")
+
+    def __call__(self, X):
+        for kind, a, b, activation in self.ops:
+            if kind == "dense":
+                X = activation(X @ a + b)
+            else:
+                X = X * a + b
+        return X
+
+    def input_gradient(self, X):
+        """
+        Gradien output pertama (probabilitas sigmoid) terhadap input, per baris.
+
+        Backprop manual: forward menyimpan output tiap op, lalu gradien
+        dikalikan turunan aktivasi & transpose kernel dari layer terakhir.
+        return : (probs (n,), grad (n, n_input))
+        """
+        outputs = []
+        for kind, a, b, activation in self.ops:
+            X = activation(X @ a + b) if kind == "dense" else X * a + b
+            outputs.append(X)
+
+        grad = np.zeros_like(X)
+        grad[:, 0] = 1
+        names = iter(reversed(self.activations))
+        for (kind, a, _, _), y in zip(reversed(self.ops), reversed(outputs)):
+            if kind == "dense":
+                grad = (grad * NUMPY_ACTIVATION_GRADIENTS[next(names)](y)) @ a.T
+            else:
+                grad = grad * a
+        return X[:, 0], grad
+
+    def predict(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        if len(X) <= batch_size:
+            return self(X)
+        return np.concatenate([self(X[batch]) for batch in iter_batches(len(X), batch_size)])
+
+
+# =============================================================
+# Service MLP (implementasi ModelService)
+# =============================================================
+class MLPService:
+    name = "mlp"
+    n_inputs = 1        # jumlah matriks hasil preprocess()
+
+    def __init__(self, backend=None):
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(f"MLP model not found: {MODEL_PATH}")
+        if not os.path.exists(PREPROCESSOR_PATH):
+            raise FileNotFoundError(f"Preprocessor not found: {PREPROCESSOR_PATH}")
+
+        self.model_dir = MODEL_DIR
+        # "keras" (default), "numpy" (bobot .h5 dibaca sekali, tanpa TensorFlow)
+        # atau "onnx" (services/onnx_backend.py), env MLP_BACKEND
+        self.backend = resolve_backend(self.name, backend, BACKENDS)
+        if self.backend == "onnx":
+            from services.onnx_backend import load_onnx_model
+            self.model = load_onnx_model(MODEL_DIR)
+        elif self.backend == "numpy":
+            self.model = NumpyMLP(read_h5_layers(MODEL_PATH))
+        else:
+            from tensorflow.keras.models import load_model
+            self.model = load_model(MODEL_PATH)
+
+        self.preprocessor = joblib.load(PREPROCESSOR_PATH)
+        # Versi NumPy dari preprocessor (services/fast_preprocessor.py), jika ada
+        self.fast_preprocessor = load_fast_preprocessor(MODEL_DIR)
+        # Menentukan versi matriks hasil preprocess (services/prepared_dataset.py)
+        self.preprocessor_files = (
+            PREPROCESSOR_PATH,
+            os.path.join(MODEL_DIR, FAST_PREPROCESSOR_FILE),
+        )
+
+    def preprocess(self, X):
+        """Input mentah → tuple matriks siap model: (X float32,)."""
+        if self.fast_preprocessor is None:
+            return (self.preprocessor.transform(to_frame(X)).astype(np.float32),)
+        return self.preprocess_parsed(*self.fast_preprocessor.parse(to_frame(X)))
+
+    def preprocess_parsed(self, X_num, X_cat):
+        """Hasil FastPreprocessor.parse() → (X float32,)."""
+        return (np.hstack([self.fast_preprocessor.scale_numerical(X_num), X_cat]).astype(np.float32),)
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        return predict_in_stages(self, X, batch_size)
+
+    def predict_prepared(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        # Keras predict / NumPy / ONNX Runtime → probability
+        if self.backend == "onnx":
+            probs = self.model.run(X, batch_size=batch_size)
+        elif self.backend == "numpy":
+            probs = self.model.predict(X, batch_size=batch_size)
+        else:
+            probs = self.model.predict(X, batch_size=batch_size, verbose=0)
+        if probs.shape[1] == 2:     # softmax 2 output → kelas 1 (gagal bayar)
+            return probs[:, 1]
+        return probs[:, 0]          # single sigmoid output
+
+
+# Model dimuat lazy & di-cache oleh registry
+registry.register("mlp", MLPService)
+
+
+def get_mlp_service():
+    return registry.get("mlp")
 
 # =============================================================
 # Fungsi prediksi risiko kredit
@@ -41,41 +261,10 @@ def predict_mlp_risk(input_df):
         pred_label : list[int] → 0 (Lancar Bayar) / 1 (Gagal Bayar)
         probas : list[float] → probabilitas gagal bayar
     """
-    model, preprocessor = load_mlp_model()
-
-    # Preprocessing
-    X = preprocessor.transform(input_df)
-    X = X.astype(np.float32)
-
-    # Prediksi
-    probs = model.predict(X)[0]         # [prob_rendah, prob_tinggi] jika output softmax
-    if probs.shape[0] == 2:             # softmax 2 output
-        pred = int(np.argmax(probs))
-        proba_gagal = float(probs[1])   # probabilitas kelas 1 → gagal bayar
-    else:                               # single sigmoid output
-        pred = int(probs[0] >= 0.5)
-        proba_gagal = float(probs[0])
+    pred, proba_gagal = predict_single(get_mlp_service(), input_df)
 
     # Return label dan probabilitas gagal bayar
     return [pred], [proba_gagal]
 
-def predict_mlp_batch(df):
-    model, preprocessor = load_mlp_model()
-
-    # preprocessing
-    X = preprocessor.transform(df)
-
-    # Keras predict → probability
-    probs = model.predict(X).reshape(-1)
-
-    # binary decision
-    preds = (probs >= 0.5).astype(int)
-
-    df_out = df.copy()
-    df_out["prediction"] = preds
-    df_out["prob_gagal_bayar"] = probs
-    df_out["prediction_label"] = np.where(
-        preds == 1, "Gagal Bayar", "Lancar Bayar"
-    )
-
-    return df_out
+def predict_mlp_batch(df, batch_size=DEFAULT_BATCH_SIZE, top_k=0):
+    return predict_batch(get_mlp_service(), df, batch_size=batch_size, top_k=top_k)
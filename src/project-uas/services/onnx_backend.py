@@ -0,0 +1,281 @@
+# services/onnx_backend.py
+"""
+Export model ke ONNX + backend ONNX Runtime (CPU).
+
+Setiap model diekspor menjadi `model.onnx` di folder modelnya dengan
+dimensi batch dinamis. Input graph adalah fitur yang sudah dipreprocess
+(services/fast_preprocessor.py), output-nya probabilitas:
+    MLP     : x [N, 11] float32              → probs [N, 1] (sigmoid)
+    TabNet  : x [N, 11] float32              → probs [N, 2] (softmax)
+    FT      : x_num [N, 7] float32,
+              x_cat [N, 4] int64             → probs [N, 2] (softmax)
+
+Backend dipilih per service lewat argumen `backend` atau env var
+MLP_BACKEND / TABNET_BACKEND / FT_BACKEND (mis. FT_BACKEND=onnx).
+
+Export ulang & cek parity terhadap backend asli (dari src/project-uas):
+    python -m services.onnx_backend
+    python -m services.onnx_backend --check         # cek model.onnx yang ada, tanpa export
+    python -m services.onnx_backend --check ft
+"""
+import argparse
+import os
+
+import numpy as np
+
+
+ONNX_FILE = "model.onnx"
+ONNX_OPSET = 17
+ONNX_IR_VERSION = 8     # IR version minimum untuk opset 17 (kompatibel ONNX Runtime lama)
+PARITY_ATOL = 1e-4    # float32, urutan operasi berbeda antar runtime
+
+
+# =============================================================
+# RUNTIME
+# =============================================================
+class OnnxModel:
+    """InferenceSession ONNX Runtime di CPU; run() mengembalikan output pertama."""
+
+    def __init__(self, path, intra_op_threads=None):
+        import onnxruntime as ort
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"ONNX model not found: {path} (run: python -m services.onnx_backend)"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.path = path
+        self.session = ort.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def run(self, *inputs, batch_size=None):
+        """inputs: array per input graph (urutan input_names), dipotong per batch_size baris."""
+        from services.batch_stream import iter_batches
+
+        n_rows = len(inputs[0])
+        if not batch_size or n_rows <= batch_size:
+            return self.session.run(None, dict(zip(self.input_names, inputs)))[0]
+
+        return np.concatenate([
+            self.session.run(None, {
+                name: x[batch] for name, x in zip(self.input_names, inputs)
+            })[0]
+            for batch in iter_batches(n_rows, batch_size)
+        ])
+
+
+def load_onnx_model(model_dir):
+    return OnnxModel(os.path.join(model_dir, ONNX_FILE))
+
+
+# =============================================================
+# EXPORT: torch (TabNet, FT-Transformer)
+# =============================================================
+def _softmax_module(network, unpack_logits=False):
+    import torch
+
+    class SoftmaxHead(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.network = network
+
+        def forward(self, *inputs):
+            logits = self.network(*inputs)
+            if unpack_logits:         # TabNet: (logits, M_loss)
+                logits = logits[0]
+            return torch.softmax(logits, dim=1)
+
+    return SoftmaxHead().eval()
+
+
+def _export_torch(module, example_inputs, input_names, path):
+    import torch
+
+    dynamic_axes = {name: {0: "batch"} for name in input_names + ["probs"]}
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            tuple(example_inputs),
+            path,
+            input_names=input_names,
+            output_names=["probs"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+
+
+def export_tabnet(service, path, example):
+    import torch
+
+    X = torch.from_numpy(service.fast_preprocessor.transform(example).astype(np.float32))
+    module = _softmax_module(service.model.network, unpack_logits=True)
+    _export_torch(module, [X], ["x"], path)
+
+
+def export_ft(service, path, example):
+    import torch
+    from services.ft_transformer_service import dynamic_batch_copy
+
+    model = dynamic_batch_copy(service.model)
+
+    X_num = torch.from_numpy(
+        service.fast_preprocessor.transform_numerical(example).astype(np.float32)
+    )
+    X_cat = torch.from_numpy(service.fast_preprocessor.transform_categorical(example))
+    _export_torch(_softmax_module(model), [X_num, X_cat], ["x_num", "x_cat"], path)
+
+
+# =============================================================
+# EXPORT: Keras MLP (graph ONNX dibangun dari bobot dense)
+# =============================================================
+ONNX_ACTIVATIONS = {"relu": "Relu", "sigmoid": "Sigmoid", "tanh": "Tanh", "softmax": "Softmax"}
+
+
+def export_mlp(service, path, example=None):
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+    from services.mlp_service import MODEL_PATH, dense_layers, read_h5_layers
+
+    layers = dense_layers(read_h5_layers(MODEL_PATH))
+    n_features = layers[0]["kernel"].shape[0]
+
+    nodes, initializers = [], []
+    current = "x"
+
+    for i, layer in enumerate(layers):
+        kernel, bias = f"dense_{i}/kernel", f"dense_{i}/bias"
+        initializers += [
+            numpy_helper.from_array(layer["kernel"].astype(np.float32), kernel),
+            numpy_helper.from_array(layer["bias"].astype(np.float32), bias),
+        ]
+        out = f"dense_{i}"
+        nodes.append(helper.make_node("Gemm", [current, kernel, bias], [out]))
+
+        activation = layer["activation"]
+        if activation != "linear":
+            if activation not in ONNX_ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{activation}'")
+            act_out = f"{out}/{activation}"
+            nodes.append(helper.make_node(ONNX_ACTIVATIONS[activation], [out], [act_out]))
+            out = act_out
+        current = out
+
+    nodes.append(helper.make_node("Identity", [current], ["probs"]))
+    graph = helper.make_graph(
+        nodes,
+        "mlp_credit_risk",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["batch", n_features])],
+        [helper.make_tensor_value_info("probs", TensorProto.FLOAT, ["batch", layers[-1]["kernel"].shape[1]])],
+        initializer=initializers,
+    )
+    model = helper.make_model(
+        graph,
+        opset_imports=[helper.make_opsetid("", ONNX_OPSET)],
+        ir_version=ONNX_IR_VERSION,
+    )
+    onnx.checker.check_model(model)
+    onnx.save(model, path)
+
+
+# =============================================================
+# EXPORT SEMUA MODEL + CEK PARITY
+# =============================================================
+EXPORTERS = {
+    "mlp": export_mlp,
+    "tabnet": export_tabnet,
+    "ft": export_ft,
+}
+
+
+def _parity_data():
+    """return : (df contoh, mask baris berkategori asing)"""
+    import pandas as pd
+
+    sample_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "utils", "batch_prediction_result.csv",
+    )
+    df = pd.read_csv(sample_path)
+    # Tambahkan kategori asing: kedua backend harus menanganinya dengan cara yang sama
+    unknown = np.zeros(len(df), dtype=bool)
+    unknown[::89] = True
+    df.loc[unknown, "loan_intent"] = "UNKNOWN"
+    return df, unknown
+
+
+def _outcome(fn, df):
+    try:
+        return fn(df)
+    except Exception as exc:
+        return exc
+
+
+def check_parity(name, reference, onnx_probs, atol=PARITY_ATOL):
+    reference = np.asarray(reference, dtype=np.float64)
+    onnx_probs = np.asarray(onnx_probs, dtype=np.float64)
+    max_diff = np.nanmax(np.abs(reference - onnx_probs)) if reference.size else 0.0
+    same_nan = np.array_equal(np.isnan(reference), np.isnan(onnx_probs))
+    if max_diff > atol or not same_nan:
+        raise AssertionError(f"{name}: ONNX output differs (max diff {max_diff:.3e}, NaN mask equal={same_nan})")
+    print(f"{name:<8} OK  max |diff| = {max_diff:.2e}")
+    return max_diff
+
+
+def main(argv=None):
+    from services.registry import registry
+
+    parser = argparse.ArgumentParser(
+        prog="python -m services.onnx_backend",
+        description="Export model.onnx & cek parity terhadap backend asli.",
+    )
+    parser.add_argument("models", nargs="*", metavar="model",
+                        help=f"model yang diproses (default semua: {', '.join(EXPORTERS)})")
+    parser.add_argument("--check", action="store_true",
+                        help="hanya cek parity model.onnx yang sudah ada (file tidak ditulis ulang)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.models if name not in EXPORTERS]
+    if unknown:
+        parser.error(f"unknown model(s) {unknown}, choose from {list(EXPORTERS)}")
+
+    df, unknown = _parity_data()
+    known = df[~unknown]
+    for name in args.models or list(EXPORTERS):
+        # Tanpa CachedService: konstruktor & export butuh service asli
+        service = registry.get(name)
+        service = getattr(service, "service", service)
+        if getattr(service, "backend", None) == "onnx" or getattr(service, "quantized", False):
+            raise ValueError(
+                f"{name}: parity needs the original fp32 backend, unset {name.upper()}_BACKEND / FT_QUANTIZE"
+            )
+
+        if not args.check:
+            path = os.path.join(service.model_dir, ONNX_FILE)
+            EXPORTERS[name](service, path, known.head(64))
+
+        # Service baru dengan backend ONNX vs backend asli, pada seluruh data contoh
+        onnx_service = type(service)(backend="onnx")
+        reference = _outcome(service.predict_proba, df)
+        onnx_probs = _outcome(onnx_service.predict_proba, df)
+        if isinstance(reference, Exception) or isinstance(onnx_probs, Exception):
+            # Backend asli menolak kategori asing: ONNX harus menolak juga
+            if type(reference) is not type(onnx_probs):
+                raise AssertionError(
+                    f"{name}: unknown categories give {reference!r} vs ONNX {onnx_probs!r}"
+                )
+            print(f"{name:<8} OK  kategori asing ditolak ({type(reference).__name__})")
+            reference = service.predict_proba(known)
+            onnx_probs = onnx_service.predict_proba(known)
+        check_parity(name, reference, onnx_probs)
+        check_parity(f"{name}-1", service.predict_proba(known.head(1)), onnx_service.predict_proba(known.head(1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+# services/prediction_cache.py
+"""
+Cache hasil prediksi berbasis isi baris (content-addressed).
+
+Key per baris = hash vektor (pandas hash_pandas_object) atas 11 fitur
+input, digabung dengan versi artifact model (hash isi file di folder model
++ backend). Nilai yang disimpan = probabilitas gagal bayar.
+
+Tier:
+    memori : LRU (OrderedDict) dengan batas jumlah entry & TTL opsional
+    disk   : SQLite opsional (bertahan antar proses/restart), LRU + TTL
+
+CachedService membungkus ModelService apa pun; predict_proba hanya
+menjalankan model pada baris yang belum ada di cache (baris duplikat
+dalam satu batch cukup dihitung sekali).
+
+Konfigurasi registry lewat env:
+    PREDICTION_CACHE        off (default) | memory | disk
+    PREDICTION_CACHE_SIZE   jumlah entry memori (default 100000)
+    PREDICTION_CACHE_TTL    detik, kosong = tanpa kedaluwarsa
+    PREDICTION_CACHE_PATH   file SQLite tier disk
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from services.base import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_THRESHOLD,
+    FEATURE_COLUMNS,
+    NUMERICAL_FEATURES,
+    predict_batch,
+    predict_single,
+    to_frame,
+)
+
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_DISK_ENTRIES = 5_000_000
+DEFAULT_DISK_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".cache", "predictions.sqlite",
+)
+CACHE_MODES = ("off", "memory", "disk")
+
+SQLITE_MAX_VARIABLES = 900
+
+
+# =============================================================
+# Hash baris & versi artifact
+# =============================================================
+def hash_rows(X):
+    """
+    Hash uint64 per baris atas FEATURE_COLUMNS (vektor, tanpa loop Python).
+
+    Fitur numerik dinormalisasi ke float64 sehingga 30 dan 30.0 (form vs
+    CSV) menghasilkan key yang sama.
+    """
+    df = to_frame(X)
+    normalized = pd.DataFrame({
+        col: df[col].astype(np.float64) if col in NUMERICAL_FEATURES else df[col].astype(object)
+        for col in FEATURE_COLUMNS
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+def artifact_version(service):
+    """Hash isi file artifact model + backend/mode inference (hex, 16 karakter)."""
+    digest = hashlib.sha256()
+    digest.update(
+        f"{service.name}:{getattr(service, 'backend', '')}:"
+        f"{getattr(service, 'quantized', False)}".encode()
+    )
+
+    model_dir = getattr(service, "model_dir", None)
+    if model_dir:
+        for filename in sorted(os.listdir(model_dir)):
+            path = os.path.join(model_dir, filename)
+            if os.path.isfile(path):
+                digest.update(filename.encode())
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+
+    # Ensemble: versi ikut berubah bila artifact anggota / metode combine berubah
+    members = getattr(service, "members", ())
+    for member in members:
+        digest.update(artifact_version(member).encode())
+    if members:
+        digest.update(str(getattr(service, "method", "")).encode())
+
+    return digest.hexdigest()[:16]
+
+
+def version_keys(row_hashes, version):
+    """Gabungkan hash baris dengan versi artifact → key cache uint64."""
+    return row_hashes ^ np.uint64(int(version, 16))
+
+
+# =============================================================
+# Tier disk (SQLite)
+# =============================================================
+class DiskTier:
+    def __init__(self, path=DEFAULT_DISK_PATH, max_entries=DEFAULT_MAX_DISK_ENTRIES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key INTEGER PRIMARY KEY, prob REAL NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS predictions_accessed ON predictions (accessed)"
+        )
+
+    @staticmethod
+    def _sql_keys(keys):
+        # SQLite INTEGER bertanda 64-bit
+        return np.asarray(keys, dtype=np.uint64).view(np.int64).tolist()
+
+    def get_many(self, keys, min_created=None):
+        found = {}
+        sql_keys = self._sql_keys(keys)
+
+        for start in range(0, len(sql_keys), SQLITE_MAX_VARIABLES):
+            chunk = sql_keys[start:start + SQLITE_MAX_VARIABLES]
+            rows = self._conn.execute(
+                f"SELECT key, prob, created FROM predictions"
+                f" WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            found.update(
+                (key, prob) for key, prob, created in rows
+                if min_created is None or created >= min_created
+            )
+
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE predictions SET accessed = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            self._conn.commit()
+
+        return {np.int64(key).view(np.uint64).item(): prob for key, prob in found.items()}
+
+    def put_many(self, keys, probs):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO predictions (key, prob, created, accessed) VALUES (?, ?, ?, ?)",
+            [(key, float(prob), now, now) for key, prob in zip(self._sql_keys(keys), probs)],
+        )
+        evicted = self._evict()
+        self._conn.commit()
+        return evicted
+
+    def _evict(self):
+        size = self.size()
+        if size <= self.max_entries:
+            return 0
+        excess = size - self.max_entries
+        self._conn.execute(
+            "DELETE FROM predictions WHERE key IN"
+            " (SELECT key FROM predictions ORDER BY accessed LIMIT ?)",
+            (excess,),
+        )
+        return excess
+
+    def expire(self, min_created):
+        cursor = self._conn.execute("DELETE FROM predictions WHERE created < ?", (min_created,))
+        self._conn.commit()
+        return cursor.rowcount
+
+    def size(self):
+        return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def clear(self):
+        self._conn.execute("DELETE FROM predictions")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+# =============================================================
+# Cache dua tier
+# =============================================================
+class PredictionCache:
+    """
+    LRU memori (+ tier disk opsional) untuk probabilitas per key baris.
+
+    max_entries : batas entry tier memori (LRU)
+    ttl_seconds : umur maksimum entry (None = tanpa kedaluwarsa)
+    disk_path   : file SQLite untuk tier disk (None = hanya memori)
+    """
+
+    def __init__(
+        self,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        ttl_seconds=None,
+        disk_path=None,
+        max_disk_entries=DEFAULT_MAX_DISK_ENTRIES,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = DiskTier(disk_path, max_disk_entries) if disk_path else None
+
+        self._entries = OrderedDict()     # key -> (prob, created)
+        self._lock = threading.Lock()
+        self._metrics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        """PredictionCache dari env PREDICTION_CACHE*; None jika nonaktif."""
+        mode = os.environ.get("PREDICTION_CACHE", "off").lower()
+        if mode not in CACHE_MODES:
+            raise ValueError(f"PREDICTION_CACHE must be one of {CACHE_MODES}, got '{mode}'")
+        if mode == "off":
+            return None
+
+        ttl = os.environ.get("PREDICTION_CACHE_TTL")
+        return cls(
+            max_entries=int(os.environ.get("PREDICTION_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+            ttl_seconds=float(ttl) if ttl else None,
+            disk_path=(
+                os.environ.get("PREDICTION_CACHE_PATH", DEFAULT_DISK_PATH)
+                if mode == "disk" else None
+            ),
+        )
+
+    # =====================================================
+    # LOOKUP & SIMPAN
+    # =====================================================
+    def get_many(self, keys):
+        """
+        keys : ndarray uint64
+        return : (probs float64 dengan NaN untuk miss, mask hit)
+        """
+        probs = np.full(len(keys), np.nan)
+        hit = np.zeros(len(keys), dtype=bool)
+        now = time.time()
+        min_created = now - self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            entries = self._entries
+            for i, key in enumerate(keys.tolist()):
+                entry = entries.get(key)
+                if entry is None:
+                    continue
+                if min_created is not None and entry[1] < min_created:
+                    del entries[key]
+                    self._metrics["expired"] += 1
+                    continue
+                entries.move_to_end(key)
+                probs[i] = entry[0]
+                hit[i] = True
+            self._metrics["memory_hits"] += int(hit.sum())
+
+            if self.disk is not None and not hit.all():
+                missing = np.flatnonzero(~hit)
+                found = self.disk.get_many(keys[missing], min_created)
+                for i in missing:
+                    prob = found.get(keys[i].item())
+                    if prob is not None:
+                        probs[i] = prob
+                        hit[i] = True
+                        self._remember(keys[i].item(), prob, now)
+                        self._metrics["disk_hits"] += 1
+
+            self._metrics["misses"] += int((~hit).sum())
+
+        return probs, hit
+
+    def put_many(self, keys, probs):
+        probs = np.asarray(probs, dtype=np.float64)
+        # NaN (input tidak lengkap pada model tanpa imputasi) tidak di-cache
+        valid = np.isfinite(probs)
+        keys, probs = keys[valid], probs[valid]
+        now = time.time()
+
+        with self._lock:
+            for key, prob in zip(keys.tolist(), probs.tolist()):
+                self._remember(key, prob, now)
+            if self.disk is not None and len(keys):
+                self._metrics["evictions"] += self.disk.put_many(keys, probs)
+
+    def _remember(self, key, prob, created):
+        self._entries[key] = (prob, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+    # =====================================================
+    # METRIK & LIFECYCLE
+    # =====================================================
+    def stats(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["memory_entries"] = len(self._entries)
+        metrics["disk_entries"] = self.disk.size() if self.disk is not None else None
+
+        hits = metrics["memory_hits"] + metrics["disk_hits"]
+        lookups = hits + metrics["misses"]
+        metrics["hit_rate"] = hits / lookups if lookups else None
+        return metrics
+
+    def expire(self):
+        """Buang entry yang melewati TTL dari kedua tier."""
+        if not self.ttl_seconds:
+            return 0
+        min_created = time.time() - self.ttl_seconds
+        with self._lock:
+            stale = [key for key, (_, created) in self._entries.items() if created < min_created]
+            for key in stale:
+                del self._entries[key]
+            removed = len(stale) + (self.disk.expire(min_created) if self.disk is not None else 0)
+            self._metrics["expired"] += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.disk is not None:
+                self.disk.clear()
+
+
+# =============================================================
+# Service dengan cache
+# =============================================================
+class CachedService:
+    """
+    ModelService di belakang PredictionCache.
+
+    predict_proba, predict & predict_batch melewati cache; atribut lain
+    (mis. get_categorical_options FT) diteruskan ke service asli.
+    """
+
+    def __init__(self, service, cache: PredictionCache):
+        self.service = service
+        self.cache = cache
+        self.name = service.name
+        self.version = artifact_version(service)
+
+    def __getattr__(self, attr):
+        return getattr(self.service, attr)
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        df = to_frame(X)
+        keys = version_keys(hash_rows(df), self.version)
+        probs, hit = self.cache.get_many(keys)
+
+        if not hit.all():
+            # Hanya baris miss yang diprediksi; key duplikat cukup sekali
+            missing = np.flatnonzero(~hit)
+            unique_keys, first, inverse = np.unique(
+                keys[missing], return_index=True, return_inverse=True
+            )
+            computed = np.asarray(
+                self.service.predict_proba(df.iloc[missing[first]], batch_size=batch_size),
+                dtype=np.float64,
+            )
+            self.cache.put_many(unique_keys, computed)
+            probs[missing] = computed[inverse]
+
+        return probs.astype(np.float32)
+
+    def predict(self, input_data, threshold=DEFAULT_THRESHOLD):
+        """Satu nasabah → (kelas, [p_lancar, p_gagal]) seperti FTTransformerService.predict."""
+        pred, proba_gagal = predict_single(self, input_data, threshold)
+        return pred, np.array([1.0 - proba_gagal, proba_gagal], dtype=np.float32)
+
+    def predict_batch(self, df, batch_size=DEFAULT_BATCH_SIZE, threshold=DEFAULT_THRESHOLD, top_k=0, validate=False):
+        return predict_batch(
+            self, df, batch_size=batch_size, threshold=threshold, top_k=top_k, validate=validate
+        )
@@ -0,0 +1,332 @@
+# services/prepared_dataset.py
+"""
+Dataset siap-scoring: matriks hasil preprocess per model disimpan sebagai
+file `.npy` yang dibaca lewat memory map (zero-copy).
+
+Portofolio yang sama sering dinilai berulang (tiga model, beberapa
+threshold). Tahap "prepare" mem-parse input sekali, lalu menyimpan:
+
+    .cache/prepared/<hash input>/
+        input.arrow                  kolom input (Arrow IPC, di-memory-map)
+        <model>-<versi>.<i>.npy      matriks ke-i dari service.preprocess()
+        meta.json                    jumlah baris, kolom, model yang tersedia
+
+Key folder = sha256 isi file input + kolom yang dibaca; versi per model =
+hash file preprocessor (service.preprocessor_files). Run berikutnya dan
+worker process cukup np.load(..., mmap_mode="c") tanpa parsing/preprocess
+ulang; page cache OS dipakai bersama antar proses.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from services.base import DEFAULT_BATCH_SIZE
+from services.batch_stream import (
+    DEFAULT_CHUNK_SIZE,
+    ArrowResultWriter,
+    iter_arrow_chunks,
+    iter_input_chunks,
+)
+
+
+DEFAULT_PREPARED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".cache", "prepared",
+)
+INPUT_FILE = "input.arrow"
+META_FILE = "meta.json"
+
+# Header .npy dicadangkan di awal file agar matriks bisa ditulis per chunk
+# sebelum jumlah baris diketahui (kelipatan 64 byte, sesuai format NPY 1.0)
+NPY_HEADER_SIZE = 128
+
+
+# =============================================================
+# Hash input & versi preprocessor
+# =============================================================
+def input_hash(source, columns=None):
+    """sha256 isi file input (path atau file-like) + daftar kolom yang dibaca."""
+    digest = hashlib.sha256(json.dumps(columns).encode())
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+        source.seek(0)
+
+    return digest.hexdigest()[:24]
+
+
+_VERSIONS = {}
+
+
+def preprocessor_version(service):
+    """Hash file preprocessor milik service (hex, 12 karakter, di-cache per proses)."""
+    files = tuple(getattr(service, "preprocessor_files", ()))
+    key = (service.name, files)
+    if key not in _VERSIONS:
+        digest = hashlib.sha256(service.name.encode())
+        for path in files:
+            if os.path.exists(path):
+                digest.update(os.path.basename(path).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        _VERSIONS[key] = digest.hexdigest()[:12]
+    return _VERSIONS[key]
+
+
+# =============================================================
+# Penulisan .npy bertahap
+# =============================================================
+class NpyStreamWriter:
+    """Tulis array 2D ke file .npy per chunk (baris ditambahkan di akhir)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._dtype = None
+        self._row_shape = None
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"\0" * NPY_HEADER_SIZE)
+
+    def write(self, array):
+        array = np.ascontiguousarray(array)
+        if self._dtype is None:
+            self._dtype, self._row_shape = array.dtype, array.shape[1:]
+        elif (array.dtype, array.shape[1:]) != (self._dtype, self._row_shape):
+            raise ValueError(
+                f"Chunk {array.dtype}{array.shape[1:]} does not match "
+                f"{self._dtype}{self._row_shape}"
+            )
+        self._file.write(array.data)
+        self.rows += len(array)
+
+    def close(self):
+        header = repr({
+            "descr": np.lib.format.dtype_to_descr(self._dtype or np.dtype(np.float32)),
+            "fortran_order": False,
+            "shape": (self.rows, *(self._row_shape or ())),
+        })
+        prefix = np.lib.format.magic(1, 0)
+        header_len = NPY_HEADER_SIZE - len(prefix) - 2
+        header = header.ljust(header_len - 1).encode("latin1") + b"\n"
+
+        self._file.seek(0)
+        self._file.write(prefix + header_len.to_bytes(2, "little") + header)
+        self._file.close()
+        # File baru terlihat setelah lengkap (aman untuk pembaca paralel)
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+
+# =============================================================
+# Dataset siap-scoring
+# =============================================================
+class PreparedDataset:
+    """
+    Folder dataset hasil prepare().
+
+    rows    : jumlah baris input
+    columns : kolom input yang disimpan di input.arrow
+    models  : dict nama model -> {"version", "files"}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.columns = meta["columns"]
+        self.source = meta.get("source")
+        self.models = meta["models"]
+        self._arrays = {}
+
+    @classmethod
+    def prepare(
+        cls,
+        source,
+        services,
+        columns=None,
+        chunksize=DEFAULT_CHUNK_SIZE,
+        root=DEFAULT_PREPARED_DIR,
+    ):
+        """
+        Buat (atau pakai ulang) dataset untuk `source` dan pastikan matriks
+        semua `services` tersedia.
+
+        services : iterable ModelService (punya preprocess() & predict_prepared())
+        columns  : kolom input yang dibaca (lihat iter_input_chunks)
+        """
+        services = list(services)
+        path = os.path.join(root, input_hash(source, columns))
+
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            cls._create(path, source, services, columns, chunksize)
+
+        dataset = cls(path)
+        dataset.ensure(services, chunksize)
+        return dataset
+
+    @classmethod
+    def _create(cls, path, source, services, columns, chunksize):
+        # Satu kali parsing input: simpan kolom input + matriks tiap model
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+
+        input_writer = ArrowResultWriter(os.path.join(path, INPUT_FILE))
+        matrix_writers = {}
+        rows, input_columns = 0, columns
+
+        try:
+            for chunk in iter_input_chunks(source, chunksize=chunksize, columns=columns):
+                input_writer.write(chunk)
+                input_columns = list(chunk.columns)
+                for service in services:
+                    cls._write_matrices(path, service, chunk, matrix_writers)
+                rows += len(chunk)
+        except BaseException:
+            input_writer.close()
+            for writer in matrix_writers.values():
+                writer.abort()
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        input_writer.close()
+        models = cls._close_writers(matrix_writers)
+        cls._write_meta(path, {
+            "rows": rows,
+            "columns": input_columns,
+            "source": getattr(source, "name", str(source)),
+            "models": models,
+        })
+
+    @staticmethod
+    def _matrix_files(service, n_arrays):
+        version = preprocessor_version(service)
+        return version, [f"{service.name}-{version}.{i}.npy" for i in range(n_arrays)]
+
+    @classmethod
+    def _write_matrices(cls, path, service, chunk, matrix_writers):
+        arrays = service.preprocess(chunk)
+        version, files = cls._matrix_files(service, len(arrays))
+        for i, (filename, array) in enumerate(zip(files, arrays)):
+            key = (service.name, version, i)
+            if key not in matrix_writers:
+                matrix_writers[key] = NpyStreamWriter(os.path.join(path, filename))
+            matrix_writers[key].write(array)
+
+    @staticmethod
+    def _close_writers(matrix_writers):
+        models = {}
+        for (name, version, _), writer in sorted(matrix_writers.items()):
+            writer.close()
+            info = models.setdefault(name, {"version": version, "files": []})
+            info["files"].append(os.path.basename(writer.path))
+        return models
+
+    @staticmethod
+    def _write_meta(path, meta):
+        tmp_path = os.path.join(path, f"{META_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    # =====================================================
+    # MATRIKS PER MODEL
+    # =====================================================
+    def has(self, service):
+        info = self.models.get(service.name)
+        return info is not None and info["version"] == preprocessor_version(service)
+
+    def ensure(self, services, chunksize=DEFAULT_CHUNK_SIZE):
+        """Preprocess ulang (dari input.arrow) hanya untuk model yang belum ada/usang."""
+        missing = [service for service in services if not self.has(service)]
+        if not missing:
+            return
+
+        matrix_writers = {}
+        for chunk in self.iter_chunks(chunksize):
+            for service in missing:
+                self._write_matrices(self.path, service, chunk, matrix_writers)
+
+        for name, info in self._close_writers(matrix_writers).items():
+            old = self.models.get(name)
+            self.models[name] = info
+            self._arrays.pop(name, None)
+            if old is not None:
+                for filename in set(old["files"]) - set(info["files"]):
+                    os.remove(os.path.join(self.path, filename))
+
+        self._write_meta(self.path, {
+            "rows": self.rows,
+            "columns": self.columns,
+            "source": self.source,
+            "models": self.models,
+        })
+
+    def arrays(self, name):
+        """Tuple matriks model `name` sebagai memmap copy-on-write (zero-copy)."""
+        if name not in self._arrays:
+            if name not in self.models:
+                raise KeyError(f"Model '{name}' has not been prepared in {self.path}")
+            self._arrays[name] = tuple(
+                np.load(os.path.join(self.path, filename), mmap_mode="c")
+                for filename in self.models[name]["files"]
+            )
+        return self._arrays[name]
+
+    # =====================================================
+    # INPUT
+    # =====================================================
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE):
+        """
+        Generator DataFrame kolom input dari input.arrow (memory map).
+
+        Index tiap chunk = posisi baris global (RangeIndex), sehingga
+        rows_of() bisa memetakan chunk ke potongan matriks .npy.
+        """
+        start = 0
+        for chunk in iter_arrow_chunks(os.path.join(self.path, INPUT_FILE), chunksize):
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+
+    def rows_of(self, df):
+        """
+        Baris dataset untuk `df` dari iter_chunks(), atau None:
+        slice untuk chunk utuh, array posisi untuk chunk yang sudah difilter
+        (mis. baris tidak valid dibuang services.validation).
+        """
+        index = df.index
+        if (
+            isinstance(index, pd.RangeIndex) and index.step == 1
+            and 0 <= index.start and index.stop <= self.rows
+        ):
+            return slice(index.start, index.stop)
+        if (
+            len(index) and index.dtype.kind == "i" and index.is_monotonic_increasing
+            and 0 <= index[0] and index[-1] < self.rows
+        ):
+            return index.to_numpy()
+        return None
+
+    def predict_proba(self, service, df, batch_size=DEFAULT_BATCH_SIZE):
+        """Probabilitas dari matriks tersimpan; fallback ke preprocess biasa."""
+        rows = self.rows_of(df)
+        if rows is None or not self.has(service):
+            return service.predict_proba(df, batch_size=batch_size)
+        arrays = [array[rows] for array in self.arrays(service.name)]
+        return service.predict_prepared(*arrays, batch_size=batch_size)
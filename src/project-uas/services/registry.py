@@ -0,0 +1,155 @@
+# services/registry.py
+import importlib
+import threading
+import time
+
+from services.prediction_cache import CachedService, PredictionCache
+
+
+# Modul service bawaan; diimpor saat modelnya pertama kali diminta,
+# modul tersebut mendaftarkan loader-nya sendiri ke registry.
+SERVICE_MODULES = {
+    "mlp": "services.mlp_service",
+    "tabnet": "services.tabnet_service",
+    "ft": "services.ft_transformer_service",
+    "ensemble": "services.ensemble_service",
+}
+
+
+class ModelRegistry:
+    """
+    Cache model per proses yang tidak bergantung pada framework UI.
+
+    Setiap service mendaftarkan loader-nya dengan register(); model baru
+    dimuat saat pertama kali diminta lewat get() (lazy) lalu dipakai ulang
+    oleh semua pemanggil (halaman Streamlit, CLI, worker, server).
+
+    Lifecycle:
+        register(name, loader) → get(name) / load(name) → unload(name) / clear()
+
+    Metrik per model (lihat stats()): waktu muat, waktu selesai dimuat,
+    jumlah muat ulang dan jumlah akses.
+
+    Jika PredictionCache dipasang (set_cache() atau env PREDICTION_CACHE),
+    get() mengembalikan service yang dibungkus CachedService.
+    """
+
+    def __init__(self, cache=None):
+        self._loaders = {}
+        self._models = {}
+        self._cached = {}
+        self._stats = {}
+        self._cache = cache
+        self._lock = threading.RLock()
+
+    # =====================================================
+    # REGISTRASI
+    # =====================================================
+    def register(self, name, loader):
+        """loader : callable tanpa argumen yang mengembalikan objek model."""
+        with self._lock:
+            self._loaders[name] = loader
+
+    def names(self):
+        return list(dict.fromkeys([*self._loaders, *SERVICE_MODULES]))
+
+    def _resolve_loader(self, name):
+        if name not in self._loaders and name in SERVICE_MODULES:
+            importlib.import_module(SERVICE_MODULES[name])
+        if name not in self._loaders:
+            raise KeyError(
+                f"Unknown model '{name}', registered: {self.names()}"
+            )
+        return self._loaders[name]
+
+    # =====================================================
+    # AKSES MODEL
+    # =====================================================
+    def _stat(self, name):
+        return self._stats.setdefault(name, {
+            "load_seconds": None,
+            "loaded_at": None,
+            "loads": 0,
+            "hits": 0,
+        })
+
+    def get(self, name):
+        try:
+            model = self._models[name]
+        except KeyError:
+            pass
+        else:
+            # Model sudah dimuat: hanya penghitung yang perlu lock
+            with self._lock:
+                self._stat(name)["hits"] += 1
+            return self._serve(name, model)
+
+        with self._lock:
+            if name not in self._models:
+                loader = self._resolve_loader(name)
+
+                start = time.perf_counter()
+                self._models[name] = loader()
+                stat = self._stat(name)
+                stat["load_seconds"] = time.perf_counter() - start
+                stat["loaded_at"] = time.time()
+                stat["loads"] += 1
+
+            self._stat(name)["hits"] += 1
+            return self._serve(name, self._models[name])
+
+    def _serve(self, name, model):
+        if self._cache is None:
+            return model
+
+        wrapped = self._cached.get(name)
+        if wrapped is None or wrapped.service is not model or wrapped.cache is not self._cache:
+            with self._lock:
+                wrapped = self._cached[name] = CachedService(model, self._cache)
+        return wrapped
+
+    def load(self, *names):
+        """Muat model secara eksplisit (warm-up); tanpa argumen = semua."""
+        for name in names or self.names():
+            self.get(name)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def stats(self):
+        """dict nama model -> status & metrik muat (semua model terdaftar)."""
+        with self._lock:
+            return {
+                name: {"loaded": self.is_loaded(name), **self._stat(name)}
+                for name in self.names()
+            }
+
+    # =====================================================
+    # CACHE PREDIKSI
+    # =====================================================
+    @property
+    def cache(self):
+        return self._cache
+
+    def set_cache(self, cache):
+        """Pasang PredictionCache di depan semua model; None = nonaktif."""
+        with self._lock:
+            self._cache = cache
+            self._cached.clear()
+
+    # =====================================================
+    # LIFECYCLE
+    # =====================================================
+    def unload(self, name):
+        with self._lock:
+            self._models.pop(name, None)
+            self._cached.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._cached.clear()
+
+
+# Registry bersama untuk seluruh proses
+registry = ModelRegistry(cache=PredictionCache.from_env())
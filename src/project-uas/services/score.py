@@ -0,0 +1,203 @@
+# services/score.py
+"""
+Batch scoring tanpa UI (tanpa streamlit).
+
+Jalankan dari src/project-uas:
+    python -m services.score --model ft --in data.csv --out hasil.parquet
+    python -m services.score --model mlp --model tabnet --model ft \
+        --in data.csv --out hasil.csv --chunksize 100000
+    python -m services.score --model ft --in data.parquet --out hasil.arrow \
+        --keep-column loan_status
+    python -m services.score --model mlp --model ft --in data.csv \
+        --out hasil_045.parquet --prepared --threshold 0.45
+    python -m services.score --model mlp --model tabnet --model ft \
+        --in data.parquet --out hasil.parquet --parallel pool --workers 8
+    python -m services.score --model ft --in data.csv --out hasil.csv --reasons 3
+    python -m services.score --model ft --in data.csv --out hasil.csv \
+        --rejects ditolak.csv
+
+Input dibaca per chunk dan hanya 11 kolom fitur (+ --keep-column) yang
+di-parse; format file ditentukan dari ekstensi (.csv, .parquet,
+.arrow/.feather/.ipc). Dengan --prepared, hasil preprocess disimpan
+sebagai .npy di .cache/prepared (services/prepared_dataset.py) sehingga run
+berikutnya atas file yang sama tidak parsing & preprocess ulang.
+
+Baris yang gagal validasi skema (services/validation.py: tipe, kosong,
+rentang, kategori) tidak dinilai; laporannya ditulis ke --rejects.
+"""
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from services.batch_stream import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    INPUT_READERS,
+    RESULT_WRITERS,
+    STREAM_MODES,
+    iter_input_chunks,
+    open_writer,
+    stream_predict,
+)
+from services.base import DEFAULT_THRESHOLD, FEATURE_COLUMNS
+from services.instrumentation import metrics, stage_frame, write_metrics
+from services.prepared_dataset import DEFAULT_PREPARED_DIR, PreparedDataset
+from services.registry import registry
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m services.score",
+        description="Batch scoring risiko kredit dari file CSV / Parquet / Arrow IPC.",
+    )
+    parser.add_argument(
+        "--model", action="append", choices=registry.names(),
+        required=True, help="model yang dipakai (boleh diulang)",
+    )
+    parser.add_argument(
+        "--in", dest="input", required=True,
+        help=f"file input ({' / '.join(sorted(INPUT_READERS))})",
+    )
+    parser.add_argument(
+        "--out", dest="output", required=True,
+        help=f"file output ({' / '.join(sorted(RESULT_WRITERS))})",
+    )
+    columns = parser.add_mutually_exclusive_group()
+    columns.add_argument(
+        "--keep-column", action="append", default=[],
+        help="kolom non-fitur yang ikut disalin ke output (boleh diulang)",
+    )
+    columns.add_argument(
+        "--all-columns", action="store_true",
+        help="baca & salin semua kolom input (tanpa column pruning)",
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--parallel", choices=STREAM_MODES, default="serial",
+        help="cara menjalankan beberapa model per chunk; pool = chunk dibagi ke N worker process",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="jumlah worker (thread/process/pool)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--prepared", action="store_true",
+        help="pakai/buat dataset siap-scoring (.npy memory-mapped) untuk input ini",
+    )
+    parser.add_argument(
+        "--prepared-dir", default=DEFAULT_PREPARED_DIR,
+        help="folder dataset siap-scoring",
+    )
+    parser.add_argument(
+        "--reasons", type=int, default=0, metavar="K",
+        help="tambahkan K reason code (fitur paling berpengaruh) per baris",
+    )
+    parser.add_argument(
+        "--rejects", dest="rejects_path",
+        help="file laporan baris yang ditolak validasi (row, column, reason, value, expected)",
+    )
+    parser.add_argument(
+        "--no-validate", dest="validate", action="store_false",
+        help="lewati validasi skema input (baris tidak valid ikut dinilai)",
+    )
+    parser.add_argument(
+        "--metrics", dest="metrics_path",
+        help="simpan metrik per tahap (.prom = teks Prometheus, selain itu JSON)",
+    )
+    return parser.parse_args(argv)
+
+
+def format_report(summary, wall_seconds, rows):
+    lines = [f"{'model':<8} {'rows':>12} {'seconds':>10} {'rows/sec':>14}"]
+    for name, info in summary.items():
+        rate = info["rows"] / info["seconds"] if info["seconds"] else 0.0
+        lines.append(
+            f"{name:<8} {info['rows']:>12,} {info['seconds']:>10.2f} {rate:>14,.0f}"
+        )
+    total_rate = rows / wall_seconds if wall_seconds else 0.0
+    lines.append(
+        f"{'total':<8} {rows:>12,} {wall_seconds:>10.2f} {total_rate:>14,.0f}"
+    )
+    return "\n".join(lines)
+
+
+def format_stages(snapshot):
+    df = stage_frame(snapshot)
+    lines = [f"{'stage':<11} {'model':<8} {'seconds':>9} {'share':>6} {'rows/sec':>14}"]
+    for row in df.itertuples():
+        rate = f"{row.rows_per_sec:,.0f}" if pd.notna(row.rows_per_sec) else "-"
+        lines.append(f"{row.stage:<11} {row.model:<8} {row.seconds:>9.2f} {row.share:>6.0%} {rate:>14}")
+    lines.append(f"peak RSS   : {snapshot['memory']['peak_rss_bytes'] / 1e6:,.0f} MB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics.reset()
+    models = list(dict.fromkeys(args.model))
+    columns = None if args.all_columns else list(dict.fromkeys(FEATURE_COLUMNS + args.keep_column))
+
+    # Mode process memuat model di worker; selain itu muat di proses ini
+    # (--prepared butuh preprocessor tiap model di proses ini)
+    load_start = time.perf_counter()
+    if args.parallel != "process" or args.prepared:
+        registry.load(*models)
+    load_seconds = time.perf_counter() - load_start
+
+    prepared = None
+    chunks = iter_input_chunks(args.input, chunksize=args.chunksize, columns=columns)
+    if args.prepared:
+        prepare_start = time.perf_counter()
+        prepared = PreparedDataset.prepare(
+            args.input,
+            [registry.get(name) for name in models],
+            columns=columns,
+            chunksize=args.chunksize,
+            root=args.prepared_dir,
+        )
+        chunks = prepared.iter_chunks(args.chunksize)
+        print(f"prepared   : {prepared.path} ({time.perf_counter() - prepare_start:.2f}s)")
+
+    rows_done = 0
+
+    def report_progress(rows):
+        nonlocal rows_done
+        rows_done = rows
+        print(f"  {rows:,} baris diproses", file=sys.stderr)
+
+    start = time.perf_counter()
+    summary = stream_predict(
+        chunks,
+        {name: name for name in models},
+        merged_writer=open_writer(args.output),
+        batch_size=args.batch_size,
+        threshold=args.threshold,
+        on_chunk=report_progress,
+        mode=args.parallel,
+        max_workers=args.workers,
+        prepared=prepared,
+        top_k=args.reasons,
+        validate=args.validate,
+        rejected_writer=open_writer(args.rejects_path) if args.rejects_path else None,
+    )
+    wall_seconds = time.perf_counter() - start
+    metrics.finish()
+
+    print(f"model load : {load_seconds:.2f}s")
+    print(format_report(summary, wall_seconds, rows_done))
+    print(f"output     : {args.output}")
+    if args.validate:
+        rejected = next(iter(summary.values()))["rejected"]
+        print(f"ditolak    : {rejected:,} baris" + (f" ({args.rejects_path})" if args.rejects_path else ""))
+
+    snapshot = metrics.snapshot()
+    print()
+    print(format_stages(snapshot))
+    if args.metrics_path:
+        write_metrics(args.metrics_path, snapshot)
+        print(f"metrics    : {args.metrics_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+# services/server.py
+"""
+HTTP scoring service dengan dynamic micro-batching (asyncio, tanpa dependensi tambahan).
+
+Request yang datang bersamaan dikumpulkan menjadi satu batch (dibatasi
+max batch size dan max wait time) lalu diprediksi dengan satu forward pass.
+Record divalidasi per batch (services/validation.py): record yang tidak
+valid dijawab 400 tanpa menggagalkan request lain di batch yang sama.
+
+Jalankan dari src/project-uas:
+    python -m services.server --model ft --model mlp --port 8080
+
+Endpoint:
+    POST /predict/<model>   body JSON: satu nasabah (11 fitur)
+    GET  /metrics           latency p50/p99 & histogram ukuran batch per model
+    GET  /health
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from services.base import DEFAULT_THRESHOLD, FEATURE_COLUMNS, LABELS
+from services.registry import registry
+from services.validation import model_schema, validate
+
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+# =============================================================
+# Metrik latency & ukuran batch
+# =============================================================
+class BatchMetrics:
+    def __init__(self, window=10_000):
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = Counter()
+        self.requests = 0
+        self.batches = 0
+
+    def record_batch(self, size):
+        self.batch_sizes[size] += 1
+        self.batches += 1
+
+    def record_latency(self, seconds):
+        self.latencies_ms.append(seconds * 1000.0)
+        self.requests += 1
+
+    def snapshot(self):
+        latencies = np.asarray(self.latencies_ms, dtype=float)
+        if len(latencies):
+            p50, p99 = np.percentile(latencies, [50, 99])
+        else:
+            p50 = p99 = None
+
+        counts = np.searchsorted(LATENCY_BUCKETS_MS, latencies, side="left")
+        latency_hist = {
+            f"le_{bound}ms": int((counts <= i).sum())
+            for i, bound in enumerate(LATENCY_BUCKETS_MS)
+        }
+        latency_hist["le_inf"] = int(len(latencies))
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else None,
+            "latency_p50_ms": p50,
+            "latency_p99_ms": p99,
+            "latency_histogram": latency_hist,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+        }
+
+
+# =============================================================
+# Micro-batcher per model
+# =============================================================
+class MicroBatcher:
+    """
+    Kumpulkan request bersamaan menjadi batch untuk satu ModelService.
+
+    Batch dikirim saat jumlah request mencapai max_batch_size atau saat
+    request pertama sudah menunggu max_wait_ms, mana yang lebih dulu.
+    Forward pass berjalan di thread terpisah agar event loop tetap responsif.
+    """
+
+    def __init__(
+        self,
+        service,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms=DEFAULT_MAX_WAIT_MS,
+        threshold=DEFAULT_THRESHOLD,
+    ):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.threshold = threshold
+        self.metrics = BatchMetrics()
+        self.schema = model_schema(service)
+
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, record: dict):
+        """return : dict hasil prediksi untuk satu nasabah."""
+        future = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self._queue.put((record, future))
+
+        try:
+            return await future
+        finally:
+            # Request yang gagal ikut dihitung di p50/p99
+            self.metrics.record_latency(time.perf_counter() - start)
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(items) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return items
+
+    def _predict(self, records):
+        """
+        return : list per record, berisi probabilitas (float) atau exception
+                 (HTTPError 400 untuk record yang tidak lolos validasi)
+        """
+        df = pd.DataFrame.from_records(records, columns=FEATURE_COLUMNS)
+        outcomes = [None] * len(records)
+        try:
+            valid, report = validate(df, self.schema)
+        except Exception:
+            # Validasi batch gagal: validasi per record agar hanya record bermasalah yang gagal
+            valid, report = self._validate_each(df, outcomes)
+
+        for row, violations in report.groupby("row"):
+            outcomes[row] = HTTPError(400, "invalid features: " + ", ".join(
+                f"{v.column} ({v.reason}: {v.value!r}, expected {v.expected})"
+                for v in violations.itertuples()
+            ))
+
+        rows = np.flatnonzero(valid)
+        if len(rows):
+            try:
+                probs = self.service.predict_proba(df.iloc[rows], batch_size=len(rows))
+            except Exception:
+                # Batch gagal: nilai per record agar hanya record bermasalah yang gagal
+                probs = [self._predict_one(df.iloc[[row]]) for row in rows]
+            for row, prob in zip(rows, probs):
+                outcomes[row] = prob
+        return outcomes
+
+    def _validate_each(self, df, outcomes):
+        valid = np.zeros(len(df), dtype=bool)
+        reports = []
+        for row in range(len(df)):
+            try:
+                row_valid, row_report = validate(df.iloc[[row]], self.schema, offset=row)
+            except Exception as exc:
+                outcomes[row] = HTTPError(400, f"invalid features: {exc}")
+                continue
+            valid[row] = row_valid[0]
+            reports.append(row_report)
+        return valid, pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(columns=["row"])
+
+    def _predict_one(self, df):
+        try:
+            return float(self.service.predict_proba(df, batch_size=1)[0])
+        except Exception as exc:
+            return exc
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            items = await self._collect()
+            records = [record for record, _ in items]
+            self.metrics.record_batch(len(items))
+
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._predict, records)
+            except Exception as exc:
+                outcomes = [exc] * len(items)
+
+            for (_, future), outcome in zip(items, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                    continue
+                pred = int(outcome >= self.threshold)
+                future.set_result({
+                    "prediction": pred,
+                    "prediction_label": LABELS[pred],
+                    "prob_gagal_bayar": float(outcome),
+                })
+
+
+# =============================================================
+# HTTP server (HTTP/1.1 minimal, JSON)
+# =============================================================
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class ScoringServer:
+    def __init__(self, batchers: dict):
+        self.batchers = batchers
+
+    async def handle_request(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok", "models": list(self.batchers)}
+
+        if path == "/metrics":
+            return {name: b.metrics.snapshot() for name, b in self.batchers.items()}
+
+        if path.startswith("/predict/"):
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+
+            name = path[len("/predict/"):]
+            if name not in self.batchers:
+                raise HTTPError(404, f"unknown model '{name}', available: {list(self.batchers)}")
+
+            try:
+                record = json.loads(body or b"{}")
+            except json.JSONDecodeError as exc:
+                raise HTTPError(400, f"invalid JSON: {exc}")
+            if not isinstance(record, dict):
+                raise HTTPError(400, "body must be a JSON object (one applicant)")
+
+            missing = [col for col in FEATURE_COLUMNS if col not in record]
+            if missing:
+                raise HTTPError(400, f"missing features: {missing}")
+            nested = [col for col in FEATURE_COLUMNS if isinstance(record[col], (list, dict))]
+            if nested:
+                raise HTTPError(400, f"features must be scalar values: {nested}")
+
+            result = await self.batchers[name].submit(record)
+            return {"model": name, **result}
+
+        raise HTTPError(404, f"no route for {path}")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = 200, await self.handle_request(method, path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {"error": repr(exc)}
+
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode("latin-1") + data
+                )
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(
+    models,
+    host="127.0.0.1",
+    port=8080,
+    max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+    max_wait_ms=DEFAULT_MAX_WAIT_MS,
+):
+    registry.load(*models)
+    batchers = {
+        name: MicroBatcher(registry.get(name), max_batch_size, max_wait_ms)
+        for name in models
+    }
+    for batcher in batchers.values():
+        batcher.start()
+
+    app = ScoringServer(batchers)
+    server = await asyncio.start_server(app.handle_connection, host, port)
+    print(f"Scoring server di http://{host}:{port} (model: {', '.join(models)})")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for batcher in batchers.values():
+            await batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m services.server",
+        description="HTTP scoring service dengan micro-batching.",
+    )
+    parser.add_argument(
+        "--model", action="append", choices=registry.names(),
+        required=True, help="model yang dilayani (boleh diulang)",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(
+            list(dict.fromkeys(args.model)),
+            host=args.host,
+            port=args.port,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
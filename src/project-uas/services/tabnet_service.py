@@ -2,10 +2,17 @@
 import os
 import joblib
 import numpy as np
-import streamlit as st
-from pytorch_tabnet.tab_model import TabNetClassifier
-from utils.load_css import load_css
-load_css()  # otomatis load utils/style.css
+from services.registry import registry
+from services.fast_preprocessor import FAST_PREPROCESSOR_FILE, load_fast_preprocessor
+from services.base import (
+    DEFAULT_BATCH_SIZE,
+    predict_batch,
+    predict_in_stages,
+    predict_single,
+    resolve_backend,
+    to_frame,
+)
+from services.batch_stream import iter_batches
 
 
 # =============================================================
@@ -17,22 +24,82 @@ MODEL_DIR = os.path.join(BASE_DIR, "models", "tabnet_credit_risk_model")
 TABNET_PATH = os.path.join(MODEL_DIR, "model.zip")
 PREPROCESSOR_PATH = os.path.join(MODEL_DIR, "preprocessor_tab.pkl")
 
+BACKENDS = ("torch", "onnx")
+
 # =============================================================
-# Load model & preprocessor
+# Service TabNet (implementasi ModelService)
 # =============================================================
-@st.cache_resource
-def load_tabnet_model():
-    if not os.path.exists(TABNET_PATH):
-        raise FileNotFoundError(f"TabNet model not found: {TABNET_PATH}")
-    if not os.path.exists(PREPROCESSOR_PATH):
-        raise FileNotFoundError(f"Preprocessor not found: {PREPROCESSOR_PATH}")
-
-    model = TabNetClassifier()
-    model.load_model(TABNET_PATH)
-
-    preprocessor = joblib.load(PREPROCESSOR_PATH)
-
-    return model, preprocessor
+class TabNetService:
+    name = "tabnet"
+    n_inputs = 1        # jumlah matriks hasil preprocess()
+
+    def __init__(self, backend=None):
+        if not os.path.exists(TABNET_PATH):
+            raise FileNotFoundError(f"TabNet model not found: {TABNET_PATH}")
+        if not os.path.exists(PREPROCESSOR_PATH):
+            raise FileNotFoundError(f"Preprocessor not found: {PREPROCESSOR_PATH}")
+
+        self.model_dir = MODEL_DIR
+        # "torch" (default) atau "onnx" (services/onnx_backend.py), env TABNET_BACKEND
+        self.backend = resolve_backend(self.name, backend, BACKENDS)
+        if self.backend == "onnx":
+            from services.onnx_backend import load_onnx_model
+            self.model = load_onnx_model(MODEL_DIR)
+        else:
+            # torch & pytorch-tabnet baru diimpor saat model TabNet dimuat
+            from pytorch_tabnet.tab_model import TabNetClassifier
+            self.model = TabNetClassifier()
+            self.model.load_model(TABNET_PATH)
+            self.model.network.eval()
+
+        self.preprocessor = joblib.load(PREPROCESSOR_PATH)
+        # Versi NumPy dari preprocessor (services/fast_preprocessor.py), jika ada
+        self.fast_preprocessor = load_fast_preprocessor(MODEL_DIR)
+        # Menentukan versi matriks hasil preprocess (services/prepared_dataset.py)
+        self.preprocessor_files = (
+            PREPROCESSOR_PATH,
+            os.path.join(MODEL_DIR, FAST_PREPROCESSOR_FILE),
+        )
+
+    def preprocess(self, X):
+        """Input mentah → tuple matriks siap model: (X float32,)."""
+        if self.fast_preprocessor is None:
+            return (self.preprocessor.transform(to_frame(X)).astype(np.float32),)
+        return self.preprocess_parsed(*self.fast_preprocessor.parse(to_frame(X)))
+
+    def preprocess_parsed(self, X_num, X_cat):
+        """Hasil FastPreprocessor.parse() → (X float32,)."""
+        return (np.hstack([self.fast_preprocessor.scale_numerical(X_num), X_cat]).astype(np.float32),)
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        return predict_in_stages(self, X, batch_size)
+
+    def predict_prepared(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        if self.backend == "onnx":
+            return self.model.run(X, batch_size=batch_size)[:, 1]
+
+        import torch
+
+        X = torch.from_numpy(X).to(self.model.device)
+
+        # Satu forward pass per batch langsung ke network TabNet
+        # (tanpa DataLoader & autograd seperti TabNetClassifier.predict_proba);
+        # label diturunkan dari probabilitas ini oleh services.base
+        probs = np.empty(len(X), dtype=np.float32)
+        with torch.inference_mode():
+            for batch in iter_batches(len(X), batch_size):
+                logits, _ = self.model.network(X[batch])
+                probs[batch] = torch.softmax(logits, dim=1)[:, 1].cpu().numpy()
+
+        return probs
+
+
+# Model dimuat lazy & di-cache oleh registry
+registry.register("tabnet", TabNetService)
+
+
+def get_tabnet_service():
+    return registry.get("tabnet")
 
 # =============================================================
 # Fungsi prediksi TabNet
@@ -42,36 +109,10 @@ def predict_tabnet_risk(input_df):
     input_df : pandas.DataFrame (1 row)
     return : tuple(pred_label, probas)
     """
-    model, preprocessor = load_tabnet_model()
-
-    # Preprocessing
-    X = preprocessor.transform(input_df)
-    X = X.astype(np.float32)
-
-    # Prediksi probabilitas dan label
-    probs = model.predict_proba(X)[0]
-    pred = int(model.predict(X)[0])
-    
-    return [pred], [float(probs[1])]  # probabilitas gagal bayar
-
-
-def predict_tabnet_batch(df):
-    model, preprocessor = load_tabnet_model()
-
-    # preprocessing
-    X = preprocessor.transform(df)
-
-    # Keras predict → probability
-    probs = model.predict(X).reshape(-1)
+    pred, proba_gagal = predict_single(get_tabnet_service(), input_df)
 
-    # binary decision
-    preds = (probs >= 0.5).astype(int)
+    return [pred], [proba_gagal]  # probabilitas gagal bayar
 
-    df_out = df.copy()
-    df_out["prediction"] = preds
-    df_out["prob_gagal_bayar"] = probs
-    df_out["prediction_label"] = np.where(
-        preds == 1, "Gagal Bayar", "Lancar Bayar"
-    )
 
-    return df_out
\ No newline at end of file
+def predict_tabnet_batch(df, batch_size=DEFAULT_BATCH_SIZE, top_k=0):
+    return predict_batch(get_tabnet_service(), df, batch_size=batch_size, top_k=top_k)
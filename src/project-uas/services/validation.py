@@ -0,0 +1,261 @@
+# services/validation.py
+"""
+Validasi skema input batch sebelum inference (vektor per kolom).
+
+Skema per model diturunkan dari artifact-nya:
+    metadata.pkl / config.pkl   daftar fitur numerik & kategorikal
+    fast_preprocessor.json      kategori yang dikenal encoder, dan apakah
+                                nilai kosong diimputasi (num_fill / cat_fill)
+    DOMAIN_RANGES               batas nilai masuk akal per fitur numerik
+
+Aturan per kolom (seluruh kolom sekaligus, tanpa loop per baris):
+    dtype     nilai numerik yang tidak bisa dibaca sebagai angka
+    missing   nilai kosong pada fitur yang tidak diimputasi model
+    range     di luar DOMAIN_RANGES (mis. person_emp_length = 123)
+    category  kategori yang tidak dikenal encoder
+
+Kolom fitur yang hilang adalah kesalahan file, bukan baris: ValueError.
+
+Untuk beberapa model sekaligus (atau ensemble) skema digabung dengan aturan
+paling ketat, sehingga baris yang lolos valid untuk semua model. Baris yang
+ditolak dicatat di laporan (satu baris per pelanggaran) dan tidak dikirim ke
+model.
+
+Contoh:
+    from services.validation import model_schema, validate
+    result = validate(df, model_schema("ft"))
+    clean = df[result.valid]
+    result.report       # row, column, reason, value, expected
+"""
+import importlib
+import os
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from services.fast_preprocessor import compile_column_transformer, load_fast_preprocessor
+from services.instrumentation import span
+
+
+# Batas inklusif (min, max) nilai yang mungkin untuk nasabah & pinjaman
+DOMAIN_RANGES = {
+    "person_age": (18, 100),
+    "person_income": (1, np.inf),
+    "person_emp_length": (0, 60),
+    "loan_amnt": (1, np.inf),
+    "loan_int_rate": (0, 100),
+    "loan_percent_income": (0, 1),
+    "cb_person_cred_hist_length": (0, 80),
+}
+
+REPORT_COLUMNS = ["row", "column", "reason", "value", "expected"]
+
+Validation = namedtuple("Validation", ["valid", "report"])
+
+
+# =============================================================
+# Skema
+# =============================================================
+class Schema:
+    """
+    numerical   : dict kolom -> (min, max)
+    categorical : dict kolom -> list kategori valid
+    nullable    : set kolom yang boleh kosong (diimputasi model)
+    """
+
+    def __init__(self, numerical, categorical, nullable=()):
+        self.numerical = dict(numerical)
+        self.categorical = {col: list(values) for col, values in categorical.items()}
+        self.nullable = set(nullable)
+        self._lookup = {col: pd.Index(values) for col, values in self.categorical.items()}
+
+    @property
+    def columns(self):
+        return list(self.numerical) + list(self.categorical)
+
+    def merge(self, other):
+        """Skema gabungan dengan aturan paling ketat dari keduanya."""
+        numerical = dict(self.numerical)
+        for col, (low, high) in other.numerical.items():
+            if col in numerical:
+                low, high = max(low, numerical[col][0]), min(high, numerical[col][1])
+            numerical[col] = (low, high)
+
+        categorical = dict(self.categorical)
+        for col, values in other.categorical.items():
+            if col in categorical:
+                allowed = set(values)
+                values = [v for v in categorical[col] if v in allowed]
+            categorical[col] = values
+
+        nullable = (
+            (self.nullable & other.nullable)
+            | (self.nullable - set(other.columns))
+            | (other.nullable - set(self.columns))
+        )
+        return Schema(numerical, categorical, nullable)
+
+    @classmethod
+    def from_model_dir(cls, model_dir):
+        """Skema dari artifact satu folder model (tanpa memuat model)."""
+        metadata_path = os.path.join(model_dir, "metadata.pkl")
+        if os.path.exists(metadata_path):
+            metadata = joblib.load(metadata_path)
+        else:
+            metadata = joblib.load(os.path.join(model_dir, "config.pkl"))
+
+        fast = load_fast_preprocessor(model_dir) or _compile_from_pickles(model_dir)
+        categories = dict(zip(fast.cat_cols, fast.categories))
+        nullable = set()
+        if fast.num_fill is not None:
+            nullable.update(fast.num_cols)
+        if fast.cat_fill is not None:
+            nullable.update(fast.cat_cols)
+
+        numerical = {
+            col: DOMAIN_RANGES.get(col, (-np.inf, np.inf))
+            for col in metadata["numerical_features"]
+        }
+        categorical = {col: categories[col] for col in metadata["categorical_features"]}
+        return cls(numerical, categorical, nullable)
+
+
+def _compile_from_pickles(model_dir):
+    """Fallback jika fast_preprocessor.json belum dibuat."""
+    cat_encoders_path = os.path.join(model_dir, "cat_encoders.pkl")
+    if os.path.exists(cat_encoders_path):
+        from services.fast_preprocessor import FastPreprocessor
+
+        cat_encoders = joblib.load(cat_encoders_path)
+        return FastPreprocessor([], list(cat_encoders), [e.classes_ for e in cat_encoders.values()])
+
+    pickles = [f for f in os.listdir(model_dir) if f.startswith("preprocessor") and f.endswith(".pkl")]
+    if not pickles:
+        raise FileNotFoundError(f"No preprocessor artifacts in {model_dir}")
+    return compile_column_transformer(joblib.load(os.path.join(model_dir, pickles[0])))
+
+
+@lru_cache(maxsize=None)
+def _schema_for_name(name):
+    from services.registry import SERVICE_MODULES
+
+    module = importlib.import_module(SERVICE_MODULES[name])
+    load_config = getattr(module, "load_config", None)
+    if load_config is not None:
+        # Ensemble: gabungan skema model anggota
+        return merge_schemas(map(_schema_for_name, load_config()["members"]))
+    return Schema.from_model_dir(module.MODEL_DIR)
+
+
+def model_schema(model):
+    """Skema untuk nama model di registry atau objek ModelService."""
+    if isinstance(model, str):
+        return _schema_for_name(model)
+    model = getattr(model, "service", model)
+    members = getattr(model, "members", None)
+    if members:
+        return merge_schemas(map(model_schema, members))
+    return Schema.from_model_dir(model.model_dir)
+
+
+def merge_schemas(schemas):
+    schemas = list(schemas)
+    merged = schemas[0]
+    for schema in schemas[1:]:
+        merged = merged.merge(schema)
+    return merged
+
+
+# =============================================================
+# Validasi
+# =============================================================
+def check_columns(df, columns):
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing input columns: {missing}")
+
+
+def validate(df: pd.DataFrame, schema: Schema, offset=0):
+    """
+    df     : DataFrame input (kolom fitur mentah)
+    offset : nomor baris pertama df di file input (untuk laporan)
+
+    return : Validation(valid ndarray bool (n,), report DataFrame REPORT_COLUMNS)
+    """
+    check_columns(df, schema.columns)
+    valid = np.ones(len(df), dtype=bool)
+    reports = []
+
+    def reject(mask, col, reason, expected):
+        rows = np.flatnonzero(mask)
+        if rows.size:
+            valid[rows] = False
+            reports.append(pd.DataFrame({
+                "row": rows + offset,
+                "column": col,
+                "reason": reason,
+                "value": df[col].iloc[rows].astype(str).to_numpy(),
+                "expected": expected,
+            }))
+
+    for col, (low, high) in schema.numerical.items():
+        series = df[col]
+        if series.dtype.kind in "biuf":
+            values = series.to_numpy(dtype=np.float64)
+        else:
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+            reject(np.isnan(values) & series.notna().to_numpy(), col, "dtype", "angka")
+
+        if col not in schema.nullable:
+            reject(series.isna().to_numpy(), col, "missing", "tidak kosong")
+        reject((values < low) | (values > high), col, "range", f"[{low:g}, {high:g}]")
+
+    for col, lookup in schema._lookup.items():
+        series = df[col]
+        missing = series.isna().to_numpy()
+        if col not in schema.nullable:
+            reject(missing, col, "missing", "tidak kosong")
+        reject((lookup.get_indexer(series) < 0) & ~missing, col, "category", "|".join(map(str, lookup)))
+
+    if reports:
+        report = pd.concat(reports, ignore_index=True).sort_values("row", kind="stable", ignore_index=True)
+    else:
+        report = pd.DataFrame({col: pd.Series(dtype=object) for col in REPORT_COLUMNS})
+        report["row"] = report["row"].astype(np.int64)
+    return Validation(valid, report)
+
+
+class ChunkValidator:
+    """
+    Bungkus iterator chunk: yield hanya baris valid, laporan penolakan
+    ditulis ke `writer` (opsional, write(df)) per chunk.
+
+    Index chunk asli dipertahankan; chunk.attrs["input_rows"] = jumlah baris
+    sebelum difilter (untuk progress). Chunk yang seluruhnya ditolak tetap
+    di-yield sebagai frame kosong agar baris inputnya ikut terhitung.
+    """
+
+    def __init__(self, schema: Schema, writer=None):
+        self.schema = schema
+        self.writer = writer
+        self.rows_seen = 0
+        self.rows_rejected = 0
+        self.violations = Counter()     # (kolom, alasan) -> jumlah pelanggaran
+
+    def __call__(self, chunks):
+        for chunk in chunks:
+            with span("validate", rows=len(chunk)):
+                valid, report = validate(chunk, self.schema, offset=self.rows_seen)
+                self.rows_seen += len(chunk)
+                if not report.empty:
+                    self.rows_rejected += int((~valid).sum())
+                    self.violations.update(report.groupby(["column", "reason"]).size().to_dict())
+                    if self.writer is not None:
+                        self.writer.write(report)
+                    input_rows = len(chunk)
+                    chunk = chunk[valid]
+                    chunk.attrs["input_rows"] = input_rows
+            yield chunk
@@ -0,0 +1,60 @@
+# src/utils/model_cache.py
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from services.prediction_cache import PredictionCache
+from services.registry import registry
+
+
+# Dashboard: form yang sama sering dikirim ulang → cache memori aktif secara
+# default, kecuali dikonfigurasi lewat env PREDICTION_CACHE (mis. "off")
+if registry.cache is None and "PREDICTION_CACHE" not in os.environ:
+    registry.set_cache(PredictionCache())
+
+
+def get_model(name):
+    """
+    Adapter Streamlit untuk services.registry: ambil model dari registry
+    bersama, tampilkan spinner hanya saat model pertama kali dimuat.
+    """
+    if registry.is_loaded(name):
+        return registry.get(name)
+
+    with st.spinner(f"⏳ Memuat model {name}..."):
+        return registry.get(name)
+
+
+def render_model_status(container=None):
+    """Tampilkan status warm model pool (model termuat & waktu muat)."""
+    container = container or st.sidebar
+    rows = []
+
+    for name, stat in registry.stats().items():
+        rows.append({
+            "model": name,
+            "status": "✅ termuat" if stat["loaded"] else "💤 belum dimuat",
+            "waktu muat (s)": (
+                round(stat["load_seconds"], 2)
+                if stat["load_seconds"] is not None else None
+            ),
+            "dimuat pada": (
+                datetime.fromtimestamp(stat["loaded_at"]).strftime("%H:%M:%S")
+                if stat["loaded_at"] else None
+            ),
+            "akses": stat["hits"],
+        })
+
+    with container:
+        st.markdown("#### 🔥 Model Pool")
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+        if registry.cache is not None:
+            cache = registry.cache.stats()
+            hit_rate = f"{cache['hit_rate']:.0%}" if cache["hit_rate"] is not None else "-"
+            st.caption(
+                f"🗃️ Cache prediksi: hit rate {hit_rate} · "
+                f"{cache['memory_entries']:,} entry memori"
+                + (f" · {cache['disk_entries']:,} entry disk" if cache["disk_entries"] is not None else "")
+            )